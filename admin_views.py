@@ -0,0 +1,248 @@
+# Admin-only pages, reached with ?view=admin and unlocked with the password in
+# st.secrets["admin"]["password"], and the facilitator dashboard (?view=dashboard).
+import hmac
+import os
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from export_dataset import export
+from submissions_index import SubmissionsIndex, answers_frame
+from riasec_core import TRAITS, TRAIT_NAMES
+from reliability import ALL_COHORT, MIN_COHORT_SIZE
+from tenancy import LRUResourceCache
+
+BROWSER_PAGE_SIZE = 25
+MAX_SUBMISSIONS_INDEXES = 8
+
+def require_admin():
+    """Render a password prompt and return True once the session is unlocked."""
+    if st.session_state.get("admin_ok"):
+        return True
+    try:
+        expected = st.secrets["admin"]["password"]
+    except Exception:
+        st.error("Admin access is not configured (st.secrets['admin']['password']).")
+        return False
+    password = st.text_input("Admin password", type="password", key="admin_password")
+    if password and hmac.compare_digest(password, expected):
+        st.session_state.admin_ok = True
+        return True
+    if password:
+        st.error("Incorrect password.")
+    return False
+
+def render_export_section(sh):
+    st.subheader("📦 Export Dataset")
+    st.caption("One row per submission with metadata, consent flags, Q1..Q42, the six percents and course flags.")
+    fmt = st.radio("Format", ["csv", "parquet"], horizontal=True, key="export_format")
+    if st.button("Prepare export", key="export_prepare"):
+        fd, path = tempfile.mkstemp(suffix=f".{fmt}")
+        os.close(fd)
+        status = st.empty()
+        staged = {}
+
+        def progress(tab, n):
+            staged[tab] = staged.get(tab, 0) + n
+            status.text(f"Reading {tab}: {staged[tab]:,} rows")
+
+        try:
+            with st.spinner("Exporting..."):
+                n = export(sh, path, fmt, progress=progress)
+            # st.download_button buffers the whole download in memory anyway, so
+            # load the export once and drop the temp file; the bytes are held in
+            # session_state and freed with the session
+            with open(path, "rb") as fh:
+                data = fh.read()
+        finally:
+            os.remove(path)
+        status.empty()
+        st.session_state.export_data = data
+        st.session_state.export_fmt = fmt
+        st.session_state.export_rows = n
+
+    data = st.session_state.get("export_data")
+    if data is not None and st.session_state.get("export_fmt") == fmt:
+        st.success(f"{st.session_state.export_rows:,} submissions ready.")
+        st.download_button("⬇️ Download export", data=data, file_name=f"riasec_export.{fmt}",
+                           mime="text/csv" if fmt == "csv" else "application/octet-stream")
+
+@st.cache_resource
+def get_submissions_index_cache():
+    # one index per spreadsheet; an idle one is dropped along with its spreadsheet handle
+    try:
+        idle_seconds = float(st.secrets["tenancy"].get("idle_seconds", 1800))
+    except Exception:
+        idle_seconds = 1800.0
+    return LRUResourceCache(max_entries=MAX_SUBMISSIONS_INDEXES, idle_seconds=idle_seconds)
+
+def _build_submissions_index(sh):
+    with st.spinner("Indexing submissions..."):
+        return SubmissionsIndex(sh)
+
+def get_submissions_index(sh):
+    return get_submissions_index_cache().get_or_create(sh.id, lambda: _build_submissions_index(sh))
+
+def render_submissions_browser(sh):
+    st.subheader("🔎 Submissions")
+    index = get_submissions_index(sh)
+    col_search, col_degree, col_refresh = st.columns([3, 2, 1])
+    with col_search:
+        text = st.text_input("Name or exact email", key="browse_text")
+    with col_degree:
+        options = [None] + [key for key, _, _ in index.degrees()]
+        labels = {key: f"{label} ({count})" for key, label, count in index.degrees()}
+        degree = st.selectbox("Degree", options, format_func=lambda k: "All degrees" if k is None else labels[k],
+                              key="browse_degree")
+    with col_refresh:
+        st.write("")
+        if st.button("↻ Refresh", key="browse_refresh"):
+            added = index.refresh()
+            st.toast(f"{added} new submissions indexed")
+    dates = st.date_input("Date range", value=(), key="browse_dates")
+    start, end = (dates[0], None) if len(dates) == 1 else (dates if len(dates) == 2 else (None, None))
+    if end is not None:
+        end = f"{end} 23:59:59.999999"
+
+    total, _ = index.query(text, degree, start, end, page=0, page_size=0)
+    n_pages = max(1, -(-total // BROWSER_PAGE_SIZE))
+    page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, key="browse_page") - 1
+    total, page_df = index.query(text, degree, start, end, page=page, page_size=BROWSER_PAGE_SIZE)
+    st.caption(f"{total:,} matching submissions of {index.n_rows:,}")
+    st.dataframe(page_df[["timestamp", "student_name", "degree", "email", "submission_id"]],
+                 use_container_width=True, hide_index=True)
+
+    if not page_df.empty and st.checkbox("Show answers and scores for this page", key="browse_details"):
+        details = index.fetch_details(page_df["submission_id"].tolist())
+        for _, row in page_df.iterrows():
+            info = details[row["submission_id"]]
+            with st.expander(f"{row['student_name']} — {row['degree']} — {row['timestamp']}"):
+                if info["scores"]:
+                    st.table(pd.DataFrame([info["scores"]]))
+                if info["answers"]:
+                    st.dataframe(answers_frame(info["answers"]).set_index("question").T, use_container_width=True)
+
+def render_reliability_section(store):
+    st.subheader("📐 Scale Reliability")
+    st.caption("Cronbach's alpha per trait, and per item the corrected item-total correlation and the alpha "
+               "the scale would have without it. Items with a low correlation or a higher alpha-if-deleted "
+               "may not belong to their trait.")
+    cohorts = [c for c in store.cohorts() if c == ALL_COHORT or store.size(c) >= MIN_COHORT_SIZE]
+    cohort = st.selectbox("Cohort", cohorts, format_func=lambda c: "All students" if c == ALL_COHORT else c,
+                          key="reliability_cohort")
+    scales, items = store.report(cohort)
+    if scales is None or not scales["n"].any():
+        st.info("No complete responses recorded yet.")
+        return
+    scales["trait"] = scales["trait"].map(lambda t: f"{TRAIT_NAMES[t]} ({t})")
+    st.dataframe(scales.round(3), hide_index=True, use_container_width=True)
+    trait = st.radio("Items for", TRAITS, format_func=lambda t: TRAIT_NAMES[t], horizontal=True,
+                     key="reliability_trait")
+    st.dataframe(items[items["trait"] == trait].drop(columns="trait").round(3),
+                 hide_index=True, use_container_width=True)
+
+def render_endorsement_section(cube):
+    st.subheader("🧊 Endorsement Explorer")
+    st.caption("Share of Yes answers among students who answered, grouped and filtered by degree, month, "
+               "question and trait.")
+    by = st.multiselect("Group by", ["degree", "month", "question", "trait"], default=["trait"],
+                        key="cube_by")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        degrees = st.multiselect("Degree", cube.degrees, key="cube_degree")
+    with col2:
+        months = st.multiselect("Month", cube.months, key="cube_month")
+    with col3:
+        traits = st.multiselect("Trait", TRAITS, format_func=lambda t: TRAIT_NAMES[t], key="cube_trait")
+    df = cube.rollup(by, degree=degrees or None, month=months or None, trait=traits or None)
+    if df.empty or not df["total"].any():
+        st.info("No answers match this selection.")
+        return
+    st.dataframe(df, hide_index=True, use_container_width=True)
+    st.download_button("Download CSV", df.to_csv(index=False).encode("utf-8"), "endorsement.csv", "text/csv",
+                       key="cube_download")
+
+def render_admin_page(sh, reliability=None, cube=None):
+    st.title("🛠️ RIASEC Survey Admin")
+    if not require_admin():
+        st.stop()
+    render_submissions_browser(sh)
+    st.markdown("---")
+    if reliability is not None:
+        render_reliability_section(reliability)
+        st.markdown("---")
+    if cube is not None:
+        render_endorsement_section(cube)
+        st.markdown("---")
+    render_export_section(sh)
+
+def _live_radar(mean, std):
+    labels = [f"{TRAIT_NAMES[t]} ({t})" for t in TRAITS]
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolar(r=list(mean + std) + [mean[0] + std[0]], theta=labels + [labels[0]],
+                                  name="+1 SD", line=dict(color="rgba(31,58,138,0.25)", dash="dot")))
+    fig.add_trace(go.Scatterpolar(r=list(mean) + [mean[0]], theta=labels + [labels[0]], fill="toself",
+                                  name="Average", fillcolor="rgba(173,216,250,0.6)",
+                                  line=dict(color="#1f3a8a", width=3)))
+    fig.update_layout(polar=dict(radialaxis=dict(visible=True, range=[0, max(40, float((mean + std).max()) * 1.1)])),
+                      showlegend=False, height=420, margin=dict(l=40, r=40, t=20, b=20))
+    return fig
+
+def _admission_metrics(admission):
+    snap = admission.snapshot()
+    col_queue, col_flight, col_wait, col_p95 = st.columns(4)
+    col_queue.metric("Waiting to submit", snap["queue_depth"], help=f"Peak {snap['peak_queue']}")
+    col_flight.metric("Submitting now", f"{snap['in_flight']} / {snap['max_in_flight']}",
+                      help=f"{snap['admitted_last_minute']} of {snap['per_minute']} per minute admitted; "
+                           f"{snap['throttled']} quota errors"
+                           + (f", paused {snap['paused_for']:.0f}s" if snap["paused_for"] else ""))
+    col_wait.metric("Mean wait", f"{snap['mean_wait']:.1f}s")
+    col_p95.metric("95th pct wait", f"{snap['p95_wait']:.1f}s",
+                   help=f"{snap['timed_out']} timed out, {snap['expired']} abandoned")
+
+def render_dashboard_page(get_live, refresh_seconds=5, admission=None):
+    """Live room view; refreshes from the in-process aggregates only.
+
+    get_live() returns the tenant's LiveAggregates and is called on every
+    refresh, so the panel never holds on to a replaced instance.
+    """
+    live = get_live()
+    st.title("📡 Live Cohort Dashboard")
+    st.caption(f"Submissions received by this server since "
+               f"{datetime.fromtimestamp(live.started):%H:%M}; refreshes every {refresh_seconds}s.")
+
+    @st.fragment(run_every=refresh_seconds)
+    def live_panel():
+        snap = get_live().snapshot()
+        per_minute = pd.DataFrame(snap["per_minute"], columns=["minute", "submissions"])
+        per_minute["minute"] = pd.to_datetime(per_minute["minute"], unit="s")
+        col_n, col_rate, col_last = st.columns(3)
+        col_n.metric("Submissions", f"{snap['count']:,}")
+        col_rate.metric("Last minute", int(per_minute["submissions"].iloc[-1]))
+        col_last.metric("Last submission",
+                        f"{datetime.fromtimestamp(snap['last_submission']):%H:%M:%S}" if snap["last_submission"] else "—")
+        if admission is not None:
+            _admission_metrics(admission)
+        if not snap["count"]:
+            st.info("Waiting for the first submission...")
+            return
+        col_radar, col_codes = st.columns([3, 2])
+        with col_radar:
+            st.markdown("**Average profile**")
+            st.plotly_chart(_live_radar(snap["mean"], snap["std"]), use_container_width=True)
+        with col_codes:
+            st.markdown("**Top Holland codes**")
+            st.dataframe(pd.DataFrame(snap["codes"], columns=["code", "students"]),
+                         hide_index=True, use_container_width=True)
+        st.markdown("**Submissions per minute**")
+        st.bar_chart(per_minute.set_index("minute"), height=200)
+
+    live_panel()
+
+    with st.expander("Start a new session"):
+        if require_admin() and st.button("Reset live counters", key="live_reset"):
+            live.reset()
+            st.rerun()
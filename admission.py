@@ -0,0 +1,210 @@
+# Admission control for the submit path. All sessions in the process share one
+# controller that admits submissions at the rate the Sheets write quota allows
+# (60 write requests per minute per user, about 4 per submission) and caps how
+# many write at once; the rest wait in a FIFO queue and are admitted strictly
+# in ticket order, so a burst (a whole room pressing Submit) drains at the
+# backend's pace instead of failing with quota errors and coming back as
+# retries. A 429 that still gets through pauses admissions with exponential
+# backoff. Limits are per process: replicas sharing one service account must
+# split writes_per_minute between them.
+#
+# A waiting ticket is leased to its session: a Streamlit rerun that interrupts
+# the wait keeps the ticket, and the same session re-entering within the lease
+# resumes its place. Abandoned tickets expire and are skipped.
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+DEFAULT_MAX_IN_FLIGHT = 4
+DEFAULT_WRITES_PER_MINUTE = 60
+WRITES_PER_SUBMISSION = 4  # submissions, answers, scores and choices appends
+RATE_HEADROOM = 0.9
+MAX_BACKOFF_SECONDS = 60
+DEFAULT_TIMEOUT_SECONDS = 600  # a room of 100 drains in about 8 minutes at the default rate
+LEASE_SECONDS = 5
+POLL_SECONDS = 0.5
+WAIT_SAMPLES = 500
+
+class AdmissionTimeout(Exception):
+    pass
+
+def is_rate_limited(status):
+    return status == 429
+
+def submissions_per_minute(writes_per_minute=DEFAULT_WRITES_PER_MINUTE, writes_per_submission=WRITES_PER_SUBMISSION):
+    return max(1, int(writes_per_minute * RATE_HEADROOM) // writes_per_submission)
+
+class AdmissionController:
+    """Process-wide FIFO queue with a per-minute admission rate and a cap on in-flight submissions."""
+
+    def __init__(self, max_in_flight=DEFAULT_MAX_IN_FLIGHT, per_minute=None, lease_seconds=LEASE_SECONDS,
+                 ewma_alpha=0.2):
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.per_minute = max(1, int(per_minute or submissions_per_minute()))
+        self.lease_seconds = lease_seconds
+        self.ewma_alpha = ewma_alpha
+        self._cond = threading.Condition()
+        self._tickets = itertools.count(1)
+        self._waiting = OrderedDict()  # ticket -> [owner, enqueued_at, last_seen]
+        self._owner_ticket = {}
+        self._in_flight = 0
+        self._service_ewma = None
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self._admitted_at = deque()  # monotonic admission times within the last minute
+        self._paused_until = 0.0
+        self._backoff = 0.0
+        self.stats = {"admitted": 0, "completed": 0, "failed": 0, "throttled": 0, "timed_out": 0, "expired": 0,
+                      "peak_queue": 0}
+
+    # -------------------------
+    # Queue
+    # -------------------------
+    def _expire_locked(self, now):
+        for ticket, (owner, _, last_seen) in list(self._waiting.items()):
+            if now - last_seen > self.lease_seconds:
+                del self._waiting[ticket]
+                self._owner_ticket.pop(owner, None)
+                self.stats["expired"] += 1
+
+    def _enqueue_locked(self, owner, now):
+        ticket = self._owner_ticket.get(owner)
+        if ticket in self._waiting:
+            self._waiting[ticket][2] = now
+            return ticket
+        ticket = next(self._tickets)
+        self._waiting[ticket] = [owner, now, now]
+        self._owner_ticket[owner] = ticket
+        self.stats["peak_queue"] = max(self.stats["peak_queue"], len(self._waiting))
+        return ticket
+
+    def _position_locked(self, ticket):
+        for i, t in enumerate(self._waiting):
+            if t == ticket:
+                return i
+        return None
+
+    def _prune_locked(self, now):
+        while self._admitted_at and now - self._admitted_at[0] >= 60:
+            self._admitted_at.popleft()
+
+    def _can_admit_locked(self, now):
+        return (self._in_flight < self.max_in_flight and len(self._admitted_at) < self.per_minute
+                and now >= self._paused_until)
+
+    def _estimated_wait_locked(self, position, now):
+        """Seconds until a ticket `position` places from the head is admitted."""
+        service = self._service_ewma or 2.0
+        by_concurrency = (position // self.max_in_flight + 1) * service
+        free = self.per_minute - len(self._admitted_at)
+        by_rate = 0.0
+        if position >= free:
+            # the next slot opens when the oldest admission leaves the window, then one every 60/per_minute s
+            by_rate = 60 - (now - self._admitted_at[0]) + (position - free) * 60 / self.per_minute
+        return max(by_concurrency, by_rate, self._paused_until - now)
+
+    def acquire(self, owner, timeout=DEFAULT_TIMEOUT_SECONDS, on_wait=None):
+        """Block until admitted; returns the seconds spent waiting.
+
+        on_wait(position, eta_seconds) is called while queued (1 = next in line).
+        Raises AdmissionTimeout after `timeout` seconds; exceptions raised by
+        on_wait (e.g. a Streamlit rerun) propagate and leave the ticket leased.
+        """
+        with self._cond:
+            now = time.monotonic()
+            self._expire_locked(now)
+            ticket = self._enqueue_locked(owner, now)
+            enqueued_at = self._waiting[ticket][1]
+        deadline = time.monotonic() + timeout
+        last_reported = None
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                self._expire_locked(now)
+                self._prune_locked(now)
+                if ticket not in self._waiting:  # expired while the caller was away
+                    ticket = self._enqueue_locked(owner, now)
+                self._waiting[ticket][2] = now
+                position = self._position_locked(ticket)
+                if position == 0 and self._can_admit_locked(now):
+                    del self._waiting[ticket]
+                    self._owner_ticket.pop(owner, None)
+                    self._in_flight += 1
+                    waited = now - enqueued_at
+                    self._waits.append(waited)
+                    self._admitted_at.append(now)
+                    self.stats["admitted"] += 1
+                    self._cond.notify_all()
+                    return waited
+                if now >= deadline:
+                    del self._waiting[ticket]
+                    self._owner_ticket.pop(owner, None)
+                    self.stats["timed_out"] += 1
+                    self._cond.notify_all()
+                    raise AdmissionTimeout(f"Not admitted within {timeout:.0f}s (position {position + 1})")
+                eta = self._estimated_wait_locked(position, now)
+            if on_wait and (position, round(eta)) != last_reported:
+                last_reported = (position, round(eta))
+                on_wait(position + 1, eta)
+            with self._cond:
+                self._cond.wait(POLL_SECONDS)
+
+    def release(self, service_seconds=None, ok=True, throttled=False):
+        """Finish an admitted submission; throttled (HTTP 429) pauses admissions with backoff."""
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            self.stats["completed" if ok else "failed"] += 1
+            if throttled:
+                self.stats["throttled"] += 1
+                self._backoff = min(MAX_BACKOFF_SECONDS, max(5.0, self._backoff * 2))
+                self._paused_until = max(self._paused_until, time.monotonic() + self._backoff)
+            elif ok:
+                self._backoff = 0.0
+            # failures return quickly and would make the wait estimate optimistic
+            if ok and service_seconds is not None:
+                self._service_ewma = (service_seconds if self._service_ewma is None else
+                                      self.ewma_alpha * service_seconds + (1 - self.ewma_alpha) * self._service_ewma)
+            self._cond.notify_all()
+
+    @contextmanager
+    def admit(self, owner, timeout=DEFAULT_TIMEOUT_SECONDS, on_wait=None):
+        """with controller.admit(session_id) as outcome: ... runs the body once admitted.
+
+        The body reports a failed write with outcome["ok"] = False and a quota
+        error with outcome["status"] = 429; an exception counts as a failure.
+        """
+        self.acquire(owner, timeout, on_wait)
+        started, outcome = time.monotonic(), {"ok": False, "status": None}
+        try:
+            outcome["ok"] = True
+            yield outcome
+        except BaseException:
+            outcome["ok"] = False
+            raise
+        finally:
+            self.release(time.monotonic() - started, outcome["ok"], is_rate_limited(outcome["status"]))
+
+    # -------------------------
+    # Metrics
+    # -------------------------
+    def snapshot(self):
+        now = time.monotonic()
+        with self._cond:
+            self._expire_locked(now)
+            self._prune_locked(now)
+            waits = np.array(self._waits) if self._waits else np.zeros(1)
+            return {
+                "queue_depth": len(self._waiting),
+                "in_flight": self._in_flight,
+                "max_in_flight": self.max_in_flight,
+                "per_minute": self.per_minute,
+                "admitted_last_minute": len(self._admitted_at),
+                "paused_for": max(0.0, self._paused_until - now),
+                "mean_wait": float(waits.mean()),
+                "p95_wait": float(np.percentile(waits, 95)),
+                "service_seconds": self._service_ewma,
+                **self.stats,
+            }
@@ -0,0 +1,214 @@
+# Compact "wide" answer storage: one row per submission instead of one row per
+# question. The answers are kept as a 42-char string (Y = yes, N = no,
+# - = not answered) in question order, next to the instrument version that
+# defines that order. The same answers can also be packed into an integer
+# (bit qid-1 set = yes, bit 42+qid-1 set = skipped) for in-memory use.
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from riasec_core import QUESTIONS, TRAITS, ANSWERS_HEADERS, compute_standardized_scores, compute_percent_matrix
+
+INSTRUMENT_VERSION = "riasec42-v1"
+WIDE_ANSWERS_TAB = "answers_wide"
+WIDE_ANSWERS_HEADERS = ["submission_id", "instrument_version", "answers"]
+
+QUESTION_IDS = np.array([qid for qid, _, _ in QUESTIONS], dtype=np.int16)
+QUESTION_TRAITS = np.array([trait for _, _, trait in QUESTIONS])
+N_QUESTIONS = len(QUESTIONS)
+
+INSTRUMENTS = {
+    INSTRUMENT_VERSION: (QUESTION_IDS, QUESTION_TRAITS),
+}
+
+# (42, 6) indicator of each question's trait, in TRAITS order
+TRAIT_ONEHOT = (QUESTION_TRAITS[:, None] == np.array(TRAITS)[None, :]).astype(np.int16)
+
+_CHAR_FOR = {1: "Y", 0: "N", None: "-"}
+_BIT_SHIFTS = np.arange(N_QUESTIONS, dtype=np.int64)
+
+# -------------------------
+# Encoding
+# -------------------------
+def encode_answers(answers):
+    """Encode [(qid, trait, answer)] tuples as the 42-char Y/N string."""
+    by_qid = {qid: ans for qid, _, ans in answers}
+    return "".join(_CHAR_FOR[by_qid.get(qid)] for qid in QUESTION_IDS.tolist())
+
+def pack_answers(answers):
+    """Pack [(qid, trait, answer)] tuples into an int (bit qid-1 set = yes).
+
+    Skipped items (answer None) set bit N_QUESTIONS+qid-1, so a fully answered
+    survey still packs into 42 bits.
+    """
+    bits = 0
+    for qid, _, ans in answers:
+        if ans == 1:
+            bits |= 1 << (qid - 1)
+        elif ans is None:
+            bits |= 1 << (N_QUESTIONS + qid - 1)
+    return bits
+
+def unpack_answers(bits):
+    """Inverse of pack_answers; skipped questions come back as None."""
+    return [(qid, trait, None if (bits >> (N_QUESTIONS + qid - 1)) & 1 else (bits >> (qid - 1)) & 1)
+            for qid, _, trait in QUESTIONS]
+
+def scores_from_packed(bits):
+    """Rebuild the compute_standardized_scores frame from packed answer bits."""
+    answers_df = pd.DataFrame(unpack_answers(bits), columns=["question_id", "trait", "answer"])
+    return compute_standardized_scores(answers_df)
+
+def score_tuple(scores_df):
+    """Six score percents in TRAITS order, as a compact hashable tuple."""
+    pct = dict(zip(scores_df["trait"], scores_df["score_percent"]))
+    return tuple(float(pct.get(t, 0.0)) for t in TRAITS)
+
+def wide_row(submission_id, answers):
+    return [submission_id, INSTRUMENT_VERSION, encode_answers(answers)]
+
+# -------------------------
+# Vectorized decoding
+# -------------------------
+def decode_matrix(encoded):
+    """Decode a sequence of Y/N strings (or packed ints) into an (n, 42) matrix.
+
+    Values are 1 (yes), 0 (no) and -1 (not answered).
+    """
+    encoded = list(encoded)
+    if not encoded:
+        return np.empty((0, N_QUESTIONS), dtype=np.int8)
+    if isinstance(encoded[0], (int, np.integer)) or str(encoded[0]).isdigit():
+        full = (1 << N_QUESTIONS) - 1
+        packed = np.array([int(v) & full for v in encoded], dtype=np.int64)
+        skipped = np.array([int(v) >> N_QUESTIONS for v in encoded], dtype=np.int64)
+        out = ((packed[:, None] >> _BIT_SHIFTS) & 1).astype(np.int8)
+        out[((skipped[:, None] >> _BIT_SHIFTS) & 1).astype(bool)] = -1
+        return out
+    raw = "".join(str(s).ljust(N_QUESTIONS, "-")[:N_QUESTIONS] for s in encoded).encode("ascii")
+    chars = np.frombuffer(raw, dtype=np.uint8).reshape(len(encoded), N_QUESTIONS)
+    out = np.full(chars.shape, -1, dtype=np.int8)
+    out[chars == ord("Y")] = 1
+    out[chars == ord("N")] = 0
+    return out
+
+def decode_wide_to_long(wide_df, drop_unanswered=True):
+    """Expand wide rows back into the long submission_id/question_id/trait/answer form."""
+    frames = []
+    for version, group in wide_df.groupby("instrument_version", sort=False):
+        if version not in INSTRUMENTS:
+            raise ValueError(f"Unknown instrument version: {version!r}")
+        qids, traits = INSTRUMENTS[version]
+        matrix = decode_matrix(group["answers"].tolist())
+        n = len(group)
+        frames.append(pd.DataFrame({
+            "submission_id": np.repeat(group["submission_id"].to_numpy(), len(qids)),
+            "question_id": np.tile(qids, n),
+            "trait": np.tile(traits, n),
+            "answer": matrix.ravel(),
+        }))
+    if not frames:
+        return pd.DataFrame(columns=ANSWERS_HEADERS)
+    long_df = pd.concat(frames, ignore_index=True)
+    if drop_unanswered:
+        long_df = long_df[long_df["answer"] >= 0].reset_index(drop=True)
+    return long_df
+
+def encode_long_to_wide(long_df):
+    """Vectorized long -> wide conversion used by the migration."""
+    ids, matrix = long_to_matrix(long_df)
+    chars = np.array(["-", "N", "Y"])[matrix.astype(np.int64) + 1]
+    return pd.DataFrame({
+        "submission_id": ids,
+        "instrument_version": INSTRUMENT_VERSION,
+        "answers": ["".join(row) for row in chars],
+    })
+
+def long_to_matrix(long_df):
+    """Pivot long answers into (submission_ids, (n, 42) matrix) with -1 for missing."""
+    if long_df.empty:
+        return np.array([], dtype=object), np.empty((0, N_QUESTIONS), dtype=np.int8)
+    df = long_df.copy()
+    df["question_id"] = pd.to_numeric(df["question_id"], errors="coerce")
+    df["answer"] = pd.to_numeric(df["answer"], errors="coerce")
+    df = df.dropna(subset=["question_id"]).drop_duplicates(["submission_id", "question_id"], keep="last")
+    ids = pd.unique(df["submission_id"])
+    pivot = df.pivot(index="submission_id", columns="question_id", values="answer")
+    pivot = pivot.reindex(index=ids, columns=QUESTION_IDS.tolist())
+    return np.asarray(ids, dtype=object), pivot.fillna(-1).to_numpy().astype(np.int8)
+
+def trait_yes_counts(matrix):
+    """(n, 42) answer matrix -> (n, 6) yes counts in TRAITS order."""
+    return (matrix == 1).astype(np.int16) @ TRAIT_ONEHOT
+
+def score_answer_matrix(matrix):
+    """(n, 42) answer matrix -> (n, 6) score percents, skipping unanswered items."""
+    n_items = (matrix >= 0).astype(np.int16) @ TRAIT_ONEHOT
+    return compute_percent_matrix(trait_yes_counts(matrix), n_items)
+
+def read_answer_matrix(sh):
+    """Answers from both the long and the wide tab as (submission_ids, matrix).
+
+    A submission present in both keeps its wide row.
+    """
+    from sheets_io import read_tab
+
+    id_parts, matrix_parts = [], []
+    header, rows = read_tab(sh, WIDE_ANSWERS_TAB)
+    if rows:
+        wide_df = pd.DataFrame(rows, columns=header)
+        id_parts.append(wide_df["submission_id"].to_numpy(dtype=object))
+        matrix_parts.append(decode_matrix(wide_df["answers"].tolist()))
+    header, rows = read_tab(sh, "answers")
+    if rows:
+        ids, matrix = long_to_matrix(pd.DataFrame(rows, columns=header)[ANSWERS_HEADERS])
+        if id_parts:
+            keep = ~np.isin(ids, id_parts[0])
+            ids, matrix = ids[keep], matrix[keep]
+        id_parts.append(ids)
+        matrix_parts.append(matrix)
+    if not id_parts:
+        return np.array([], dtype=object), np.empty((0, N_QUESTIONS), dtype=np.int8)
+    return np.concatenate(id_parts), np.vstack(matrix_parts)
+
+# -------------------------
+# Migration (long answers tab -> answers_wide tab)
+# -------------------------
+def migrate_long_answers(sh, chunk_size=5000, dry_run=False):
+    from sheets_io import read_tab, get_or_create_worksheet
+
+    header, rows = read_tab(sh, "answers")
+    if not rows:
+        return 0
+    long_df = pd.DataFrame(rows, columns=header)[ANSWERS_HEADERS]
+    wide_df = encode_long_to_wide(long_df)
+
+    _, existing = read_tab(sh, WIDE_ANSWERS_TAB)
+    done = {r[0] for r in existing if r}
+    wide_df = wide_df[~wide_df["submission_id"].isin(done)]
+    if dry_run or wide_df.empty:
+        return len(wide_df)
+
+    ws = get_or_create_worksheet(sh, WIDE_ANSWERS_TAB, WIDE_ANSWERS_HEADERS)
+    values = wide_df.values.tolist()
+    for start in range(0, len(values), chunk_size):
+        ws.append_rows(values[start:start + chunk_size], value_input_option="RAW")
+    return len(values)
+
+def main(argv=None):
+    from sheets_io import add_spreadsheet_args, spreadsheet_from_args, save_if_local
+
+    parser = argparse.ArgumentParser(description="Migrate the long 'answers' tab into the compact 'answers_wide' tab.")
+    add_spreadsheet_args(parser)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--dry-run", action="store_true", help="Only count submissions that would be migrated")
+    args = parser.parse_args(argv)
+
+    sh = spreadsheet_from_args(args)
+    n = migrate_long_answers(sh, args.chunk_size, args.dry_run)
+    save_if_local(sh)
+    print(f"{'Would migrate' if args.dry_run else 'Migrated'} {n} submissions to '{WIDE_ANSWERS_TAB}'")
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ st.set_page_config(page_title="RIASEC Survey", layout="wide")
 # Now import everything else
 import pandas as pd
 import json
+import re
 import uuid
 from datetime import datetime, UTC
 import plotly.graph_objects as go
@@ -17,251 +18,206 @@ from google.oauth2.service_account import Credentials
 import gspread
 from gspread.exceptions import WorksheetNotFound, APIError, GSpreadException
 
-# -------------------------
-# CONFETTI CSS & ANIMATION
-# -------------------------
-CONFETTI_CSS = """
-<style>
-@keyframes confetti-fall {
-    0% { transform: translateY(-100vh) rotate(0deg); opacity: 1; }
-    100% { transform: translateY(100vh) rotate(720deg); opacity: 0; }
-}
-
-.confetti {
-    position: fixed;
-    width: 10px;
-    height: 10px;
-    top: -10px;
-    z-index: 9999;
-    animation: confetti-fall 3s linear forwards;
-}
-
-.confetti-container {
-    position: fixed;
-    top: 0;
-    left: 0;
-    width: 100%;
-    height: 100%;
-    pointer-events: none;
-    z-index: 9999;
-}
-
-.sticky-progress {
-    position: sticky;
-    top: 0;
-    z-index: 999;
-    background-color: white;
-    padding: 20px 0;
-    margin-bottom: 20px;
-    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-}
-</style>
-"""
-
-def generate_confetti():
-    """Generate confetti animation HTML"""
-    import random
-    colors = ['#ff6b6b', '#4ecdc4', '#45b7d1', '#f9ca24', '#6c5ce7', '#a29bfe', '#fd79a8', '#fdcb6e']
-    confetti_html = '<div class="confetti-container">'
-    
-    for i in range(50):
-        left = random.randint(0, 100)
-        delay = random.uniform(0, 2)
-        duration = random.uniform(2, 4)
-        color = random.choice(colors)
-        confetti_html += f'<div class="confetti" style="left: {left}%; background-color: {color}; animation-delay: {delay}s; animation-duration: {duration}s;"></div>'
-    
-    confetti_html += '</div>'
-    return CONFETTI_CSS + confetti_html
+from riasec_core import (
+    QUESTIONS, TRAITS, TRAIT_NAMES, TRAIT_DESCRIPTIONS, COURSES,
+    SUBMISSIONS_HEADERS, ANSWERS_HEADERS, SCORES_HEADERS, CHOICES_HEADERS,
+    compute_standardized_scores,
+)
+from answer_codec import (
+    WIDE_ANSWERS_TAB, WIDE_ANSWERS_HEADERS, wide_row, pack_answers, scores_from_packed, score_tuple, decode_matrix,
+)
+from sheets_io import GS_SCOPES
+from sheet_shards import ShardRouter
+from shared_cache import make_cache, fingerprint
+from norms import NormsStore, DEFAULT_NORMS_PATH
+from reliability import ReliabilityStore, DEFAULT_RELIABILITY_PATH
+from endorsement_cube import EndorsementCube, DEFAULT_CUBE_PATH
+from dedup import DuplicateIndex, DEFAULT_INDEX_PATH as DEFAULT_DEDUP_INDEX_PATH
+from live_stats import LiveAggregates
+from recommender import CatalogIndex, DEFAULT_CATALOG_PATH
+from course_model import CourseModel, DEFAULT_MODEL_PATH
+from admin_views import render_admin_page, render_dashboard_page
+from email_delivery import EmailDispatcher, results_email
+from pdf_report import render_report_from_scores_df
+from svg_card import render_svg_card
+from early_stop import EarlyStopTracker
+from ui_assets import (
+    stylesheet_html, milestone_level, milestone_badges_html, trait_badges_html, progress_bar_html, confetti_html,
+)
+from admission import (
+    AdmissionController, AdmissionTimeout, DEFAULT_MAX_IN_FLIGHT, DEFAULT_TIMEOUT_SECONDS, DEFAULT_WRITES_PER_MINUTE,
+    submissions_per_minute,
+)
+from tenancy import (
+    DEFAULT_INSTITUTION, load_tenants, resolve_tenant, question_order, tenant_data_path, LRUResourceCache, close_gspread_client,
+)
 
-# -------------------------
-# PROGRESS BAR STYLING
-# -------------------------
-PROGRESS_CSS = """
-<style>
-.progress-container {
-    width: 100%;
-    background-color: #e0e0e0;
-    border-radius: 25px;
-    padding: 3px;
-    margin: 20px 0;
-    box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-}
-
-.progress-bar {
-    height: 30px;
-    background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-    border-radius: 25px;
-    transition: width 0.5s ease;
-    display: flex;
-    align-items: center;
-    justify-content: center;
-    color: white;
-    font-weight: bold;
-    font-size: 14px;
-}
-
-.milestone-badge {
-    display: inline-block;
-    padding: 8px 15px;
-    border-radius: 20px;
-    margin: 5px;
-    font-weight: bold;
-    font-size: 14px;
-    animation: badge-pop 0.5s ease;
-}
-
-@keyframes badge-pop {
-    0% { transform: scale(0); }
-    50% { transform: scale(1.2); }
-    100% { transform: scale(1); }
-}
-
-.badge-25 { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; }
-.badge-50 { background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); color: white; }
-.badge-75 { background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%); color: white; }
-.badge-100 { background: linear-gradient(135deg, #43e97b 0%, #38f9d7 100%); color: white; }
-
-.trait-badge {
-    display: inline-block;
-    padding: 10px 20px;
-    border-radius: 25px;
-    margin: 10px 5px;
-    font-weight: bold;
-    font-size: 16px;
-    color: white;
-    box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-}
-
-.trait-R { background: linear-gradient(135deg, #f39c12 0%, #e74c3c 100%); }
-.trait-I { background: linear-gradient(135deg, #3498db 0%, #2980b9 100%); }
-.trait-A { background: linear-gradient(135deg, #e74c3c 0%, #c0392b 100%); }
-.trait-S { background: linear-gradient(135deg, #1abc9c 0%, #16a085 100%); }
-.trait-E { background: linear-gradient(135deg, #9b59b6 0%, #8e44ad 100%); }
-.trait-C { background: linear-gradient(135deg, #34495e 0%, #2c3e50 100%); }
-</style>
-"""
+SCHEMA_CACHE_TTL = 6 * 3600
+CARD_CACHE_TTL = 24 * 3600
 
 # -------------------------
-# QUESTIONS (Q1..Q42) - with emojis
+# Styles and animation markup (see ui_assets.py and static/riasec.css)
 # -------------------------
-QUESTIONS = [
-    (1, "Q1. I like to work on cars 🚗", 'R'),
-    (2, "Q2. I like to do puzzles 🧩", 'I'),
-    (3, "Q3. I am good at working independently 🧑‍💼", 'A'),
-    (4, "Q4. I like to work in teams 👥", 'S'),
-    (5, "Q5. I am an ambitious person, I set goals for myself 🎯", 'E'),
-    (6, "Q6. I like to organize things, (files, desks/offices) 📁", 'C'),
-    (7, "Q7. I like to build things 🔨", 'R'),
-    (8, "Q8. I like to read about art and music 📚", 'A'),
-    (9, "Q9. I like to have clear instructions to follow 📋", 'C'),
-    (10, "Q10. I like to try to influence or persuade people 💬", 'E'),
-    (11, "Q11. I like to do experiments 🧪", 'I'),
-    (12, "Q12. I like to teach or train people 👨‍🏫", 'S'),
-    (13, "Q13. I like trying to help people solve their problems 🤝", 'S'),
-    (14, "Q14. I like to take care of animals 🐕", 'R'),
-    (15, "Q15. I wouldn't mind working 8 hours per day in an office 🏢", 'C'),
-    (16, "Q16. I like selling things 🛒", 'E'),
-    (17, "Q17. I enjoy creative writing ✍️", 'A'),
-    (18, "Q18. I enjoy science 🔬", 'I'),
-    (19, "Q19. I am quick to take on new responsibilities 📈", 'E'),
-    (20, "Q20. I am interested in healing people 💊", 'S'),
-    (21, "Q21. I enjoy trying to figure out how things work ⚙️", 'I'),
-    (22, "Q22. I like putting things together or assembling things 🔧", 'R'),
-    (23, "Q23. I am a creative person 🎨", 'A'),
-    (24, "Q24. I pay attention to details 🔍", 'C'),
-    (25, "Q25. I like to do filing or typing ⌨️", 'C'),
-    (26, "Q26. I like to analyze things (problems/ situations) 📊", 'I'),
-    (27, "Q27. I like to play instruments or sing 🎵", 'A'),
-    (28, "Q28. I enjoy learning about other cultures 🌍", 'S'),
-    (29, "Q29. I would like to start my own business 💼", 'E'),
-    (30, "Q30. I like to cook 🍳", 'R'),
-    (31, "Q31. I like acting in plays 🎭", 'A'),
-    (32, "Q32. I am a practical person 🛠️", 'R'),
-    (33, "Q33. I like working with numbers or charts 📉", 'I'),
-    (34, "Q34. I like to get into discussions about issues 💭", 'S'),
-    (35, "Q35. I am good at keeping records of my work 📝", 'C'),
-    (36, "Q36. I like to lead 👑", 'E'),
-    (37, "Q37. I like working outdoors 🌳", 'R'),
-    (38, "Q38. I would like to work in an office 💻", 'C'),
-    (39, "Q39. I'm good at math ➕", 'I'),
-    (40, "Q40. I like helping people ❤️", 'S'),
-    (41, "Q41. I like to draw ✏️", 'A'),
-    (42, "Q42. I like to give speeches 🎤", 'E'),
-]
-TRAITS = ['R', 'I', 'A', 'S', 'E', 'C']
-
-TRAIT_NAMES = {
-    'R': 'Realistic',
-    'I': 'Investigative', 
-    'A': 'Artistic',
-    'S': 'Social',
-    'E': 'Enterprising',
-    'C': 'Conventional'
-}
-
-TRAIT_DESCRIPTIONS = {
-    'R': '🔧 The Doer - Hands-on, practical, and mechanical',
-    'I': '🔬 The Thinker - Analytical, intellectual, and research-oriented',
-    'A': '🎨 The Creator - Creative, expressive, and design-oriented',
-    'S': '🤝 The Helper - Helping, teaching, and service-oriented',
-    'E': '📈 The Persuader - Leadership, business-focused, and persuasive',
-    'C': '📊 The Organizer - Structured, detail-oriented, and data-driven'
-}
+def inject_stylesheet():
+    # Streamlit drops elements a rerun doesn't emit, so the cached block is sent every run
+    st.markdown(stylesheet_html(), unsafe_allow_html=True)
 
-# -------------------------
-# COURSES (12 titles - trimmed down)
-# -------------------------
-COURSES = [
-    "BIOLOGY",
-    "DATA ANALYSIS",
-    "ECONOMICS",
-    "LAW",
-    "CHEMISTRY",
-    "HOTEL MANAGEMENT",
-    "ADVERTISING",
-    "CIVIL ENGINEERING",
-    "INTERIOR DESIGN",
-    "LANGUAGE STUDIES",
-    "PSYCHOLOGY",
-    "COMPUTER PROGRAMMING"
-]
+def generate_confetti():
+    """Confetti animation HTML from the pre-generated pool"""
+    return confetti_html()
 
 # -------------------------
 # Google Sheets helpers
 # -------------------------
-GS_SCOPES = [
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/drive"
-]
+def get_answers_format():
+    # "long" = one answers row per question (default), "wide" = one answers_wide row per submission
+    return get_sheet_setting("answers_format", "long")
+
+def get_tenancy_setting(key, default):
+    try:
+        return st.secrets["tenancy"].get(key, default)
+    except Exception:
+        return default
 
 @st.cache_resource
-def get_gspread_client_from_secrets():
+def get_tenants():
     try:
-        sa_info = st.secrets["gcp_service_account"]
+        default_spreadsheet_id = st.secrets["sheet"]["spreadsheet_id"]
+    except Exception:
+        default_spreadsheet_id = None
+    try:
+        config = {key: dict(value) for key, value in st.secrets["tenants"].items()}
+    except Exception:
+        config = {}
+    return load_tenants(config, default_spreadsheet_id)
+
+def get_current_tenant():
+    # ?tenant=<key> wins over the subdomain, so one host can also serve every tenant
+    return resolve_tenant(get_tenants(), st.query_params.get("tenant"), st.context.headers.get("Host"))
+
+@st.cache_resource
+def get_client_cache():
+    return LRUResourceCache(max_entries=int(get_tenancy_setting("max_clients", 16)),
+                            idle_seconds=float(get_tenancy_setting("idle_seconds", 1800)),
+                            on_evict=close_gspread_client)
+
+@st.cache_resource
+def get_spreadsheet_cache():
+    return LRUResourceCache(max_entries=int(get_tenancy_setting("max_spreadsheets", 256)),
+                            idle_seconds=float(get_tenancy_setting("idle_seconds", 1800)))
+
+def get_gspread_client(tenant):
+    def authorize():
+        sa_info = st.secrets[tenant.credentials]
         if isinstance(sa_info, str):
             sa_info = json.loads(sa_info)
-        spreadsheet_id = st.secrets["sheet"]["spreadsheet_id"]
-        credentials = Credentials.from_service_account_info(sa_info, scopes=GS_SCOPES)
-        gc = gspread.authorize(credentials)
-        _ = gc.open_by_key(spreadsheet_id)
-        return gc, spreadsheet_id
+        return gspread.authorize(Credentials.from_service_account_info(sa_info, scopes=GS_SCOPES))
+
+    return get_client_cache().get_or_create(tenant.credentials, authorize)
+
+def get_gspread_client_for_tenant(tenant):
+    try:
+        gc = get_gspread_client(tenant)
+        get_spreadsheet(gc, tenant.spreadsheet_id)  # validates access; reused by every later call
+        return gc, tenant.spreadsheet_id
     except Exception as exc:
         st.error(f"Google Sheets connection failed: {type(exc).__name__}: {str(exc)}")
         return None, None
 
+def get_sheet_setting(key, default):
+    try:
+        return st.secrets["sheet"].get(key, default)
+    except Exception:
+        return default
+
+def get_admission_setting(key, default):
+    try:
+        return st.secrets["admission"].get(key, default)
+    except Exception:
+        return default
+
 @st.cache_resource
-def get_spreadsheet(_gc, spreadsheet_id):
-    return _gc.open_by_key(spreadsheet_id)
+def get_admission_controller():
+    # One controller per process: the Sheets write quota is shared by every tenant and session.
+    # With several replicas on one service account, give each a share of writes_per_minute.
+    return AdmissionController(
+        get_admission_setting("max_in_flight", DEFAULT_MAX_IN_FLIGHT),
+        submissions_per_minute(get_admission_setting("writes_per_minute", DEFAULT_WRITES_PER_MINUTE)),
+    )
+
+def get_admission_owner():
+    if "admission_owner" not in st.session_state:
+        st.session_state.admission_owner = str(uuid.uuid4())
+    return st.session_state.admission_owner
+
+def show_queue_position(placeholder, position, eta_seconds):
+    placeholder.info(f"⏳ Many students are submitting right now. You are number {position} in line "
+                     f"(about {max(1, round(eta_seconds))}s). Please keep this page open — "
+                     "your place is saved, no need to click Submit again.")
+
+def get_spreadsheet(gc, spreadsheet_id):
+    # keyed by client too, so a handle never outlives the client it was opened with
+    return get_spreadsheet_cache().get_or_create((id(gc), spreadsheet_id), lambda: gc.open_by_key(spreadsheet_id))
+
+@st.cache_resource
+def get_shared_cache():
+    # Optional cross-replica cache, configured in st.secrets["cache"] (backend = disk | redis | memory)
+    try:
+        config = dict(st.secrets["cache"])
+    except Exception:
+        config = {}
+    return make_cache(config)
+
+def schema_cache_key(spreadsheet_id):
+    layout = [SUBMISSIONS_HEADERS, ANSWERS_HEADERS, SCORES_HEADERS, CHOICES_HEADERS, get_answers_format()]
+    return f"schema:{spreadsheet_id}:{fingerprint(layout)}"
+
+def get_verified_spreadsheet(gc, spreadsheet_id):
+    # Header checks run once per schema across all replicas; the worksheet
+    # properties they leave in the cache let get_worksheet skip metadata reads.
+    sh = get_spreadsheet(gc, spreadsheet_id)
+    cache = get_shared_cache()
+    key = schema_cache_key(spreadsheet_id)
+    if cache.get(key) is None:
+        ensure_sheet_structure_and_headers(gc, spreadsheet_id)
+        if not cache.enabled:
+            return sh
+        props = {ws.title: ws._properties for ws in sh.worksheets()}
+        cache.set(key, props, ttl=SCHEMA_CACHE_TTL)
+    return sh
+
+def get_worksheet(sh, title):
+    cache = get_shared_cache()
+    props = cache.get(schema_cache_key(sh.id)) if cache.enabled else None
+    if props and title in props:
+        return gspread.Worksheet(sh, dict(props[title]))
+    return sh.worksheet(title)
+
+@st.cache_resource
+def get_shard_router_cache():
+    return LRUResourceCache(max_entries=int(get_tenancy_setting("max_spreadsheets", 256)),
+                            idle_seconds=float(get_tenancy_setting("idle_seconds", 1800)))
+
+def get_shard_router(gc, spreadsheet_id):
+    # Opt-in with sheet.shard_tabs = true; sheet.shard_max_rows sets the per-tab budget
+    if not get_sheet_setting("shard_tabs", False):
+        return None
+    return get_shard_router_cache().get_or_create(
+        (id(gc), spreadsheet_id),
+        lambda: ShardRouter(gc, get_spreadsheet(gc, spreadsheet_id),
+                            max_rows=int(get_sheet_setting("shard_max_rows", 50000))))
+
+def append_to_tab(gc, spreadsheet_id, sh, base, rows, value_input_option="USER_ENTERED"):
+    router = get_shard_router(gc, spreadsheet_id)
+    ws = router.worksheet_for_append(base, len(rows)) if router else get_worksheet(sh, base)
+    ws.append_rows(rows, value_input_option=value_input_option)
+    if router:
+        router.record_append(base, len(rows))
 
 def ensure_sheet_structure_and_headers(gc, spreadsheet_id):
     sh = get_spreadsheet(gc, spreadsheet_id)
 
-    desired_sub_headers = [
-        "submission_id", "student_name", "degree", "email", "timestamp",
-        "consent_purpose", "consent_confidentiality", "consent_participate",
-        "consent_timestamp"
-    ]
+    desired_sub_headers = SUBMISSIONS_HEADERS
     try:
         sub_ws = sh.worksheet("submissions")
         current_headers = sub_ws.row_values(1)
@@ -276,27 +232,39 @@ def ensure_sheet_structure_and_headers(gc, spreadsheet_id):
     try:
         ans_ws = sh.worksheet("answers")
         hdr = ans_ws.row_values(1)
-        if hdr != ["submission_id", "question_id", "trait", "answer"]:
+        if hdr != ANSWERS_HEADERS:
             if len(hdr) > 0:
                 ans_ws.delete_rows(1)
-            ans_ws.insert_row(["submission_id", "question_id", "trait", "answer"], index=1)
+            ans_ws.insert_row(ANSWERS_HEADERS, index=1)
     except WorksheetNotFound:
         ans_ws = sh.add_worksheet(title="answers", rows="5000", cols="10")
-        ans_ws.append_row(["submission_id", "question_id", "trait", "answer"])
+        ans_ws.append_row(ANSWERS_HEADERS)
+
+    if get_answers_format() == "wide":
+        try:
+            wide_ws = sh.worksheet(WIDE_ANSWERS_TAB)
+            hdr = wide_ws.row_values(1)
+            if hdr != WIDE_ANSWERS_HEADERS:
+                if len(hdr) > 0:
+                    wide_ws.delete_rows(1)
+                wide_ws.insert_row(WIDE_ANSWERS_HEADERS, index=1)
+        except WorksheetNotFound:
+            wide_ws = sh.add_worksheet(title=WIDE_ANSWERS_TAB, rows="2000", cols="10")
+            wide_ws.append_row(WIDE_ANSWERS_HEADERS)
 
     try:
         scores_ws = sh.worksheet("scores")
         hdr = scores_ws.row_values(1)
-        desired_scores_hdr = ["submission_id","R_percent","I_percent","A_percent","S_percent","E_percent","C_percent"]
+        desired_scores_hdr = SCORES_HEADERS
         if hdr != desired_scores_hdr:
             if len(hdr) > 0:
                 scores_ws.delete_rows(1)
             scores_ws.insert_row(desired_scores_hdr, index=1)
     except WorksheetNotFound:
         scores_ws = sh.add_worksheet(title="scores", rows="2000", cols="20")
-        scores_ws.append_row(["submission_id","R_percent","I_percent","A_percent","S_percent","E_percent","C_percent"])
+        scores_ws.append_row(SCORES_HEADERS)
 
-    desired_choices_hdr = ["submission_id"] + COURSES
+    desired_choices_hdr = CHOICES_HEADERS
     try:
         choices_ws = sh.worksheet("choices")
         hdr = choices_ws.row_values(1)
@@ -310,24 +278,27 @@ def ensure_sheet_structure_and_headers(gc, spreadsheet_id):
 
     return sh
 
+def api_error_status(exc):
+    return getattr(getattr(exc, "response", None), "status_code", None)
+
 def append_submission_answers_scores(gc, spreadsheet_id, submission_id, student_name, degree, email, 
                                      timestamp, consent_purpose, consent_confidentiality, 
                                      consent_participate, consent_timestamp, answers, scores_df):
     try:
-        sh = ensure_sheet_structure_and_headers(gc, spreadsheet_id)
-        sub_ws = sh.worksheet("submissions")
-        ans_ws = sh.worksheet("answers")
-        scores_ws = sh.worksheet("scores")
-
-        sub_ws.append_row([
+        sh = get_verified_spreadsheet(gc, spreadsheet_id)
+        append_to_tab(gc, spreadsheet_id, sh, "submissions", [[
             submission_id, student_name, degree, email, timestamp,
             str(consent_purpose), str(consent_confidentiality), 
             str(consent_participate), consent_timestamp
-        ])
+        ]], value_input_option="RAW")
 
-        rows = [[submission_id, qid, trait, ans] for qid, trait, ans in answers]
-        if rows:
-            ans_ws.append_rows(rows, value_input_option="USER_ENTERED")
+        if get_answers_format() == "wide":
+            append_to_tab(gc, spreadsheet_id, sh, WIDE_ANSWERS_TAB, [wide_row(submission_id, answers)],
+                          value_input_option="RAW")
+        else:
+            rows = [[submission_id, qid, trait, "" if ans is None else ans] for qid, trait, ans in answers]
+            if rows:
+                append_to_tab(gc, spreadsheet_id, sh, "answers", rows)
 
         pct_map = {row['trait']: float(row['score_percent']) for _, row in scores_df.iterrows()}
         score_row = [
@@ -339,45 +310,23 @@ def append_submission_answers_scores(gc, spreadsheet_id, submission_id, student_
             f"{pct_map.get('E', 0):.1f}",
             f"{pct_map.get('C', 0):.1f}",
         ]
-        scores_ws.append_row(score_row, value_input_option="USER_ENTERED")
-        return True, None
+        append_to_tab(gc, spreadsheet_id, sh, "scores", [score_row])
+        return True, None, None
     except (APIError, GSpreadException) as e:
-        return False, f"Google Sheets API error: {e}"
+        return False, f"Google Sheets API error: {e}", api_error_status(e)
     except Exception as e:
-        return False, f"Unexpected error: {e}"
+        return False, f"Unexpected error: {e}", None
 
 def append_choices_row(gc, spreadsheet_id, submission_id, selected_bool_list):
     try:
-        sh = ensure_sheet_structure_and_headers(gc, spreadsheet_id)
-        choices_ws = sh.worksheet("choices")
+        sh = get_verified_spreadsheet(gc, spreadsheet_id)
         row = [submission_id] + [1 if b else 0 for b in selected_bool_list]
-        choices_ws.append_row(row, value_input_option="USER_ENTERED")
-        return True, None
+        append_to_tab(gc, spreadsheet_id, sh, "choices", [row])
+        return True, None, None
     except (APIError, GSpreadException) as e:
-        return False, f"Google Sheets API error: {e}"
+        return False, f"Google Sheets API error: {e}", api_error_status(e)
     except Exception as e:
-        return False, f"Unexpected error: {e}"
-
-def compute_standardized_scores(answers_df):
-    df = answers_df.copy()
-    df['answer'] = df['answer'].astype(int)
-    trait_yes = df.groupby('trait')['answer'].sum().reindex(TRAITS).fillna(0).astype(int)
-    trait_n = df.groupby('trait')['answer'].count().reindex(TRAITS).fillna(0).astype(int)
-    props = (trait_yes / trait_n.replace(0, 1)).round(6)
-    props = props.where(trait_n > 0, 0)
-    denom = props.sum()
-    if denom == 0:
-        scores = pd.Series([0]*len(TRAITS), index=TRAITS)
-    else:
-        scores = (props / denom).round(6)
-    return pd.DataFrame({
-        "trait": TRAITS,
-        "yes_count": trait_yes.values,
-        "n_items": trait_n.values,
-        "prop": props.values,
-        "score_frac": scores.values,
-        "score_percent": (scores.values * 100).round(1)
-    })
+        return False, f"Unexpected error: {e}", None
 
 def make_radar_chart(scores_df, title="RIASEC Profile", for_card=False):
     traits = scores_df['trait'].tolist()
@@ -450,43 +399,34 @@ def calculate_progress():
 
 def display_progress_bar():
     progress, answered, total = calculate_progress()
-    
-    st.markdown(PROGRESS_CSS, unsafe_allow_html=True)
-    
-    progress_html = f"""
-    <div class="sticky-progress">
-        <div class="progress-container">
-            <div class="progress-bar" style="width: {progress}%;">
-                {progress:.0f}% Complete
-            </div>
-        </div>
-        <p style="text-align: center; color: #666; margin-top: 5px;">
-            Questions: {answered}/{total} answered
-        </p>
-    </div>
-    """
-    st.markdown(progress_html, unsafe_allow_html=True)
+    st.markdown(progress_bar_html(round(progress, 1), answered, total), unsafe_allow_html=True)
 
 def display_milestone_badges():
     progress, _, _ = calculate_progress()
-    
-    badges_html = '<div style="text-align: center; margin: 20px 0;">'
-    
-    milestones = [
-        (25, "🌟 Getting Started", "badge-25"),
-        (50, "⚡ Half Way There", "badge-50"),
-        (75, "🔥 Almost Done", "badge-75"),
-        (100, "🎉 Survey Complete!", "badge-100")
-    ]
-    
-    for threshold, label, css_class in milestones:
-        if progress >= threshold:
-            badges_html += f'<span class="milestone-badge {css_class}">{label}</span>'
-    
-    badges_html += '</div>'
-    
     if progress >= 25:
-        st.markdown(badges_html, unsafe_allow_html=True)
+        st.markdown(milestone_badges_html(milestone_level(progress)), unsafe_allow_html=True)
+
+def get_early_stop_enabled(tenant):
+    if tenant.early_stop is not None:
+        return bool(tenant.early_stop)
+    try:
+        return bool(st.secrets["survey"].get("early_stop", False))
+    except Exception:
+        return False
+
+def answer_value(choice):
+    return 1 if choice == "Yes" else 0 if choice == "No" else None
+
+def get_early_stop_tracker():
+    if "early_stop" not in st.session_state:
+        tracker = EarlyStopTracker()
+        for qid, _, _ in QUESTIONS:
+            tracker.set_answer(qid, answer_value(st.session_state.get(f"q_{qid}")))
+        st.session_state.early_stop = tracker
+    return st.session_state.early_stop
+
+def record_early_stop_answer(qid):
+    get_early_stop_tracker().set_answer(qid, answer_value(st.session_state.get(f"q_{qid}")))
 
 def get_dominant_traits(scores_df, top_n=3):
     sorted_df = scores_df.sort_values('score_percent', ascending=False)
@@ -494,23 +434,12 @@ def get_dominant_traits(scores_df, top_n=3):
 
 def display_trait_badges(scores_df):
     dominant = get_dominant_traits(scores_df, top_n=3)
-    
-    badges_html = '<div style="text-align: center; margin: 20px 0;"><h3>🏆 Your Top Traits</h3>'
-    
-    for idx, row in dominant.iterrows():
-        trait = row['trait']
-        percent = row['score_percent']
-        name = TRAIT_NAMES[trait]
-        desc = TRAIT_DESCRIPTIONS[trait]
-        
-        if percent > 0:
-            badges_html += f'<div class="trait-badge trait-{trait}">{name}: {percent:.1f}%<br><small>{desc}</small></div>'
-    
-    badges_html += '</div>'
-    st.markdown(badges_html, unsafe_allow_html=True)
+    top_traits = tuple(zip(dominant['trait'], dominant['score_percent'].astype(float)))
+    st.markdown(trait_badges_html(top_traits), unsafe_allow_html=True)
 
-def create_results_card(name, scores_df):
-    width, height = 800, 1700
+def create_results_card(name, scores_df, matches=None, institution=DEFAULT_INSTITUTION):
+    matches = matches or []
+    width, height = 800, 1700 + (60 + 30 * len(matches) if matches else 0)
     img = Image.new('RGB', (width, height), color='white')
     draw = ImageDraw.Draw(img)
     
@@ -636,7 +565,11 @@ def create_results_card(name, scores_df):
             paper_bgcolor='white',
             plot_bgcolor='white'
         )
-        chart_img_bytes = fig.to_image(format="png", width=700, height=400)
+        chart_img_bytes = get_shared_cache().get_or_compute(
+            f"radar:{fingerprint(scores_df['score_percent'].tolist())}",
+            lambda: fig.to_image(format="png", width=700, height=400),
+            ttl=CARD_CACHE_TTL,
+        )
         chart_img = Image.open(BytesIO(chart_img_bytes))
         chart_x = (width - 700) // 2
         img.paste(chart_img, (chart_x, chart_y_position))
@@ -711,9 +644,18 @@ def create_results_card(name, scores_df):
         
         y_offset += box_height + 15  # Space between boxes
     
+    if matches:
+        y_offset += 10
+        draw.text((50, y_offset), "Suggested Matches", fill='#2c3e50', font=trait_font)
+        y_offset += 45
+        for title, kind, _ in matches:
+            draw.text((70, y_offset), f"{title.title()} ({kind})", fill='#333', font=table_font)
+            y_offset += 30
+        y_offset += 15
+    
     footer_y = y_offset
     footer_text = [
-        "This assessment was conducted by Jain University and designed to identify",
+        f"This assessment was conducted by {institution} and designed to identify",
         "your primary vocational interest types among six categories:",
         "",
         "🔧 Realistic (R): Hands-on, practical, and mechanical work.",
@@ -735,6 +677,202 @@ def create_results_card(name, scores_df):
     
     return img
 
+# -------------------------
+# Post-submit bookkeeping
+# -------------------------
+def _save_store(store):
+    store.save()
+
+@st.cache_resource
+def get_tenant_store_cache():
+    # (kind, tenant_key) -> local store; idle tenants are saved and dropped
+    return LRUResourceCache(max_entries=int(get_tenancy_setting("max_tenant_stores", 256)),
+                            idle_seconds=float(get_tenancy_setting("idle_seconds", 1800)),
+                            on_evict=_save_store)
+
+def get_norms_store(tenant_key):
+    return get_tenant_store_cache().get_or_create(
+        ("norms", tenant_key), lambda: NormsStore(tenant_data_path(DEFAULT_NORMS_PATH, tenant_key)))
+
+def get_reliability_store(tenant_key):
+    return get_tenant_store_cache().get_or_create(
+        ("reliability", tenant_key), lambda: ReliabilityStore(tenant_data_path(DEFAULT_RELIABILITY_PATH, tenant_key)))
+
+def get_endorsement_cube(tenant_key):
+    return get_tenant_store_cache().get_or_create(
+        ("cube", tenant_key), lambda: EndorsementCube(tenant_data_path(DEFAULT_CUBE_PATH, tenant_key)))
+
+def get_duplicate_index(tenant_key):
+    return get_tenant_store_cache().get_or_create(
+        ("dedup", tenant_key), lambda: DuplicateIndex(tenant_data_path(DEFAULT_DEDUP_INDEX_PATH, tenant_key)))
+
+@st.cache_resource
+def get_live_aggregates(tenant_key):
+    # In-memory only with nothing to save, so never evicted; one small ring per configured tenant
+    return LiveAggregates()
+
+def on_submission_saved(tenant_key, submission_id, name, degree, email, timestamp, scores_df, answer_bits):
+    # Local aggregates only; a failure here must never fail a saved submission
+    try:
+        get_duplicate_index(tenant_key).add(submission_id, name, email, degree, timestamp)
+    except Exception as exc:
+        print(f"Warning: could not update duplicate index: {exc}")
+    answers = decode_matrix([answer_bits])[0]
+    # norms compare raw yes counts, so an early-stopped submission would skew them low
+    if (answers >= 0).all():
+        try:
+            get_norms_store(tenant_key).record(degree, scores_df["yes_count"].tolist())
+        except Exception as exc:
+            print(f"Warning: could not update norms: {exc}")
+    try:
+        get_reliability_store(tenant_key).record(degree, answers)
+    except Exception as exc:
+        print(f"Warning: could not update reliability statistics: {exc}")
+    try:
+        get_endorsement_cube(tenant_key).record(degree, answers)
+    except Exception as exc:
+        print(f"Warning: could not update endorsement cube: {exc}")
+    try:
+        get_live_aggregates(tenant_key).record(scores_df["score_percent"].tolist())
+    except Exception as exc:
+        print(f"Warning: could not update live dashboard: {exc}")
+
+def display_cohort_percentiles(tenant_key, degree, scores_df, answer_bits):
+    if not (decode_matrix([answer_bits])[0] >= 0).all():
+        return  # yes counts from a partial survey are not comparable with the norms
+    norms = get_norms_store(tenant_key).profile(degree, scores_df["yes_count"].tolist())
+    if norms["overall_percentile"].isna().all():
+        return
+    st.subheader("📈 How You Compare")
+    st.caption("Percentile of your yes-answers per trait among students who took this survey "
+               "(50 = typical). The degree column appears once your degree has enough responses.")
+    norms["trait"] = norms["trait"].map(lambda t: f"{TRAIT_NAMES[t]} ({t})")
+    norms = norms.set_index("trait").rename(columns={
+        "degree_percentile": "vs. your degree",
+        "overall_percentile": "vs. all students",
+    })
+    if norms["vs. your degree"].isna().all():
+        norms = norms.drop(columns=["vs. your degree"])
+    st.table(norms)
+
+# -------------------------
+# Recommendations
+# -------------------------
+@st.cache_resource
+def get_catalog_index():
+    try:
+        path = st.secrets["recommendations"].get("catalog_path", DEFAULT_CATALOG_PATH)
+    except Exception:
+        path = DEFAULT_CATALOG_PATH
+    try:
+        return CatalogIndex.from_csv(path)
+    except Exception as exc:
+        print(f"Warning: could not load recommendation catalog {path}: {exc}")
+        return None
+
+def get_top_matches(scores, kind=None, k=3):
+    index = get_catalog_index()
+    return index.top_k(scores, k=k, kind=kind) if index is not None else []
+
+def display_top_matches(scores):
+    courses = get_top_matches(scores, kind="course")
+    occupations = get_top_matches(scores, kind="occupation")
+    if not courses and not occupations:
+        return
+    st.subheader("🎓 Suggested Matches")
+    st.caption("Closest matches between your RIASEC profile and our course and occupation catalog.")
+    col_c, col_o = st.columns(2)
+    for col, label, matches in ((col_c, "Courses", courses), (col_o, "Occupations", occupations)):
+        with col:
+            st.markdown(f"**{label}**")
+            for title, _, sim in matches:
+                st.markdown(f"- {title.title()} — {sim * 100:.0f}% match")
+
+@st.cache_resource
+def get_course_model():
+    # Trained offline with `python course_model.py train`; the section is hidden until a model exists
+    try:
+        path = st.secrets["recommendations"].get("course_model_path", DEFAULT_MODEL_PATH)
+    except Exception:
+        path = DEFAULT_MODEL_PATH
+    try:
+        return CourseModel.load(path)
+    except Exception:
+        return None
+
+def display_peer_choices(scores, degree):
+    model = get_course_model()
+    if model is None:
+        return
+    picks = [(course, prob) for course, prob, lift in model.top_courses(scores, degree, k=3) if lift > 1]
+    if not picks:
+        return
+    st.subheader("👥 Students With Your Profile Often Chose")
+    for course, prob in picks:
+        st.markdown(f"- **{course.title()}** — picked by about {prob * 100:.0f}% of similar students")
+
+@st.cache_resource
+def get_email_dispatcher():
+    # Results emails are only offered when st.secrets["smtp"] is configured
+    try:
+        cfg = dict(st.secrets["smtp"])
+    except Exception:
+        return None
+    return EmailDispatcher(
+        host=cfg["host"], port=cfg.get("port", 25), sender=cfg.get("sender", "noreply@localhost"),
+        username=cfg.get("username"), password=cfg.get("password"), starttls=cfg.get("starttls", False),
+        workers=int(cfg.get("workers", 2)), per_domain_per_minute=int(cfg.get("per_domain_per_minute", 60)),
+    )
+
+def queue_results_email(to, name, scores, card_png):
+    dispatcher = get_email_dispatcher()
+    if dispatcher is None or not to:
+        return False
+    dispatcher.submit(results_email(to, name, dict(zip(TRAITS, scores)), card_png))
+    return True
+
+def card_cache_key(name, scores, institution):
+    return f"card:{fingerprint([name, list(scores), institution])}"
+
+@st.cache_data(max_entries=5000, show_spinner=False)
+def get_final_scores_df(answer_bits):
+    return scores_from_packed(answer_bits)
+
+@st.cache_data(max_entries=500, show_spinner=False)
+def get_results_card_png(key, name, answer_bits, institution):
+    scores_df = get_final_scores_df(answer_bits)
+
+    def render():
+        buffered = BytesIO()
+        matches = get_top_matches(score_tuple(scores_df), kind="course")
+        create_results_card(name, scores_df, matches, institution).save(buffered, format="PNG")
+        return buffered.getvalue()
+
+    return get_shared_cache().get_or_compute(key, render, ttl=CARD_CACHE_TTL)
+
+def get_card_format():
+    # "png" (raster card, default) or "svg" (vector card shown inline, no server-side rasterization)
+    try:
+        return st.secrets["card"].get("format", "png")
+    except Exception:
+        return "png"
+
+@st.cache_data(max_entries=5000, show_spinner=False)
+def get_results_card_svg(name, answer_bits, institution):
+    scores_df = get_final_scores_df(answer_bits)
+    matches = get_top_matches(score_tuple(scores_df), kind="course")
+    return render_svg_card(name, scores_df["score_percent"].tolist(), matches, institution)
+
+@st.cache_data(max_entries=500, show_spinner=False)
+def get_results_pdf(key, name, degree, answer_bits, institution):
+    scores_df = get_final_scores_df(answer_bits)
+
+    def render():
+        matches = get_top_matches(score_tuple(scores_df), kind="course")
+        return render_report_from_scores_df(name, degree, scores_df, matches, institution)
+
+    return get_shared_cache().get_or_compute(f"pdf:{key}", render, ttl=CARD_CACHE_TTL)
+
 def image_to_base64(img):
     buffered = BytesIO()
     img.save(buffered, format="PNG")
@@ -758,19 +896,46 @@ if 'consent_participate' not in st.session_state:
 
 if 'survey_submitted' not in st.session_state:
     st.session_state.survey_submitted = False
-if 'final_scores_df' not in st.session_state:
-    st.session_state.final_scores_df = None
+# Results are kept compact: packed answer bits, a score tuple and the card
+# cache key. The scores frame and card PNG are rebuilt from caches on demand.
+if 'final_answer_bits' not in st.session_state:
+    st.session_state.final_answer_bits = None
+if 'final_scores' not in st.session_state:
+    st.session_state.final_scores = None
+if 'card_key' not in st.session_state:
+    st.session_state.card_key = None
 if 'final_name' not in st.session_state:
     st.session_state.final_name = ""
+if 'final_degree' not in st.session_state:
+    st.session_state.final_degree = ""
 
-# Main UI
-st.title("🎯 RIASEC Career Interest Survey")
-
-gc, spreadsheet_id = get_gspread_client_from_secrets()
+try:
+    tenant = get_current_tenant()
+except KeyError as exc:
+    st.error(f"This survey link is not configured: {exc}")
+    st.stop()
+gc, spreadsheet_id = get_gspread_client_for_tenant(tenant)
 if not gc:
     st.error("Google Sheets not configured or secrets missing. Please fix st.secrets.")
     st.stop()
 
+# Admin pages (?view=admin) replace the survey entirely
+if st.query_params.get("view") == "admin":
+    render_admin_page(get_spreadsheet(gc, spreadsheet_id), get_reliability_store(tenant.key),
+                      get_endorsement_cube(tenant.key))
+    st.stop()
+if st.query_params.get("view") == "dashboard":
+    try:
+        refresh_seconds = st.secrets["dashboard"].get("refresh_seconds", 5)
+    except Exception:
+        refresh_seconds = 5
+    render_dashboard_page(lambda: get_live_aggregates(tenant.key), refresh_seconds, get_admission_controller())
+    st.stop()
+
+# Main UI
+inject_stylesheet()
+st.title(tenant.title)
+
 # Only show milestone badges, not progress bar
 if not st.session_state.survey_submitted:
     display_milestone_badges()
@@ -846,16 +1011,37 @@ with col2:
     degree = st.text_input("Current Enrolled Degree *", key="degree_input", placeholder="e.g., B.Sc Computer Science")
 
 email = st.text_input("Email (optional)", key="email_input", placeholder="your.email@example.com")
+email_results = False
+if get_email_dispatcher() is not None:
+    email_results = st.checkbox("📧 Email me a copy of my results card", key="email_results_opt_in",
+                                disabled=not email.strip())
 
 st.markdown("---")
 st.header("📝 Survey Questions")
 st.markdown("**Note:** All questions are mandatory. Please choose either a 'YES' or a 'NO' for the below questions")
 
+early_stop = get_early_stop_enabled(tenant) and not st.session_state.survey_submitted
 answers = []
-for qid, text, trait in QUESTIONS:
-    choice = st.radio(f"{text}", options=["—", "Yes", "No"], index=0, key=f"q_{qid}", horizontal=True)
-    val = 1 if choice == "Yes" else 0 if choice == "No" else None
-    answers.append((qid, trait, val))
+question_labels = {}
+for position, (qid, text, trait) in enumerate(question_order(tenant), start=1):
+    if tenant.question_order != "standard":
+        text = f"Q{position}. {re.sub(r'^Q[0-9]+[.] *', '', text)}"
+    question_labels[qid] = f"Q{position}"
+    choice = st.radio(f"{text}", options=["—", "Yes", "No"], index=0, key=f"q_{qid}", horizontal=True,
+                      on_change=record_early_stop_answer if early_stop else None, args=(qid,) if early_stop else None)
+    answers.append((qid, trait, answer_value(choice)))
+
+finish_early = False
+if early_stop:
+    tracker = get_early_stop_tracker()
+    locked_code = tracker.locked_code()
+    if locked_code:
+        if st.session_state.get("early_stop_notified") != locked_code:
+            st.session_state.early_stop_notified = locked_code
+            st.toast(f"Your top traits ({locked_code}) are settled — you can finish early.", icon="⏩")
+        st.success(f"✅ Your remaining answers can no longer change your top three traits ({locked_code}).")
+        finish_early = st.checkbox(f"Finish now and skip the remaining {tracker.remaining} questions",
+                                   key="finish_early")
 
 st.markdown("---")
 st.header("💡 Course Interest Selection")
@@ -879,7 +1065,7 @@ if selected_count > 4:
     over = selected_count - 4
     st.error(f"You selected {selected_count} courses — the maximum allowed is 4. Please uncheck {over} course(s).")
 
-missing_qs = [f"Q{qid}" for qid, trait, val in answers if val is None]
+missing_qs = [] if finish_early else [question_labels[qid] for qid, trait, val in answers if val is None]
 all_questions_answered = (len(missing_qs) == 0)
 basic_info_ok = bool(name.strip()) and bool(degree.strip())
 submit_enabled = basic_info_ok and all_questions_answered and (0 <= selected_count <= 7)
@@ -894,6 +1080,16 @@ if selected_count == 0:
     st.info("ℹ️ Please select up to a max of 4 courses from the above list.")
 if selected_count > 4:
     st.info("ℹ️ Reduce your selected courses to at most 4 to enable Submit.")
+if basic_info_ok and not st.session_state.survey_submitted:
+    try:
+        earlier = get_duplicate_index(tenant.key).check(name, email, degree)
+    except Exception as exc:
+        print(f"Warning: duplicate check failed: {exc}")
+        earlier = []
+    if earlier:
+        when = datetime.fromtimestamp(earlier[-1][1], UTC).strftime("%d %b %Y, %H:%M UTC")
+        st.warning(f"⚠️ It looks like you already submitted this survey ({when}). "
+                   "Submitting again will record a second response.")
 
 # Only show submit button if survey not yet submitted
 if not st.session_state.survey_submitted:
@@ -915,31 +1111,61 @@ if not st.session_state.survey_submitted:
                 timestamp = datetime.now(UTC).isoformat()
                 consent_timestamp = timestamp
 
-                ok, err = append_submission_answers_scores(
-                    gc, spreadsheet_id, submission_id, name.strip(), degree.strip(), 
-                    email.strip(), timestamp, 
-                    st.session_state.consent_purpose,
-                    st.session_state.consent_confidentiality,
-                    st.session_state.consent_participate,
-                    consent_timestamp, answers, scores_df
-                )
+                queue_status = st.empty()
+                try:
+                    with get_admission_controller().admit(
+                        get_admission_owner(), get_admission_setting("timeout_seconds", DEFAULT_TIMEOUT_SECONDS),
+                        on_wait=lambda position, eta: show_queue_position(queue_status, position, eta),
+                    ) as outcome:
+                        queue_status.empty()
+                        ok, err, status = append_submission_answers_scores(
+                            gc, spreadsheet_id, submission_id, name.strip(), degree.strip(), 
+                            email.strip(), timestamp, 
+                            st.session_state.consent_purpose,
+                            st.session_state.consent_confidentiality,
+                            st.session_state.consent_participate,
+                            consent_timestamp, answers, scores_df
+                        )
+                        if ok:
+                            ok2, err2, status = append_choices_row(gc, spreadsheet_id, submission_id,
+                                                                   st.session_state.course_checks)
+                        # report failures (and 429s) so the controller backs off instead of counting a success
+                        outcome["ok"] = ok and ok2
+                        outcome["status"] = status
+                except AdmissionTimeout:
+                    ok, err = False, ("The survey is very busy right now. Your answers are kept on this page — "
+                                      "please press Submit again in a minute.")
+                queue_status.empty()
                 if not ok:
                     st.error(err)
                 else:
-                    ok2, err2 = append_choices_row(gc, spreadsheet_id, submission_id, st.session_state.course_checks)
                     if not ok2:
                         st.error(err2)
                     else:
                         st.session_state.survey_submitted = True
-                        st.session_state.final_scores_df = scores_df
+                        st.session_state.final_answer_bits = pack_answers(answers)
+                        st.session_state.final_scores = score_tuple(scores_df)
                         st.session_state.final_name = name.strip()
+                        st.session_state.final_degree = degree.strip()
+                        st.session_state.card_key = card_cache_key(name.strip(), st.session_state.final_scores,
+                                                                   tenant.institution)
+                        on_submission_saved(tenant.key, submission_id, name.strip(), degree.strip(), email.strip(),
+                                            timestamp, scores_df, st.session_state.final_answer_bits)
+                        if email_results:
+                            st.session_state.results_emailed = queue_results_email(
+                                email.strip(), name.strip(), st.session_state.final_scores,
+                                get_results_card_png(st.session_state.card_key, name.strip(),
+                                                     st.session_state.final_answer_bits, tenant.institution))
                         st.rerun()
 
 # RESULTS SECTION
-if st.session_state.survey_submitted and st.session_state.final_scores_df is not None:
+if st.session_state.survey_submitted and st.session_state.final_answer_bits is not None:
+    final_scores_df = get_final_scores_df(st.session_state.final_answer_bits)
     st.balloons()
     
     st.success("✅ Submission saved successfully!")
+    if st.session_state.get("results_emailed"):
+        st.info("📧 Your results card is on its way to your inbox.")
     
     st.markdown("---")
     st.header("🎉 Congratulations! Survey Complete!")
@@ -961,38 +1187,65 @@ if st.session_state.survey_submitted and st.session_state.final_scores_df is not
     </div>
     """, unsafe_allow_html=True)
     
-    # Create downloadable results card from entire results section
-    results_card = create_results_card(st.session_state.final_name, st.session_state.final_scores_df)
-    
     # Provide download button at top
     st.markdown("### 📥 Download Your Results")
-    img_buffer = BytesIO()
-    results_card.save(img_buffer, format="PNG")
-    img_bytes = img_buffer.getvalue()
+    
+    if get_card_format() == "svg":
+        svg_card = get_results_card_svg(st.session_state.final_name, st.session_state.final_answer_bits,
+                                        tenant.institution)
+        st.markdown(f'<div style="max-width:520px;margin:auto">{svg_card}</div>', unsafe_allow_html=True)
+        st.download_button(
+            label="⬇️ Download Complete Results Card",
+            data=svg_card,
+            file_name=f"RIASEC_Results_{st.session_state.final_name.replace(' ', '_')}.svg",
+            mime="image/svg+xml",
+            type="primary",
+            use_container_width=True
+        )
+    else:
+        # Create downloadable results card from entire results section
+        img_bytes = get_results_card_png(st.session_state.card_key, st.session_state.final_name,
+                                         st.session_state.final_answer_bits, tenant.institution)
+        st.download_button(
+            label="⬇️ Download Complete Results Card",
+            data=img_bytes,
+            file_name=f"RIASEC_Results_{st.session_state.final_name.replace(' ', '_')}.png",
+            mime="image/png",
+            type="primary",
+            use_container_width=True
+        )
     
     st.download_button(
-        label="⬇️ Download Complete Results Card",
-        data=img_bytes,
-        file_name=f"RIASEC_Results_{st.session_state.final_name.replace(' ', '_')}.png",
-        mime="image/png",
-        type="primary",
+        label="📄 Download Full PDF Report",
+        data=get_results_pdf(st.session_state.card_key, st.session_state.final_name,
+                             st.session_state.final_degree, st.session_state.final_answer_bits,
+                             tenant.institution),
+        file_name=f"RIASEC_Report_{st.session_state.final_name.replace(' ', '_')}.pdf",
+        mime="application/pdf",
         use_container_width=True
     )
     
     st.markdown("---")
     
     # Display results on screen
-    display_trait_badges(st.session_state.final_scores_df)
+    display_trait_badges(final_scores_df)
     
     st.markdown("---")
     st.subheader("📊 Your RIASEC Profile")
     
-    display_df = st.session_state.final_scores_df.set_index("trait")[["yes_count", "n_items", "prop", "score_percent"]].rename(
+    display_df = final_scores_df.set_index("trait")[["yes_count", "n_items", "prop", "score_percent"]].rename(
         columns={"prop":"proportion","score_percent":"standardized_percent"}
     )
     st.table(display_df)
     
-    st.plotly_chart(make_radar_chart(st.session_state.final_scores_df, for_card=False), use_container_width=True)
+    st.plotly_chart(make_radar_chart(final_scores_df, for_card=False), use_container_width=True)
+    
+    display_cohort_percentiles(tenant.key, st.session_state.final_degree, final_scores_df,
+                               st.session_state.final_answer_bits)
+    
+    display_top_matches(st.session_state.final_scores)
+    
+    display_peer_choices(st.session_state.final_scores, st.session_state.final_degree)
     
     st.markdown("---")
     st.info("💡 **Thankyou for your time!**")
\ No newline at end of file
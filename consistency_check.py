@@ -0,0 +1,232 @@
+# Cross-tab consistency checker. A submission is written by several
+# non-atomic appends (submissions, answers, scores, then choices), so a
+# failure part way leaves orphan or incomplete records.
+#
+# All tabs, including any shards of them, are fetched with one
+# values_batch_get per spreadsheet and hash-joined on submission_id. The
+# checker reports missing rows, answer counts other than 42, duplicates and
+# scores that disagree with a recomputation from the answers. Issues that can
+# be fixed mechanically become a repair plan: in-place updates and clears go
+# out in one values_batch_update per spreadsheet, and missing rows are added
+# with append_rows (to the newest shard) so they land after whatever is there
+# by then.
+#
+#   python consistency_check.py --credentials sa.json --spreadsheet-id ID [--apply]
+import argparse
+from collections import defaultdict
+
+import numpy as np
+from gspread.utils import absolute_range_name, rowcol_to_a1
+
+from riasec_core import SCORES_HEADERS
+from sheet_shards import load_shard_index, shard_sources
+from answer_codec import (
+    WIDE_ANSWERS_TAB, QUESTION_IDS, N_QUESTIONS, decode_matrix, score_answer_matrix,
+)
+
+TABS = ["submissions", "answers", WIDE_ANSWERS_TAB, "scores", "choices"]
+SCORE_TOLERANCE = 0.05
+
+def load_tabs(sh):
+    """Read every tab that exists, merging shards into their base tab.
+
+    Returns (tabs, sources): tabs is {title: rows (header included)};
+    sources is {title: [(spreadsheet, tab, data_rows)]} in the order the
+    rows were merged, for mapping a merged row back to its sheet row.
+    """
+    index = load_shard_index(sh)
+    sources = {t: shard_sources(sh, t, index=index) for t in TABS}
+    grouped = {}
+    for t in TABS:
+        for source_sh, tab in sources[t]:
+            grouped.setdefault(source_sh.id, (source_sh, []))[1].append(tab)
+    values_for = {}
+    for spreadsheet_id, (source_sh, titles) in grouped.items():
+        resp = source_sh.values_batch_get([absolute_range_name(t, "A:ZZ") for t in titles])
+        for title, value_range in zip(titles, resp.get("valueRanges", [])):
+            values_for[spreadsheet_id, title] = value_range.get("values", [])
+    tabs, located = {}, {}
+    for t in TABS:
+        rows, located[t] = [], []
+        for source_sh, tab in sources[t]:
+            values = values_for.get((source_sh.id, tab)) or []
+            if not rows and values:
+                rows.append(values[0])
+            rows.extend(values[1:])
+            located[t].append((source_sh, tab, max(len(values) - 1, 0)))
+        tabs[t] = rows
+    return tabs, located
+
+def locate_row(sources, title, row):
+    """(spreadsheet, tab, sheet row) of merged row `row` of `title`."""
+    offset = row - 2
+    for source_sh, tab, n in sources[title]:
+        if offset < n:
+            return source_sh, tab, offset + 2
+        offset -= n
+    raise IndexError(f"{title} row {row} is past the end of the tab")
+
+def _rows_by_id(values):
+    """submission_id -> list of 1-based sheet row numbers."""
+    index = defaultdict(list)
+    for i, row in enumerate(values[1:], start=2):
+        if row and row[0]:
+            index[row[0]].append(i)
+    return index
+
+def check(tabs):
+    """Return (issues, plan). Issues are dicts with submission_id/kind/detail;
+    plan entries are dicts with action/tab/row/values."""
+    sub_idx = _rows_by_id(tabs["submissions"])
+    score_idx = _rows_by_id(tabs["scores"])
+    choice_idx = _rows_by_id(tabs["choices"])
+    wide_idx = _rows_by_id(tabs[WIDE_ANSWERS_TAB])
+
+    # answers: hash-join long rows into one (n, 42) matrix per submission
+    qpos = {qid: i for i, qid in enumerate(QUESTION_IDS.tolist())}
+    answer_rows = defaultdict(list)
+    duplicate_answers = defaultdict(list)
+    seen_q = set()
+    for i, row in enumerate(tabs["answers"][1:], start=2):
+        if not row or not row[0]:
+            continue
+        sid = row[0]
+        try:
+            qid = int(float(row[1]))
+            # a blank answer is an item skipped by early stop
+            ans = int(float(row[3])) if len(row) > 3 and row[3] != "" else None
+        except (IndexError, ValueError):
+            continue
+        if (sid, qid) in seen_q:
+            duplicate_answers[sid].append(i)
+            continue
+        seen_q.add((sid, qid))
+        answer_rows[sid].append((qid, ans))
+
+    answer_ids = sorted(set(answer_rows) | set(wide_idx))
+    matrix = np.full((len(answer_ids), N_QUESTIONS), -1, dtype=np.int8)
+    answered = np.zeros(len(answer_ids), dtype=np.int64)  # items answered or explicitly skipped
+    wide_values = tabs[WIDE_ANSWERS_TAB]
+    for n, sid in enumerate(answer_ids):
+        if sid in wide_idx:
+            # the copy the repair plan keeps; later duplicates are cleared
+            row = wide_values[wide_idx[sid][0] - 1]
+            encoded = row[2] if len(row) > 2 else ""
+            matrix[n] = decode_matrix([encoded])[0]
+            answered[n] = min(len(encoded), N_QUESTIONS)
+        else:
+            for qid, ans in answer_rows[sid]:
+                if qid in qpos and ans in (0, 1, None):
+                    answered[n] += 1
+                    if ans is not None:
+                        matrix[n, qpos[qid]] = ans
+    recomputed = score_answer_matrix(matrix)
+    answer_pos = {sid: n for n, sid in enumerate(answer_ids)}
+
+    issues, plan = [], []
+
+    def issue(sid, kind, detail=""):
+        issues.append({"submission_id": sid, "kind": kind, "detail": detail})
+
+    all_ids = set(sub_idx) | set(answer_pos) | set(score_idx) | set(choice_idx)
+    for sid in sorted(all_ids):
+        if sid not in sub_idx:
+            issue(sid, "orphan", "no submissions row")
+        if sid not in answer_pos:
+            issue(sid, "missing_answers")
+        elif answered[answer_pos[sid]] != N_QUESTIONS:
+            issue(sid, "answer_count", f"{answered[answer_pos[sid]]} of {N_QUESTIONS} answered")
+        if sid not in choice_idx and sid in sub_idx:
+            issue(sid, "missing_choices")
+
+        for title, index in (("submissions", sub_idx), ("scores", score_idx),
+                             ("choices", choice_idx), (WIDE_ANSWERS_TAB, wide_idx)):
+            extra = index.get(sid, [])[1:]
+            if extra:
+                issue(sid, "duplicate", f"{title} rows {extra}")
+                plan += [{"action": "clear", "tab": title, "row": r, "values": None} for r in extra]
+        if duplicate_answers.get(sid):
+            issue(sid, "duplicate", f"answers rows {duplicate_answers[sid]}")
+            plan += [{"action": "clear", "tab": "answers", "row": r, "values": None}
+                     for r in duplicate_answers[sid]]
+
+        if sid not in answer_pos or answered[answer_pos[sid]] != N_QUESTIONS:
+            if sid not in score_idx:
+                issue(sid, "missing_scores", "answers incomplete; cannot recompute")
+            continue
+        expected = recomputed[answer_pos[sid]]
+        expected_row = [sid] + [f"{v:.1f}" for v in expected]
+        if sid not in score_idx:
+            issue(sid, "missing_scores")
+            plan.append({"action": "append", "tab": "scores", "row": None, "values": expected_row})
+            continue
+        row = tabs["scores"][score_idx[sid][0] - 1]
+        try:
+            stored = np.array([float(v) for v in row[1:len(SCORES_HEADERS)]])
+        except ValueError:
+            stored = np.full(len(expected), np.nan)
+        if stored.shape != expected.shape or not np.all(np.abs(stored - expected) <= SCORE_TOLERANCE):
+            issue(sid, "score_mismatch", f"stored {row[1:len(SCORES_HEADERS)]} vs {expected_row[1:]}")
+            plan.append({"action": "update", "tab": "scores", "row": score_idx[sid][0], "values": expected_row})
+    return issues, plan
+
+def plan_to_batch(plan, widths, sources):
+    """Split a repair plan into {spreadsheet_id: (spreadsheet, values_batch_update data)}
+    and {title: rows to append}."""
+    data, appends = {}, defaultdict(list)
+    for step in plan:
+        title = step["tab"]
+        if step["action"] == "append":
+            appends[title].append(step["values"])
+            continue
+        if step["action"] == "clear":
+            values = [""] * widths[title]
+        else:
+            values = step["values"]
+        source_sh, tab, row = locate_row(sources, title, step["row"])
+        rng = f"{rowcol_to_a1(row, 1)}:{rowcol_to_a1(row, len(values))}"
+        data.setdefault(source_sh.id, (source_sh, []))[1].append(
+            {"range": absolute_range_name(tab, rng), "values": [values]})
+    return data, appends
+
+def apply_plan(sh, tabs, plan, sources):
+    if not plan:
+        return 0
+    widths = {t: max((len(r) for r in tabs[t]), default=1) for t in tabs}
+    data, appends = plan_to_batch(plan, widths, sources)
+    written = 0
+    for source_sh, batch in data.values():
+        source_sh.values_batch_update({"valueInputOption": "USER_ENTERED", "data": batch})
+        written += len(batch)
+    for title, rows in appends.items():
+        # the newest shard, or the base tab itself when unsharded
+        source_sh, tab = (sources[title][-1][:2] if sources[title] else (sh, title))
+        source_sh.worksheet(tab).append_rows(rows, value_input_option="USER_ENTERED")
+        written += len(rows)
+    return written
+
+def main(argv=None):
+    from sheets_io import add_spreadsheet_args, spreadsheet_from_args, save_if_local
+
+    parser = argparse.ArgumentParser(description="Check cross-tab consistency of survey submissions.")
+    add_spreadsheet_args(parser)
+    parser.add_argument("--apply", action="store_true", help="Apply the repair plan")
+    args = parser.parse_args(argv)
+
+    sh = spreadsheet_from_args(args)
+    tabs, sources = load_tabs(sh)
+    issues, plan = check(tabs)
+    counts = defaultdict(int)
+    for item in issues:
+        counts[item["kind"]] += 1
+        print(f"{item['kind']:<16} {item['submission_id']}  {item['detail']}")
+    print("\nSummary: " + (", ".join(f"{k}={v}" for k, v in sorted(counts.items())) or "no issues"))
+    print(f"Repair plan: {len(plan)} writes "
+          + ", ".join(f"{a}={sum(1 for p in plan if p['action'] == a)}" for a in ("update", "append", "clear")))
+    if args.apply and plan:
+        n = apply_plan(sh, tabs, plan, sources)
+        save_if_local(sh)
+        print(f"Applied {n} row writes")
+
+if __name__ == "__main__":
+    main()
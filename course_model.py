@@ -0,0 +1,142 @@
+# "Students with your profile often chose..." — one L2-regularized logistic
+# model per course, trained offline on the scores + choices (+ degree) tabs.
+# The fitted weights are saved as plain NumPy arrays; serving is a single
+# (features x courses) dot product and a sigmoid, with no ML framework.
+#
+#   python course_model.py train --credentials sa.json --spreadsheet-id ID
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from riasec_core import (
+    TRAITS, COURSES, DATA_DIR, SUBMISSIONS_HEADERS, SCORES_HEADERS, CHOICES_HEADERS, normalize_degree,
+)
+
+DEFAULT_MODEL_PATH = os.path.join(DATA_DIR, "course_model.npz")
+MIN_DEGREE_COUNT = 30
+MAX_DEGREES = 25
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -35, 35)))
+
+class CourseModel:
+    def __init__(self, weights, degrees, courses, base_rates):
+        self.weights = np.asarray(weights, dtype=np.float64)  # (1 + 6 + n_degrees, n_courses)
+        self.degrees = list(degrees)
+        self.courses = list(courses)
+        self.base_rates = np.asarray(base_rates, dtype=np.float64)
+        self._degree_pos = {d: i for i, d in enumerate(self.degrees)}
+
+    def features(self, scores, degree):
+        x = np.zeros(self.weights.shape[0])
+        x[0] = 1.0
+        x[1:1 + len(TRAITS)] = np.asarray(scores, dtype=np.float64) / 100.0
+        pos = self._degree_pos.get(normalize_degree(degree))
+        if pos is not None:
+            x[1 + len(TRAITS) + pos] = 1.0
+        return x
+
+    def predict(self, scores, degree=""):
+        """Probability of choosing each course, in self.courses order."""
+        return _sigmoid(self.features(scores, degree) @ self.weights)
+
+    def top_courses(self, scores, degree="", k=3):
+        """[(course, probability, lift over the overall choice rate)], best first."""
+        probs = self.predict(scores, degree)
+        lift = probs / np.where(self.base_rates > 0, self.base_rates, 1)
+        order = np.argsort(-lift, kind="stable")[:k]
+        return [(self.courses[i], float(probs[i]), float(lift[i])) for i in order]
+
+    def save(self, path=DEFAULT_MODEL_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, weights=self.weights, degrees=np.array(self.degrees, dtype=str),
+                 courses=np.array(self.courses, dtype=str), base_rates=self.base_rates)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["weights"], data["degrees"].tolist(), data["courses"].tolist(), data["base_rates"])
+
+# -------------------------
+# Training
+# -------------------------
+def fit_logistic(X, Y, l2=1.0, iterations=25, tol=1e-6):
+    """Newton-Raphson fit of one logistic model per column of Y; returns (n_features, n_targets)."""
+    n_features = X.shape[1]
+    penalty = np.eye(n_features) * l2
+    penalty[0, 0] = 0.0  # leave the intercept unregularized
+    W = np.zeros((n_features, Y.shape[1]))
+    for j in range(Y.shape[1]):
+        w = W[:, j]
+        for _ in range(iterations):
+            p = _sigmoid(X @ w)
+            grad = X.T @ (p - Y[:, j]) + penalty @ w
+            hess = (X * (p * (1 - p))[:, None]).T @ X + penalty
+            step = np.linalg.solve(hess + 1e-9 * np.eye(n_features), grad)
+            w = w - step
+            if np.abs(step).max() < tol:
+                break
+        W[:, j] = w
+    return W
+
+def build_training_set(scores_df, choices_df, submissions_df=None):
+    df = scores_df.merge(choices_df, on="submission_id", how="inner")
+    if submissions_df is not None and not submissions_df.empty:
+        df = df.merge(submissions_df[["submission_id", "degree"]], on="submission_id", how="left")
+    else:
+        df["degree"] = ""
+    df = df.drop_duplicates("submission_id", keep="last")
+    pct = df[[f"{t}_percent" for t in TRAITS]].apply(pd.to_numeric, errors="coerce")
+    flags = df[COURSES].apply(pd.to_numeric, errors="coerce")
+    ok = pct.notna().all(axis=1) & flags.notna().all(axis=1)
+    degrees = df.loc[ok, "degree"].fillna("").map(normalize_degree)
+    return pct[ok].to_numpy(), degrees.to_numpy(), flags[ok].to_numpy()
+
+def train(pct, degrees, Y, l2=1.0, min_degree_count=MIN_DEGREE_COUNT):
+    counts = pd.Series(degrees).value_counts()
+    vocab = [d for d, n in counts.items() if d and n >= min_degree_count][:MAX_DEGREES]
+    pos = {d: i for i, d in enumerate(vocab)}
+    X = np.zeros((len(pct), 1 + len(TRAITS) + len(vocab)))
+    X[:, 0] = 1.0
+    X[:, 1:1 + len(TRAITS)] = pct / 100.0
+    for row, d in enumerate(degrees):
+        if d in pos:
+            X[row, 1 + len(TRAITS) + pos[d]] = 1.0
+    W = fit_logistic(X, Y.astype(np.float64), l2=l2)
+    return CourseModel(W, vocab, COURSES, Y.mean(axis=0))
+
+def train_from_sheet(sh, l2=1.0):
+    from sheets_io import read_tab
+
+    frames = {}
+    for title, expected in (("scores", SCORES_HEADERS), ("choices", CHOICES_HEADERS),
+                            ("submissions", SUBMISSIONS_HEADERS)):
+        header, rows = read_tab(sh, title)
+        # a missing or empty tab still gets its columns, so the merges below just find no rows
+        frames[title] = pd.DataFrame(rows, columns=header) if rows else pd.DataFrame(columns=header or expected)
+    pct, degrees, Y = build_training_set(frames["scores"], frames["choices"], frames["submissions"])
+    if len(Y) == 0:
+        raise SystemExit("No rows with both scores and choices to train on")
+    return train(pct, degrees, Y, l2=l2), len(Y)
+
+def main(argv=None):
+    from sheets_io import add_spreadsheet_args, spreadsheet_from_args
+
+    parser = argparse.ArgumentParser(description="Train the per-course choice model.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    tr = sub.add_parser("train")
+    add_spreadsheet_args(tr)
+    tr.add_argument("--out", default=DEFAULT_MODEL_PATH)
+    tr.add_argument("--l2", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    model, n = train_from_sheet(spreadsheet_from_args(args), l2=args.l2)
+    model.save(args.out)
+    print(f"Trained on {n} submissions ({len(model.degrees)} degree cohorts); wrote {args.out}")
+
+if __name__ == "__main__":
+    main()
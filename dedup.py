@@ -0,0 +1,296 @@
+# Duplicate-participant detection. Students who reload the page and take the
+# survey again end up as several submissions rows under different UUIDs.
+#
+# Each submission gets up to two blocking keys: a hash of the normalized
+# email, and the Soundex codes of the name tokens plus the normalized degree.
+# Only submissions sharing a key are compared: an email match is always a
+# duplicate, a name match only when the submissions are within a time window.
+# Matches are merged with union-find into clusters for the batch report. The
+# same keys back a persisted index for an O(1) check at submit time; the index
+# stores hashes and phonetic codes only, never raw names or emails.
+# Like the other local stores it supports one writer per file and is
+# flushed at exit.
+#
+#   python dedup.py report --credentials sa.json --spreadsheet-id ID [--out dupes.csv]
+#   python dedup.py rebuild --credentials sa.json --spreadsheet-id ID
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+import weakref
+from collections import defaultdict
+
+import pandas as pd
+
+from riasec_core import DATA_DIR, normalize_degree
+
+DEFAULT_INDEX_PATH = os.path.join(DATA_DIR, "dedup_index.json")
+DEFAULT_WINDOW_HOURS = 72
+MAX_ENTRIES_PER_KEY = 50
+_SOUNDEX_CODES = {c: str(d) for d, letters in enumerate(["aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r"])
+                  for c in letters}
+
+# -------------------------
+# Normalization and keys
+# -------------------------
+def normalize_name(name):
+    """'  José  d'Souza ' -> 'jose dsouza'."""
+    text = unicodedata.normalize("NFKD", str(name or "")).encode("ascii", "ignore").decode("ascii")
+    text = re.sub(r"[^a-z0-9\s]", "", text.casefold())
+    return " ".join(text.split())
+
+def normalize_email(email):
+    """Casefolded address with any +tag dropped (and dots, for Gmail)."""
+    email = str(email or "").strip().casefold()
+    local, at, domain = email.partition("@")
+    if not at or not local or not domain:
+        return ""
+    local = local.split("+", 1)[0]
+    if domain in ("gmail.com", "googlemail.com"):
+        local, domain = local.replace(".", ""), "gmail.com"
+    return f"{local}@{domain}"
+
+def soundex(word):
+    word = "".join(c for c in word.casefold() if c in _SOUNDEX_CODES)
+    if not word:
+        return ""
+    codes, last = [], _SOUNDEX_CODES[word[0]]
+    for c in word[1:]:
+        code = _SOUNDEX_CODES[c]
+        if code != "0" and code != last:
+            codes.append(code)
+        if c not in "hw":
+            last = code
+    return (word[0].upper() + "".join(codes) + "000")[:4]
+
+def blocking_keys(name, email, degree):
+    """(email_key, name_key); either may be None when the field is empty."""
+    email = normalize_email(email)
+    email_key = "e:" + hashlib.sha256(email.encode("utf-8")).hexdigest()[:20] if email else None
+    codes = sorted({soundex(t) if t.isalpha() else t for t in normalize_name(name).split()} - {""})
+    name_key = f"n:{' '.join(codes)}|{normalize_degree(degree)}" if codes else None
+    return email_key, name_key
+
+def _epoch(timestamp):
+    try:
+        ts = pd.Timestamp(timestamp)
+    except (ValueError, TypeError):
+        return None
+    if pd.isna(ts):
+        return None
+    return (ts.tz_localize("UTC") if ts.tzinfo is None else ts).timestamp()
+
+# -------------------------
+# Batch report
+# -------------------------
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+def find_duplicates(sub_df, window_hours=DEFAULT_WINDOW_HOURS):
+    """Cluster likely duplicate submissions.
+
+    sub_df has the submissions tab columns. Returns one row per submission in
+    a cluster of two or more, ordered by cluster and timestamp, with
+    cluster, first (earliest in its cluster) and reason columns added.
+    """
+    df = sub_df.reset_index(drop=True)
+    epochs = [_epoch(t) for t in df["timestamp"]]
+    blocks = defaultdict(list)
+    for i, (name, email, degree) in enumerate(zip(df["student_name"], df["email"], df["degree"])):
+        for key in blocking_keys(name, email, degree):
+            if key:
+                blocks[key].append(i)
+
+    uf = _UnionFind(len(df))
+    reasons = defaultdict(set)
+    window = window_hours * 3600
+    for key, members in blocks.items():
+        if len(members) < 2:
+            continue
+        if key.startswith("e:"):
+            for i in members[1:]:
+                uf.union(members[0], i)
+            for i in members:
+                reasons[i].add("email")
+            continue
+        # name blocks: chain neighbours in time order that fall within the window
+        members = sorted(members, key=lambda i: epochs[i] if epochs[i] is not None else float("inf"))
+        for a, b in zip(members, members[1:]):
+            if epochs[a] is not None and epochs[b] is not None and epochs[b] - epochs[a] <= window:
+                uf.union(a, b)
+                reasons[a].add("name")
+                reasons[b].add("name")
+
+    roots = [uf.find(i) for i in range(len(df))]
+    sizes = pd.Series(roots).value_counts()
+    in_cluster = [i for i, r in enumerate(roots) if sizes[r] > 1]
+    out = df.iloc[in_cluster].copy()
+    out["cluster"] = pd.Series(roots, dtype="int64").iloc[in_cluster].rank(method="dense").astype(int).to_numpy()
+    out["_epoch"] = [epochs[i] if epochs[i] is not None else float("inf") for i in in_cluster]
+    out["reason"] = ["+".join(sorted(reasons[i])) for i in in_cluster]
+    out = out.sort_values(["cluster", "_epoch"], kind="stable")
+    out["first"] = ~out["cluster"].duplicated()
+    return out.drop(columns="_epoch").reset_index(drop=True)
+
+# -------------------------
+# Submit-time index
+# -------------------------
+def _save_at_exit(ref):
+    store = ref()
+    if store is not None:
+        store.save()
+
+class DuplicateIndex:
+    """Blocking key -> recent (submission_id, epoch) entries, persisted as one JSON file."""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, window_hours=DEFAULT_WINDOW_HOURS, save_interval=30.0):
+        self.path = path
+        self.window = window_hours * 3600
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._keys = {}
+        self._dirty = False
+        self._last_save = 0.0
+        if path:
+            atexit.register(_save_at_exit, weakref.ref(self))
+        if path and os.path.exists(path):
+            with open(path) as fh:
+                self._keys = json.load(fh)["keys"]
+
+    def check(self, name, email, degree, now=None):
+        """Earlier submissions that look like the same participant, as [(submission_id, epoch, reason)]."""
+        now = time.time() if now is None else now
+        email_key, name_key = blocking_keys(name, email, degree)
+        matches = {}
+        with self._lock:
+            for sid, epoch in self._keys.get(email_key, []) if email_key else []:
+                matches[sid] = (sid, epoch, "email")
+            for sid, epoch in self._keys.get(name_key, []) if name_key else []:
+                if sid not in matches and abs(now - epoch) <= self.window:
+                    matches[sid] = (sid, epoch, "name")
+        return sorted(matches.values(), key=lambda m: m[1])
+
+    def add(self, submission_id, name, email, degree, timestamp=None):
+        epoch = _epoch(timestamp) if timestamp is not None else time.time()
+        snapshot = None
+        with self._lock:
+            for key in blocking_keys(name, email, degree):
+                if key:
+                    entries = self._keys.setdefault(key, [])
+                    if key.startswith("n:") and epoch is not None:
+                        # name matches only count inside the window, so older entries are dead weight
+                        entries[:] = [e for e in entries if e[1] is not None and epoch - e[1] <= self.window]
+                    entries.append([submission_id, epoch])
+                    if len(entries) > MAX_ENTRIES_PER_KEY:
+                        del entries[:-MAX_ENTRIES_PER_KEY]
+            self._dirty = True
+            if time.monotonic() - self._last_save >= self.save_interval:
+                snapshot = self._snapshot_locked()
+        if snapshot is not None:
+            self._write(snapshot)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _snapshot_locked(self):
+        """Shallow copy of the index to serialize outside _lock; entries are never mutated in place."""
+        self._dirty = False
+        self._last_save = time.monotonic()
+        return {key: list(entries) for key, entries in self._keys.items()}
+
+    def _write(self, keys):
+        if not self.path:
+            return
+        try:
+            with self._save_lock:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                tmp = f"{self.path}.tmp"
+                with open(tmp, "w") as fh:
+                    json.dump({"keys": keys}, fh, separators=(",", ":"))
+                os.replace(tmp, self.path)
+        except Exception:
+            with self._lock:
+                self._dirty = True
+            raise
+
+    def save(self):
+        with self._lock:
+            snapshot = self._snapshot_locked() if self._dirty else None
+        if snapshot is not None:
+            self._write(snapshot)
+
+def read_submissions(sh):
+    from sheets_io import read_tab
+
+    header, rows = read_tab(sh, "submissions")
+    if not rows:
+        return pd.DataFrame(columns=["submission_id", "student_name", "degree", "email", "timestamp"])
+    width = len(header)
+    return pd.DataFrame([(r + [""] * width)[:width] for r in rows], columns=header)
+
+def rebuild_from_sheet(sh, path=DEFAULT_INDEX_PATH, window_hours=DEFAULT_WINDOW_HOURS):
+    """Recreate the submit-time index from the submissions tab."""
+    sub = read_submissions(sh)
+    sub = sub.assign(_epoch=[_epoch(t) for t in sub["timestamp"]]).dropna(subset=["_epoch"]).sort_values("_epoch")
+    index = DuplicateIndex(path=None, window_hours=window_hours)
+    for sid, name, email, degree, epoch in zip(sub["submission_id"], sub["student_name"], sub["email"],
+                                               sub["degree"], sub["_epoch"]):
+        index.add(sid, name, email, degree, pd.Timestamp(epoch, unit="s", tz="UTC"))
+    index.path = path
+    index.save()
+    return index
+
+def main(argv=None):
+    from sheets_io import add_spreadsheet_args, spreadsheet_from_args
+
+    parser = argparse.ArgumentParser(description="Find likely duplicate participants.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="Cluster duplicates across the whole submissions tab")
+    add_spreadsheet_args(report)
+    report.add_argument("--window-hours", type=float, default=DEFAULT_WINDOW_HOURS)
+    report.add_argument("--out", help="Write the clusters to this CSV")
+    rebuild = sub.add_parser("rebuild", help="Rebuild the submit-time index")
+    add_spreadsheet_args(rebuild)
+    rebuild.add_argument("--window-hours", type=float, default=DEFAULT_WINDOW_HOURS)
+    rebuild.add_argument("--path", default=DEFAULT_INDEX_PATH)
+    args = parser.parse_args(argv)
+
+    sh = spreadsheet_from_args(args)
+    if args.command == "rebuild":
+        index = rebuild_from_sheet(sh, args.path, args.window_hours)
+        print(f"Wrote {args.path}: {len(index):,} blocking keys")
+        return
+    t0 = time.perf_counter()
+    sub_df = read_submissions(sh)
+    clusters = find_duplicates(sub_df, args.window_hours)
+    n_clusters = clusters["cluster"].nunique()
+    print(f"{len(sub_df):,} submissions, {n_clusters:,} duplicate clusters covering {len(clusters):,} rows "
+          f"({len(clusters) - n_clusters:,} extra) in {time.perf_counter() - t0:.2f}s")
+    columns = ["cluster", "first", "reason", "submission_id", "student_name", "degree", "email", "timestamp"]
+    if args.out:
+        clusters[columns].to_csv(args.out, index=False)
+        print(f"Wrote {args.out}")
+    else:
+        with pd.option_context("display.max_rows", 200, "display.width", 160):
+            print(clusters[columns].head(200).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# Adaptive early stop. Per-trait yes-counts and answered counts are updated
+# one answer at a time; from them every trait's final proportion is bounded
+# by "all remaining items No" and "all remaining items Yes". Once the bounds
+# of the top three traits are strictly separated from each other and from the
+# rest, no completion of the survey can change the Holland code, and the
+# student may finish with the remaining items recorded as skipped.
+import numpy as np
+
+from riasec_core import QUESTIONS, TRAITS, compute_percent_matrix
+
+_TRAIT_INDEX = {t: i for i, t in enumerate(TRAITS)}
+_QUESTION_TRAIT = {qid: _TRAIT_INDEX[trait] for qid, _, trait in QUESTIONS}
+ITEMS_PER_TRAIT = np.bincount([_TRAIT_INDEX[t] for _, _, t in QUESTIONS], minlength=len(TRAITS))
+
+class EarlyStopTracker:
+    def __init__(self, top_n=3):
+        self.top_n = top_n
+        self.answers = {}
+        self.yes = np.zeros(len(TRAITS), dtype=np.int64)
+        self.answered = np.zeros(len(TRAITS), dtype=np.int64)
+
+    def set_answer(self, qid, value):
+        """Record (or change, or clear with None) one answer in O(1)."""
+        t = _QUESTION_TRAIT[qid]
+        old = self.answers.pop(qid, None)
+        if old is not None:
+            self.answered[t] -= 1
+            self.yes[t] -= old
+        if value is not None:
+            self.answers[qid] = value
+            self.answered[t] += 1
+            self.yes[t] += value
+
+    @property
+    def remaining(self):
+        return int((ITEMS_PER_TRAIT - self.answered).sum())
+
+    def bounds(self):
+        """(low, high) final proportion per trait over every possible completion."""
+        return self.yes / ITEMS_PER_TRAIT, (self.yes + ITEMS_PER_TRAIT - self.answered) / ITEMS_PER_TRAIT
+
+    def current_percents(self):
+        """Score percents from the answered items only, as they would be recorded now."""
+        return compute_percent_matrix(self.yes[None, :], self.answered[None, :])[0]
+
+    def locked_code(self):
+        """The Holland code if no completion can change it (and it is unambiguous now), else None."""
+        if not self.remaining:
+            return None
+        low, high = self.bounds()
+        percents = self.current_percents()
+        order = sorted(range(len(TRAITS)), key=lambda i: -percents[i])
+        top, rest = order[:self.top_n], order[self.top_n:]
+        for a, b in zip(top, top[1:]):
+            if not (low[a] > high[b] and percents[a] > percents[b]):
+                return None
+        last = top[-1]
+        if rest and not (low[last] > high[rest].max() and percents[last] > percents[rest].max()):
+            return None
+        return "".join(TRAITS[i] for i in top)
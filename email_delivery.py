@@ -0,0 +1,192 @@
+# Opt-in delivery of results cards by email, off the Streamlit request path.
+#
+# Jobs go into a delay queue; a small pool of worker threads each keeps one
+# SMTP connection open and sends jobs in batches over it. Per-domain token
+# buckets keep us under provider rate limits, and transient failures are
+# retried with exponential backoff.
+#
+# For local testing run a debugging SMTP server that prints every message:
+#   python -m aiosmtpd -n -l localhost:1025
+# and configure st.secrets["smtp"] with host = "localhost", port = 1025.
+import heapq
+import itertools
+import smtplib
+import threading
+import time
+from dataclasses import dataclass, field
+from email.message import EmailMessage
+
+from riasec_core import TRAIT_NAMES, TRAIT_DESCRIPTIONS
+
+@dataclass
+class DeliveryJob:
+    to: str
+    subject: str
+    body: str
+    attachments: list = field(default_factory=list)  # [(filename, bytes, maintype, subtype)]
+    attempts: int = 0
+
+    @property
+    def domain(self):
+        return self.to.rsplit("@", 1)[-1].lower()
+
+class _DelayQueue:
+    """Thread-safe queue whose items become available at a given time."""
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def put(self, item, delay=0.0):
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), item))
+            self._cond.notify()
+
+    def get_batch(self, max_items, timeout):
+        """Block until at least one item is due (or timeout); return up to max_items due items."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._heap and self._heap[0][0] <= now:
+                    batch = []
+                    while self._heap and self._heap[0][0] <= now and len(batch) < max_items:
+                        batch.append(heapq.heappop(self._heap)[2])
+                    return batch
+                if now >= deadline:
+                    return []
+                wait = deadline - now
+                if self._heap:
+                    wait = min(wait, self._heap[0][0] - now)
+                self._cond.wait(wait)
+
+    def __len__(self):
+        with self._cond:
+            return len(self._heap)
+
+class _TokenBucket:
+    def __init__(self, rate_per_sec, burst):
+        self.rate, self.burst = rate_per_sec, burst
+        self.tokens, self.updated = float(burst), time.monotonic()
+
+    def take(self):
+        """Consume a token; return 0 if available now, else seconds until one is."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class EmailDispatcher:
+    def __init__(self, host, port=25, sender="noreply@localhost", username=None, password=None,
+                 starttls=False, workers=2, batch_size=20, per_domain_per_minute=60,
+                 max_attempts=4, backoff=5.0, timeout=30):
+        self.host, self.port, self.sender = host, int(port), sender
+        self.username, self.password, self.starttls = username, password, starttls
+        self.batch_size, self.max_attempts, self.backoff, self.timeout = batch_size, max_attempts, backoff, timeout
+        self.per_domain_per_minute = per_domain_per_minute
+        self._queue = _DelayQueue()
+        self._buckets = {}
+        self._bucket_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.stats = {"queued": 0, "sent": 0, "retried": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._worker, name=f"email-{i}", daemon=True)
+                         for i in range(workers)]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, job):
+        self._count("queued")
+        self._queue.put(job)
+
+    def pending(self):
+        return len(self._queue)
+
+    def close(self, timeout=10):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _throttle_delay(self, domain):
+        with self._bucket_lock:
+            bucket = self._buckets.get(domain)
+            if bucket is None:
+                rate = self.per_domain_per_minute / 60.0
+                bucket = self._buckets[domain] = _TokenBucket(rate, max(1, self.per_domain_per_minute // 6))
+            return bucket.take()
+
+    def _connect(self):
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            conn.starttls()
+        if self.username:
+            conn.login(self.username, self.password)
+        return conn
+
+    def _message(self, job):
+        msg = EmailMessage()
+        msg["From"], msg["To"], msg["Subject"] = self.sender, job.to, job.subject
+        msg.set_content(job.body)
+        for filename, data, maintype, subtype in job.attachments:
+            msg.add_attachment(data, maintype=maintype, subtype=subtype, filename=filename)
+        return msg
+
+    def _worker(self):
+        conn = None
+        while not self._stop.is_set():
+            batch = self._queue.get_batch(self.batch_size, timeout=1.0)
+            if not batch:
+                if conn is not None:
+                    try:
+                        conn.quit()
+                    except smtplib.SMTPException:
+                        pass
+                    conn = None
+                continue
+            for job in batch:
+                delay = self._throttle_delay(job.domain)
+                if delay:
+                    self._queue.put(job, delay)
+                    continue
+                try:
+                    if conn is None:
+                        conn = self._connect()
+                    conn.send_message(self._message(job))
+                    self._count("sent")
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused):
+                    self._count("failed")
+                except (smtplib.SMTPException, OSError) as exc:
+                    conn = None if isinstance(exc, (smtplib.SMTPServerDisconnected, OSError)) else conn
+                    job.attempts += 1
+                    if job.attempts >= self.max_attempts:
+                        self._count("failed")
+                        print(f"Warning: giving up on results email to {job.domain}: {exc}")
+                    else:
+                        self._count("retried")
+                        self._queue.put(job, self.backoff * 2 ** (job.attempts - 1))
+        if conn is not None:
+            try:
+                conn.quit()
+            except smtplib.SMTPException:
+                pass
+
+def results_email(to, name, scores, card_png):
+    """Build the results delivery job; scores maps trait -> percent."""
+    top = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:3]
+    lines = [f"Hi {name or 'there'},", "", "Thank you for completing the RIASEC Career Interest Survey.",
+             "Your top traits:", ""]
+    for trait, pct in top:
+        lines.append(f"  {TRAIT_NAMES[trait]} ({trait}): {pct:.1f}% - {TRAIT_DESCRIPTIONS[trait].split(' - ', 1)[-1]}")
+    lines += ["", "Your full results card is attached.",
+              "Your scores reflect your preferences, not your abilities or limitations."]
+    filename = f"RIASEC_Results_{(name or 'student').replace(' ', '_')}.png"
+    return DeliveryJob(to=to, subject="Your RIASEC Survey Results", body="\n".join(lines),
+                       attachments=[(filename, card_png, "image", "png")])
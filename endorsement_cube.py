@@ -0,0 +1,287 @@
+# Endorsement cube: yes / answered counters over (degree, month, question),
+# with trait as a rollup of question. Each submission adds one to the 42
+# answered cells of its (degree, month) slab and one to each yes cell, so
+# updates are O(42) and any rollup ("B.Sc students on Q18", "E items by
+# month") is a sum over a few axes of a small dense array. Results are
+# memoized until the next update.
+# Saves replace the file with this process's counters, so run one writer per
+# file; dirty counters are saved when the interpreter exits.
+#
+#   python endorsement_cube.py rebuild --credentials sa.json --spreadsheet-id ID
+#   python endorsement_cube.py show --by month trait --trait E
+#   python endorsement_cube.py show --by question --degree "bsc computer science"
+import argparse
+import atexit
+import os
+import threading
+import time
+import weakref
+from datetime import datetime, UTC
+
+import numpy as np
+import pandas as pd
+
+from riasec_core import TRAITS, DATA_DIR, normalize_degree
+from answer_codec import QUESTION_IDS, TRAIT_ONEHOT, N_QUESTIONS
+
+DEFAULT_CUBE_PATH = os.path.join(DATA_DIR, "endorsement_cube.npz")
+DIMENSIONS = ("degree", "month", "question", "trait")
+UNKNOWN = "(unknown)"
+MAX_MEMO = 256
+
+def month_key(timestamp=None):
+    """'YYYY-MM' for a timestamp (datetime or ISO string); now if omitted."""
+    if timestamp is None:
+        return datetime.now(UTC).strftime("%Y-%m")
+    try:
+        return pd.Timestamp(timestamp).strftime("%Y-%m")
+    except (ValueError, TypeError):
+        return UNKNOWN
+
+def _as_list(value):
+    if value is None:
+        return None
+    return [value] if isinstance(value, (str, int, np.integer)) else list(value)
+
+def _save_at_exit(ref):
+    store = ref()
+    if store is not None:
+        store.save()
+
+class EndorsementCube:
+    """Dense (degree, month, question) yes/total counters, persisted as one .npz file."""
+
+    def __init__(self, path=DEFAULT_CUBE_PATH, save_interval=30.0):
+        self.path = path
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._degrees, self._months = [], []
+        self._degree_index, self._month_index = {}, {}
+        self._yes = np.zeros((0, 0, N_QUESTIONS), dtype=np.int64)
+        self._total = np.zeros_like(self._yes)
+        self._memo = {}
+        self._dirty = False
+        self._last_save = 0.0
+        if path:
+            atexit.register(_save_at_exit, weakref.ref(self))
+        if path and os.path.exists(path):
+            with np.load(path, allow_pickle=False) as data:
+                self._degrees = data["degrees"].tolist()
+                self._months = data["months"].tolist()
+                self._yes = data["yes"].astype(np.int64)
+                self._total = data["total"].astype(np.int64)
+            self._degree_index = {d: i for i, d in enumerate(self._degrees)}
+            self._month_index = {m: i for i, m in enumerate(self._months)}
+
+    # -------------------------
+    # Updates
+    # -------------------------
+    def _grow(self, n_degrees, n_months):
+        d, m = self._yes.shape[:2]
+        if n_degrees <= d and n_months <= m:
+            return
+        shape = (max(n_degrees, d), max(n_months, m), N_QUESTIONS)
+        for name in ("_yes", "_total"):
+            grown = np.zeros(shape, dtype=np.int64)
+            grown[:d, :m] = getattr(self, name)
+            setattr(self, name, grown)
+
+    def _codes(self, keys, names, index):
+        codes = np.empty(len(keys), dtype=np.int64)
+        for i, key in enumerate(keys):
+            code = index.get(key)
+            if code is None:
+                code = index[key] = len(names)
+                names.append(key)
+            codes[i] = code
+        return codes
+
+    def _add(self, degree_codes, month_codes, matrix):
+        self._grow(len(self._degrees), len(self._months))
+        cells = degree_codes * self._yes.shape[1] + month_codes
+        order = np.argsort(cells, kind="stable")
+        cells, matrix = cells[order], matrix[order]
+        starts = np.flatnonzero(np.r_[True, cells[1:] != cells[:-1]])
+        yes = np.add.reduceat((matrix == 1).astype(np.int64), starts, axis=0)
+        total = np.add.reduceat((matrix >= 0).astype(np.int64), starts, axis=0)
+        flat_yes = self._yes.reshape(-1, N_QUESTIONS)
+        flat_total = self._total.reshape(-1, N_QUESTIONS)
+        flat_yes[cells[starts]] += yes
+        flat_total[cells[starts]] += total
+        self._memo.clear()
+        self._dirty = True
+
+    def record(self, degree, answers, timestamp=None):
+        """Add one submission; answers is the 42-item row (1/0, -1 = not answered)."""
+        row = np.asarray(answers, dtype=np.int8).reshape(1, N_QUESTIONS)
+        with self._lock:
+            d = self._codes([normalize_degree(degree) or UNKNOWN], self._degrees, self._degree_index)
+            m = self._codes([month_key(timestamp)], self._months, self._month_index)
+            self._add(d, m, row)
+            if time.monotonic() - self._last_save >= self.save_interval:
+                self._save_locked()
+
+    def record_matrix(self, degrees, months, matrix):
+        """Add many submissions at once (used by rebuild)."""
+        matrix = np.asarray(matrix, dtype=np.int8)
+        if not len(matrix):
+            return
+        degree_keys, degree_inverse = np.unique([normalize_degree(d) or UNKNOWN for d in degrees],
+                                                return_inverse=True)
+        month_keys, month_inverse = np.unique([m or UNKNOWN for m in months], return_inverse=True)
+        with self._lock:
+            d = self._codes(degree_keys.tolist(), self._degrees, self._degree_index)[degree_inverse]
+            m = self._codes(month_keys.tolist(), self._months, self._month_index)[month_inverse]
+            self._add(d, m, matrix)
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    @property
+    def degrees(self):
+        return list(self._degrees)
+
+    @property
+    def months(self):
+        return sorted(self._months)
+
+    def rollup(self, by=(), degree=None, month=None, question=None, trait=None):
+        """Yes / answered counts grouped by the dimensions in `by`.
+
+        Filters take one value or a list; degrees are normalized like cohorts.
+        Returns a DataFrame with the `by` columns plus yes, total and endorsement.
+        """
+        by = tuple(by)
+        unknown = [b for b in by if b not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown dimension(s): {unknown}; expected any of {DIMENSIONS}")
+        key = (by, *(tuple(_as_list(f)) if f is not None else None for f in (degree, month, question, trait)))
+        with self._lock:
+            result = self._memo.get(key)
+            if result is None:
+                result = self._rollup(by, degree, month, question, trait)
+                if len(self._memo) >= MAX_MEMO:
+                    self._memo.clear()
+                self._memo[key] = result
+        return result.copy()
+
+    def _rollup(self, by, degree, month, question, trait):
+        degree_idx = np.arange(len(self._degrees))
+        if degree is not None:
+            wanted = [self._degree_index.get(normalize_degree(d) or UNKNOWN) for d in _as_list(degree)]
+            degree_idx = np.array([i for i in wanted if i is not None], dtype=np.int64)
+        month_idx = np.arange(len(self._months))
+        if month is not None:
+            wanted = [self._month_index.get(str(m)) for m in _as_list(month)]
+            month_idx = np.array([i for i in wanted if i is not None], dtype=np.int64)
+        question_mask = np.ones(N_QUESTIONS, dtype=bool)
+        if question is not None:
+            question_mask &= np.isin(QUESTION_IDS, [int(str(q).lstrip("Qq")) for q in _as_list(question)])
+        trait_mask = np.ones(len(TRAITS), dtype=bool)
+        if trait is not None:
+            trait_mask &= np.isin(TRAITS, _as_list(trait))
+            question_mask &= (TRAIT_ONEHOT[:, trait_mask] > 0).any(axis=1)
+
+        idx = np.ix_(degree_idx, month_idx, np.flatnonzero(question_mask))
+        yes, total = self._yes[idx], self._total[idx]
+        labels = [np.array(self._degrees, dtype=object)[degree_idx],
+                  np.array(self._months, dtype=object)[month_idx]]
+        if "question" in by:
+            labels.append(QUESTION_IDS[question_mask])
+            axes = ["degree", "month", "question"]
+        else:
+            # fold questions into traits; only traits with a selected question remain
+            onehot = TRAIT_ONEHOT[question_mask][:, trait_mask].astype(np.int64)
+            yes, total = yes @ onehot, total @ onehot
+            labels.append(np.array(TRAITS, dtype=object)[trait_mask])
+            axes = ["degree", "month", "trait"]
+        keep = [a for a in axes if a in by]
+        sum_axes = tuple(i for i, a in enumerate(axes) if a not in by)
+        yes, total = yes.sum(axis=sum_axes), total.sum(axis=sum_axes)
+
+        if keep:
+            index = pd.MultiIndex.from_product([labels[axes.index(a)] for a in keep], names=keep)
+            df = pd.DataFrame({"yes": yes.ravel(), "total": total.ravel()}, index=index).reset_index()
+        else:
+            df = pd.DataFrame({"yes": [int(yes)], "total": [int(total)]})
+        if "question" in by and "trait" in by:
+            df["trait"] = df["question"].map(dict(zip(QUESTION_IDS.tolist(), TRAIT_ONEHOT.argmax(axis=1))))
+            df["trait"] = df["trait"].map(dict(enumerate(TRAITS)))
+        if keep:
+            df = df[df["total"] > 0]
+        df["endorsement"] = (df["yes"] / df["total"].where(df["total"] > 0)).round(4)
+        sort_cols = [b for b in by if b in df.columns]
+        if sort_cols:
+            df = df.sort_values(sort_cols)
+        return df[list(by) + ["yes", "total", "endorsement"]].reset_index(drop=True)
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+    def _save_locked(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp.npz"
+        d, m = len(self._degrees), len(self._months)
+        # counts per cell are far below 2**32, so uint32 halves the file
+        np.savez_compressed(tmp, degrees=np.array(self._degrees, dtype=str), months=np.array(self._months, dtype=str),
+                            yes=self._yes[:d, :m].astype(np.uint32), total=self._total[:d, :m].astype(np.uint32))
+        os.replace(tmp, self.path)
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    def save(self):
+        with self._lock:
+            if self._dirty:
+                self._save_locked()
+
+def rebuild_from_sheet(sh, path=DEFAULT_CUBE_PATH):
+    """Recompute the cube from the answers and submissions tabs."""
+    from sheets_io import read_tab
+    from answer_codec import read_answer_matrix
+
+    ids, matrix = read_answer_matrix(sh)
+    header, rows = read_tab(sh, "submissions")
+    degrees, months = [""] * len(ids), [UNKNOWN] * len(ids)
+    if rows and len(ids):
+        sub = pd.DataFrame(rows, columns=header).drop_duplicates("submission_id").set_index("submission_id")
+        sub = sub.reindex(ids)
+        degrees = sub["degree"].fillna("").tolist()
+        stamps = pd.to_datetime(sub["timestamp"], errors="coerce", utc=True, format="ISO8601")
+        months = stamps.dt.strftime("%Y-%m").fillna(UNKNOWN).tolist()
+    cube = EndorsementCube(path=None)
+    cube.record_matrix(degrees, months, matrix)
+    cube.path = path
+    cube.save()
+    return cube
+
+def main(argv=None):
+    from sheets_io import add_spreadsheet_args, spreadsheet_from_args
+
+    parser = argparse.ArgumentParser(description="Degree x month x question endorsement cube.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild = sub.add_parser("rebuild", help="Rebuild the cube from the spreadsheet")
+    add_spreadsheet_args(rebuild)
+    rebuild.add_argument("--out", default=DEFAULT_CUBE_PATH)
+    show = sub.add_parser("show", help="Print a rollup")
+    show.add_argument("--path", default=DEFAULT_CUBE_PATH)
+    show.add_argument("--by", nargs="*", default=[], choices=DIMENSIONS)
+    show.add_argument("--degree", nargs="+")
+    show.add_argument("--month", nargs="+")
+    show.add_argument("--question", nargs="+")
+    show.add_argument("--trait", nargs="+", choices=TRAITS)
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        cube = rebuild_from_sheet(spreadsheet_from_args(args), args.out)
+        total = cube.rollup()["total"].iloc[0]
+        print(f"Wrote {args.out}: {len(cube.degrees)} degrees x {len(cube.months)} months, {total:,} answers")
+        return
+    cube = EndorsementCube(args.path)
+    df = cube.rollup(args.by, args.degree, args.month, args.question, args.trait)
+    with pd.option_context("display.max_rows", 500, "display.width", 120):
+        print(df.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# Analysis-ready export: one row per submission_id with submission metadata,
+# consent flags, Q1..Q42, the six percents and the 12 course flags.
+#
+# Tabs, and any shards of them, are streamed from the sheet in row-range
+# chunks into a temporary SQLite file, joined/pivoted there, and written out
+# chunk by chunk as CSV or Parquet, so memory stays bounded by the chunk size
+# however many submissions there are. Chunk reads are spaced to stay inside the
+# per-minute read quota and retried on quota/server errors.
+#
+#   python export_dataset.py --credentials sa.json --spreadsheet-id ID -o riasec.csv
+#   python export_dataset.py --local sheet.json -o riasec.parquet --format parquet
+import argparse
+import csv
+import os
+import sqlite3
+import tempfile
+import time
+
+from gspread.exceptions import APIError, WorksheetNotFound
+from gspread.utils import rowcol_to_a1
+
+from riasec_core import (
+    COURSES, SUBMISSIONS_HEADERS, ANSWERS_HEADERS, SCORES_HEADERS, CHOICES_HEADERS,
+)
+from answer_codec import WIDE_ANSWERS_TAB, WIDE_ANSWERS_HEADERS, QUESTION_IDS, decode_matrix
+from sheet_shards import load_shard_index, shard_sources
+
+DEFAULT_CHUNK_ROWS = 10000
+MIN_SECONDS_BETWEEN_READS = 1.1  # 60 read requests per minute per user
+MAX_RETRIES = 5
+QUESTION_COLUMNS = [f"Q{qid}" for qid in QUESTION_IDS.tolist()]
+PERCENT_COLUMNS = SCORES_HEADERS[1:]
+EXPORT_COLUMNS = SUBMISSIONS_HEADERS + QUESTION_COLUMNS + PERCENT_COLUMNS + COURSES
+
+TABS = {
+    "submissions": SUBMISSIONS_HEADERS,
+    "answers": ANSWERS_HEADERS,
+    WIDE_ANSWERS_TAB: WIDE_ANSWERS_HEADERS,
+    "scores": SCORES_HEADERS,
+    "choices": CHOICES_HEADERS,
+}
+
+def _sql_name(name):
+    return '"' + name.replace('"', '""') + '"'
+
+class ThrottledReader:
+    """ws.get with a minimum spacing between requests and retries on quota/server errors."""
+
+    def __init__(self, min_interval=MIN_SECONDS_BETWEEN_READS, max_retries=MAX_RETRIES):
+        self.min_interval, self.max_retries = min_interval, max_retries
+        self._last = 0.0
+        self.requests = 0
+
+    def get(self, ws, range_name):
+        for attempt in range(self.max_retries + 1):
+            wait = self.min_interval - (time.monotonic() - self._last)
+            if wait > 0:
+                time.sleep(wait)
+            self._last = time.monotonic()
+            try:
+                rows = ws.get(range_name)
+                self.requests += 1
+                return rows
+            except APIError as exc:
+                status = getattr(getattr(exc, "response", None), "status_code", None)
+                if status not in (429, 500, 502, 503) or attempt == self.max_retries:
+                    raise
+                time.sleep(min(60, 2 ** attempt * 5))
+
+def iter_tab_chunks(sh, title, n_cols, chunk_rows=DEFAULT_CHUNK_ROWS, reader=None):
+    """Yield lists of data rows (header skipped) in row-range chunks."""
+    reader = reader or ThrottledReader()
+    try:
+        ws = sh.worksheet(title)
+    except WorksheetNotFound:
+        return
+    start = 2
+    while start <= ws.row_count:
+        end = start + chunk_rows - 1
+        rows = reader.get(ws, f"{rowcol_to_a1(start, 1)}:{rowcol_to_a1(end, n_cols)}")
+        if not rows:
+            break
+        yield [r + [""] * (n_cols - len(r)) for r in rows]
+        start = end + 1
+
+def stage_tabs(sh, db, chunk_rows=DEFAULT_CHUNK_ROWS, progress=None, min_interval=MIN_SECONDS_BETWEEN_READS):
+    """Copy every tab and its shards into SQLite tables named after the base tab, one chunk at a time."""
+    index = load_shard_index(sh)
+    reader = ThrottledReader(min_interval)
+    for title, headers in TABS.items():
+        cols = ", ".join(f"{_sql_name(h)} TEXT" for h in headers)
+        db.execute(f"CREATE TABLE {_sql_name(title)} ({cols})")
+        placeholders = ", ".join("?" * len(headers))
+        for source_sh, tab in shard_sources(sh, title, index=index):
+            for rows in iter_tab_chunks(source_sh, tab, len(headers), chunk_rows, reader):
+                db.executemany(f"INSERT INTO {_sql_name(title)} VALUES ({placeholders})", rows)
+                if progress:
+                    progress(tab, len(rows))
+        db.execute(f"CREATE INDEX {_sql_name('idx_' + title)} ON {_sql_name(title)} (submission_id)")
+    db.commit()
+
+def _stage_latest_rows(db):
+    """Temp tables of the last rowid per submission_id in scores and choices, built once."""
+    for table in ("scores", "choices"):
+        db.execute(f"DROP TABLE IF EXISTS {table}_last")
+        db.execute(f"CREATE TEMP TABLE {table}_last AS "
+                   f"SELECT submission_id, MAX(rowid) AS rid FROM {table} GROUP BY submission_id")
+        db.execute(f"CREATE INDEX temp.idx_{table}_last ON {table}_last (submission_id)")
+
+def _joined_query():
+    pivot = ", ".join(
+        f"MAX(CASE WHEN CAST(question_id AS INTEGER) = {qid} THEN answer END) AS {_sql_name(col)}"
+        for qid, col in zip(QUESTION_IDS.tolist(), QUESTION_COLUMNS)
+    )
+    sub_cols = ", ".join(f"s.{_sql_name(h)}" for h in SUBMISSIONS_HEADERS)
+    pct_cols = ", ".join(f"sc.{_sql_name(h)}" for h in PERCENT_COLUMNS)
+    course_cols = ", ".join(f"c.{_sql_name(h)}" for h in COURSES)
+    q_cols = ", ".join(f"a.{_sql_name(c)}" for c in QUESTION_COLUMNS)
+    return f"""
+        WITH a AS (SELECT submission_id, {pivot} FROM answers GROUP BY submission_id),
+             w AS (SELECT submission_id, MAX(answers) AS answers FROM {_sql_name(WIDE_ANSWERS_TAB)} GROUP BY submission_id)
+        SELECT {sub_cols}, w.answers, {q_cols}, {pct_cols}, {course_cols}
+        FROM submissions s
+        LEFT JOIN a ON a.submission_id = s.submission_id
+        LEFT JOIN w ON w.submission_id = s.submission_id
+        LEFT JOIN scores_last scl ON scl.submission_id = s.submission_id
+        LEFT JOIN scores sc ON sc.rowid = scl.rid
+        LEFT JOIN choices_last cl ON cl.submission_id = s.submission_id
+        LEFT JOIN choices c ON c.rowid = cl.rid
+        ORDER BY s.rowid
+    """
+
+def iter_joined_chunks(db, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield lists of export rows in EXPORT_COLUMNS order."""
+    n_sub = len(SUBMISSIONS_HEADERS)
+    _stage_latest_rows(db)
+    cur = db.execute(_joined_query())
+    while True:
+        rows = cur.fetchmany(chunk_rows)
+        if not rows:
+            break
+        wide = [r[n_sub] for r in rows]
+        decoded = decode_matrix([w or "" for w in wide])
+        out = []
+        for row, wide_answers, matrix_row in zip(rows, wide, decoded):
+            row = list(row)
+            questions = row[n_sub + 1:n_sub + 1 + len(QUESTION_COLUMNS)]
+            if wide_answers:
+                questions = ["" if v < 0 else str(v) for v in matrix_row.tolist()]
+            out.append(row[:n_sub] + ["" if q is None else q for q in questions]
+                       + ["" if v is None else v for v in row[n_sub + 1 + len(QUESTION_COLUMNS):]])
+        yield out
+
+def _parquet_writer(path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    fields = [pa.field(c, pa.string()) for c in SUBMISSIONS_HEADERS]
+    fields += [pa.field(c, pa.int8()) for c in QUESTION_COLUMNS]
+    fields += [pa.field(c, pa.float32()) for c in PERCENT_COLUMNS]
+    fields += [pa.field(c, pa.int8()) for c in COURSES]
+    schema = pa.schema(fields)
+    writer = pq.ParquetWriter(path, schema, compression="zstd")
+
+    def _num(v, cast):
+        try:
+            return cast(float(v))
+        except (TypeError, ValueError):
+            return None
+
+    def write(rows):
+        columns = list(zip(*rows))
+        arrays = []
+        for field, values in zip(fields, columns):
+            if pa.types.is_string(field.type):
+                arrays.append(pa.array(values, type=field.type))
+            else:
+                cast = float if pa.types.is_floating(field.type) else int
+                arrays.append(pa.array([_num(v, cast) for v in values], type=field.type))
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+    return write, writer.close
+
+def export(sh, out_path, fmt="csv", chunk_rows=DEFAULT_CHUNK_ROWS, progress=None, tmp_dir=None,
+           min_interval=MIN_SECONDS_BETWEEN_READS):
+    """Stream the joined wide table to out_path; returns the number of submissions written."""
+    fd, db_path = tempfile.mkstemp(suffix=".sqlite", dir=tmp_dir)
+    os.close(fd)
+    db = sqlite3.connect(db_path)
+    try:
+        stage_tabs(sh, db, chunk_rows, progress, min_interval)
+        written = 0
+        if fmt == "parquet":
+            write, close = _parquet_writer(out_path)
+            try:
+                for rows in iter_joined_chunks(db, chunk_rows):
+                    write(rows)
+                    written += len(rows)
+            finally:
+                close()
+        else:
+            with open(out_path, "w", newline="", encoding="utf-8") as fh:
+                writer = csv.writer(fh)
+                writer.writerow(EXPORT_COLUMNS)
+                for rows in iter_joined_chunks(db, chunk_rows):
+                    writer.writerows(rows)
+                    written += len(rows)
+        return written
+    finally:
+        db.close()
+        os.remove(db_path)
+
+def main(argv=None):
+    from sheets_io import add_spreadsheet_args, spreadsheet_from_args
+
+    parser = argparse.ArgumentParser(description="Export one analysis-ready row per submission.")
+    add_spreadsheet_args(parser)
+    parser.add_argument("-o", "--output", required=True)
+    parser.add_argument("--format", choices=["csv", "parquet"], default=None,
+                        help="Defaults from the output file extension")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--min-interval", type=float, default=MIN_SECONDS_BETWEEN_READS,
+                        help="Seconds between read requests")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("parquet" if args.output.endswith(".parquet") else "csv")
+    t0 = time.perf_counter()
+    n = export(spreadsheet_from_args(args), args.output, fmt, args.chunk_rows,
+               progress=lambda tab, n: print(f"  staged {n} rows from {tab}"), min_interval=args.min_interval)
+    print(f"Wrote {n} submissions to {args.output} in {time.perf_counter() - t0:.1f}s")
+
+if __name__ == "__main__":
+    main()
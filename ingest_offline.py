@@ -0,0 +1,279 @@
+# Bulk ingest of paper / offline survey responses from CSV.
+#
+# Expected columns: student_name, degree, Q1..Q42 (Yes/No, Y/N or 1/0), and
+# optionally email, timestamp, consent_purpose, consent_confidentiality,
+# consent_participate, and course choices either as one column per course
+# (1/0) or a "courses" column of names separated by ";".
+#
+# The file is streamed in chunks; each row is validated, scored with the same
+# rules as compute_standardized_scores (vectorized via score_answer_matrix)
+# and given a deterministic uuid5 submission_id derived from the batch id (a
+# hash of the file contents unless --batch-id is given) and the row number, so
+# re-running a file never invents new ids and two files that happen to share
+# a name never share ids. A batch whose ids are already in the submissions tab
+# is refused unless a checkpoint says it is being resumed. Every chunk is
+# one append per tab (submissions, answers, scores, choices), spaced out to
+# stay within the write quota, and a checkpoint records which tabs of which
+# chunk are done so an interrupted run resumes without duplicating rows.
+#
+#   python ingest_offline.py responses.csv --credentials sa.json --spreadsheet-id ID
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import time
+import uuid
+from datetime import datetime, UTC
+
+import numpy as np
+import pandas as pd
+from gspread.exceptions import APIError
+
+from riasec_core import (
+    COURSES, DATA_DIR, SUBMISSIONS_HEADERS, ANSWERS_HEADERS, SCORES_HEADERS, CHOICES_HEADERS,
+)
+from answer_codec import (
+    QUESTION_IDS, QUESTION_TRAITS, N_QUESTIONS, WIDE_ANSWERS_TAB, WIDE_ANSWERS_HEADERS, INSTRUMENT_VERSION,
+    score_answer_matrix,
+)
+from sheets_io import get_or_create_worksheet
+
+INGEST_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "riasec-survey/offline-ingest")
+DEFAULT_CHUNK_ROWS = 500
+MIN_SECONDS_BETWEEN_WRITES = 1.1
+MAX_RETRIES = 5
+QUESTION_COLUMNS = [f"Q{qid}" for qid in QUESTION_IDS.tolist()]
+CONSENT_COLUMNS = ["consent_purpose", "consent_confidentiality", "consent_participate"]
+_YES = {"y", "yes", "1", "true"}
+_NO = {"n", "no", "0", "false"}
+_COURSE_LOOKUP = {c.casefold(): i for i, c in enumerate(COURSES)}
+
+class RowError(ValueError):
+    pass
+
+def validate_header(header):
+    missing = [c for c in ["student_name", "degree"] + QUESTION_COLUMNS if c not in header]
+    if missing:
+        raise SystemExit(f"CSV is missing required columns: {', '.join(missing)}")
+
+def parse_row(row, allow_skipped=False):
+    """Validate one CSV row; returns (metadata dict, answers int8 row, choices list)."""
+    name, degree = (row.get("student_name") or "").strip(), (row.get("degree") or "").strip()
+    if not name or not degree:
+        raise RowError("student_name and degree are required")
+    answers = np.full(N_QUESTIONS, -1, dtype=np.int8)
+    for i, col in enumerate(QUESTION_COLUMNS):
+        value = (row.get(col) or "").strip().casefold()
+        if value in _YES:
+            answers[i] = 1
+        elif value in _NO:
+            answers[i] = 0
+        elif value or not allow_skipped:
+            raise RowError(f"{col}: expected Yes/No, got {row.get(col)!r}")
+
+    if any(c in row for c in COURSES):
+        choices = [1 if (row.get(c) or "").strip().casefold() in _YES else 0 for c in COURSES]
+    else:
+        choices = [0] * len(COURSES)
+        for course in filter(None, (c.strip().casefold() for c in (row.get("courses") or "").split(";"))):
+            if course not in _COURSE_LOOKUP:
+                raise RowError(f"unknown course {course!r}")
+            choices[_COURSE_LOOKUP[course]] = 1
+    if sum(choices) > 4:
+        raise RowError(f"{sum(choices)} courses selected; at most 4 allowed")
+
+    raw_ts = (row.get("timestamp") or "").strip()
+    try:
+        ts = pd.Timestamp(raw_ts) if raw_ts else pd.Timestamp(datetime.now(UTC))
+    except ValueError:
+        raise RowError(f"invalid timestamp {raw_ts!r}")
+    ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+    consents = [str((row.get(c) or "True").strip().casefold() in _YES) for c in CONSENT_COLUMNS]
+    meta = {"student_name": name, "degree": degree, "email": (row.get("email") or "").strip(),
+            "timestamp": ts.isoformat(), "consents": consents}
+    return meta, answers, choices
+
+def file_batch_id(csv_path):
+    """Batch id from the file contents, so renamed copies match and different files never do."""
+    digest = hashlib.sha256()
+    with open(csv_path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:20]
+
+def submission_id(batch_id, row_number):
+    return str(uuid.uuid5(INGEST_NAMESPACE, f"{batch_id}:{row_number}"))
+
+def build_chunk_rows(batch_id, parsed, answers_format="long"):
+    """{tab: rows} for one chunk of (row_number, meta, answers, choices)."""
+    matrix = np.vstack([answers for _, _, answers, _ in parsed])
+    percents = score_answer_matrix(matrix)
+    rows = {"submissions": [], "answers": [], "scores": [], "choices": []}
+    qids, traits = QUESTION_IDS.tolist(), QUESTION_TRAITS.tolist()
+    chars = np.array(["-", "N", "Y"])[matrix.astype(np.int64) + 1]
+    for (row_number, meta, answers, choices), pct, encoded in zip(parsed, percents, chars):
+        sid = submission_id(batch_id, row_number)
+        rows["submissions"].append([sid, meta["student_name"], meta["degree"], meta["email"], meta["timestamp"],
+                                    *meta["consents"], meta["timestamp"]])
+        if answers_format == "wide":
+            rows["answers"].append([sid, INSTRUMENT_VERSION, "".join(encoded)])
+        else:
+            rows["answers"] += [[sid, q, t, "" if a < 0 else int(a)] for q, t, a in zip(qids, traits, answers)]
+        rows["scores"].append([sid] + [f"{v:.1f}" for v in pct])
+        rows["choices"].append([sid] + choices)
+    return rows
+
+# -------------------------
+# Checkpoint and writes
+# -------------------------
+def checkpoint_path_for(batch_id):
+    return os.path.join(DATA_DIR, f"ingest_{batch_id}.checkpoint.json")
+
+def load_checkpoint(path, batch_id, chunk_rows, source=None):
+    if path and os.path.exists(path):
+        with open(path) as fh:
+            state = json.load(fh)
+        if state.get("batch_id") == batch_id:
+            if state["chunk_rows"] != chunk_rows:
+                raise SystemExit(f"Checkpoint was written with --chunk-rows {state['chunk_rows']}; use the same value")
+            return state
+    return {"batch_id": batch_id, "source": source, "chunk_rows": chunk_rows, "next_row": 1, "tabs_done": [],
+            "written": 0, "rejected": 0}
+
+def already_ingested(submissions_ws, batch_id, probe_rows=1000):
+    """True if any of the batch's first probe_rows ids is already in the submissions tab."""
+    existing = set(submissions_ws.col_values(1))
+    return any(submission_id(batch_id, r) in existing for r in range(1, probe_rows + 1))
+
+def save_checkpoint(path, state):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(state, fh)
+    os.replace(tmp, path)
+
+class ThrottledWriter:
+    """append_rows with a minimum spacing between requests and retries on quota/server errors."""
+
+    def __init__(self, min_interval=MIN_SECONDS_BETWEEN_WRITES, max_retries=MAX_RETRIES):
+        self.min_interval, self.max_retries = min_interval, max_retries
+        self._last = 0.0
+        self.requests = 0
+
+    def append(self, ws, rows):
+        for attempt in range(self.max_retries + 1):
+            wait = self.min_interval - (time.monotonic() - self._last)
+            if wait > 0:
+                time.sleep(wait)
+            self._last = time.monotonic()
+            try:
+                ws.append_rows(rows, value_input_option="USER_ENTERED")
+                self.requests += 1
+                return
+            except APIError as exc:
+                status = getattr(getattr(exc, "response", None), "status_code", None)
+                if status not in (429, 500, 502, 503) or attempt == self.max_retries:
+                    raise
+                time.sleep(min(60, 2 ** attempt * 5))
+
+def ingest(sh, csv_path, answers_format="long", chunk_rows=DEFAULT_CHUNK_ROWS, checkpoint_path=None,
+           rejects_path=None, allow_skipped=False, dry_run=False, min_interval=MIN_SECONDS_BETWEEN_WRITES,
+           progress=None, batch_id=None):
+    """Stream csv_path into the four tabs; returns the checkpoint state at the end."""
+    batch_id = batch_id or file_batch_id(csv_path)
+    checkpoint_path = checkpoint_path or checkpoint_path_for(batch_id)
+    state = load_checkpoint(checkpoint_path, batch_id, chunk_rows, os.path.basename(csv_path))
+    resuming = state["next_row"] > 1 or bool(state["tabs_done"])
+    answers_tab, answers_headers = ((WIDE_ANSWERS_TAB, WIDE_ANSWERS_HEADERS) if answers_format == "wide"
+                                    else ("answers", ANSWERS_HEADERS))
+    tabs = None if dry_run else {
+        "submissions": get_or_create_worksheet(sh, "submissions", SUBMISSIONS_HEADERS),
+        "answers": get_or_create_worksheet(sh, answers_tab, answers_headers),
+        "scores": get_or_create_worksheet(sh, "scores", SCORES_HEADERS),
+        "choices": get_or_create_worksheet(sh, "choices", CHOICES_HEADERS),
+    }
+    if tabs and not resuming and already_ingested(tabs["submissions"], batch_id):
+        raise SystemExit(f"Batch {batch_id} ({os.path.basename(csv_path)}) is already in the submissions tab; "
+                         "refusing to ingest it again")
+    writer = ThrottledWriter(min_interval)
+    rejects_fh = open(rejects_path, "a", newline="") if rejects_path else None
+    rejects = csv.writer(rejects_fh) if rejects_fh else None
+    try:
+        with open(csv_path, newline="", encoding="utf-8-sig") as fh:
+            reader = csv.DictReader(fh)
+            validate_header(reader.fieldnames or [])
+            numbered = enumerate(reader, start=1)
+            # chunks are counted from the first data row, so resuming never shifts boundaries
+            for chunk_start in itertools.count(1, chunk_rows):
+                chunk = list(itertools.islice(numbered, chunk_rows))
+                if not chunk:
+                    break
+                if chunk_start + len(chunk) <= state["next_row"]:
+                    continue
+                parsed = []
+                for row_number, row in chunk:
+                    try:
+                        parsed.append((row_number, *parse_row(row, allow_skipped)))
+                    except RowError as exc:
+                        if not state["tabs_done"]:
+                            state["rejected"] += 1
+                            if rejects:
+                                rejects.writerow([row_number, str(exc)])
+                if parsed and not dry_run:
+                    rows = build_chunk_rows(batch_id, parsed, answers_format)
+                    for tab in ("submissions", "answers", "scores", "choices"):
+                        if tab in state["tabs_done"]:
+                            continue
+                        writer.append(tabs[tab], rows[tab])
+                        state["tabs_done"].append(tab)
+                        save_checkpoint(checkpoint_path, state)
+                state["written"] += len(parsed)
+                state["next_row"] = chunk_start + len(chunk)
+                state["tabs_done"] = []
+                if not dry_run:
+                    save_checkpoint(checkpoint_path, state)
+                if progress:
+                    progress(state)
+    finally:
+        if rejects_fh:
+            rejects_fh.close()
+    state["requests"] = writer.requests
+    if not dry_run and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return state
+
+def main(argv=None):
+    from sheets_io import add_spreadsheet_args, spreadsheet_from_args, save_if_local
+
+    parser = argparse.ArgumentParser(description="Ingest offline survey responses from a CSV file.")
+    parser.add_argument("csv_path")
+    add_spreadsheet_args(parser)
+    parser.add_argument("--answers-format", choices=["long", "wide"], default="long")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--min-interval", type=float, default=MIN_SECONDS_BETWEEN_WRITES)
+    parser.add_argument("--batch-id", help="Namespace for submission ids (default: hash of the file contents)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: under the data directory)")
+    parser.add_argument("--rejects", help="Append rejected rows (row number, reason) to this CSV")
+    parser.add_argument("--allow-skipped", action="store_true", help="Accept blank answers as skipped items")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and score only")
+    args = parser.parse_args(argv)
+
+    sh = None if args.dry_run else spreadsheet_from_args(args)
+    t0 = time.perf_counter()
+    try:
+        state = ingest(sh, args.csv_path, args.answers_format, args.chunk_rows, args.checkpoint, args.rejects,
+                       args.allow_skipped, args.dry_run, args.min_interval,
+                       progress=lambda s: print(f"  rows 1-{s['next_row'] - 1}: {s['written']:,} ingested, "
+                                                f"{s['rejected']:,} rejected"),
+                       batch_id=args.batch_id)
+    finally:
+        if sh is not None:
+            save_if_local(sh)
+    verb = "Validated" if args.dry_run else "Ingested"
+    print(f"{verb} {state['written']:,} rows of batch {state['batch_id']} ({state['rejected']:,} rejected) with "
+          f"{state['requests']} write requests in {time.perf_counter() - t0:.1f}s")
+
+if __name__ == "__main__":
+    main()
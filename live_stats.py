@@ -0,0 +1,73 @@
+# In-process running aggregates for the live cohort dashboard. Every
+# submission adds to a count, per-trait sums and sums of squares, a Holland
+# code frequency table and a per-minute ring of submission counts, so both
+# recording and reading are constant time and the sheet is never re-read.
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from riasec_core import TRAITS
+
+WINDOW_MINUTES = 60
+
+def holland_code(percents, length=3):
+    """Top traits by percent, ties broken in TRAITS order."""
+    order = sorted(range(len(TRAITS)), key=lambda i: -percents[i])
+    return "".join(TRAITS[i] for i in order[:length])
+
+class LiveAggregates:
+    def __init__(self, window_minutes=WINDOW_MINUTES):
+        self._lock = threading.Lock()
+        self.window = window_minutes
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+            self.sums = np.zeros(len(TRAITS))
+            self.sumsq = np.zeros(len(TRAITS))
+            self.codes = Counter()
+            self.started = time.time()
+            self.last_submission = None
+            self._minute_counts = np.zeros(self.window, dtype=np.int64)
+            self._minute_stamp = np.full(self.window, -1, dtype=np.int64)
+
+    def record(self, percents, now=None):
+        now = time.time() if now is None else now
+        p = np.asarray(percents, dtype=float)
+        minute = int(now // 60)
+        slot = minute % self.window
+        with self._lock:
+            self.count += 1
+            self.sums += p
+            self.sumsq += p * p
+            self.codes[holland_code(p)] += 1
+            if self._minute_stamp[slot] != minute:
+                self._minute_stamp[slot] = minute
+                self._minute_counts[slot] = 0
+            self._minute_counts[slot] += 1
+            self.last_submission = now
+
+    def snapshot(self, minutes=15, top_codes=10, now=None):
+        """Consistent copy of the aggregates for display."""
+        now = time.time() if now is None else now
+        current = int(now // 60)
+        with self._lock:
+            n = self.count
+            mean = self.sums / n if n else np.zeros(len(TRAITS))
+            var = np.maximum(self.sumsq / n - mean * mean, 0) if n else np.zeros(len(TRAITS))
+            per_minute = []
+            for m in range(current - minutes + 1, current + 1):
+                slot = m % self.window
+                per_minute.append((m * 60, int(self._minute_counts[slot]) if self._minute_stamp[slot] == m else 0))
+            return {
+                "count": n,
+                "mean": mean,
+                "std": np.sqrt(var),
+                "codes": self.codes.most_common(top_codes),
+                "per_minute": per_minute,
+                "started": self.started,
+                "last_submission": self.last_submission,
+            }
@@ -0,0 +1,192 @@
+# In-process stand-in for the subset of the gspread Spreadsheet/Worksheet API
+# used by this app and its offline jobs. Tabs live in memory and can be saved
+# to / loaded from a JSON file, so jobs can be exercised without Google Sheets.
+# Every API-equivalent call is counted in `calls` to check request budgets.
+import json
+import os
+import re
+import uuid
+from collections import Counter
+
+from gspread.exceptions import WorksheetNotFound
+
+_CELL_RE = re.compile(r"^([A-Z]*)(\d*)$")
+
+def col_to_index(letters):
+    n = 0
+    for ch in letters:
+        n = n * 26 + (ord(ch) - ord("A") + 1)
+    return n
+
+def index_to_col(n):
+    letters = ""
+    while n:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(ord("A") + rem) + letters
+    return letters
+
+def split_range(range_name):
+    """'tab'!A1:B2 -> ('tab', 'A1:B2'); a bare range returns (None, range)."""
+    if "!" in range_name:
+        title, rng = range_name.rsplit("!", 1)
+        return title.strip("'").replace("''", "'"), rng
+    return None, range_name
+
+def parse_a1(rng):
+    """Return 1-based (row1, col1, row2, col2); open ends are None."""
+    start, _, end = rng.upper().partition(":")
+    end = end or start
+    (c1, r1), (c2, r2) = (_CELL_RE.match(start).groups(), _CELL_RE.match(end).groups())
+    return (int(r1) if r1 else 1, col_to_index(c1) if c1 else 1,
+            int(r2) if r2 else None, col_to_index(c2) if c2 else None)
+
+class LocalWorksheet:
+    def __init__(self, spreadsheet, title, rows=1000, cols=26, values=None, sheet_id=None):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = sheet_id if sheet_id is not None else len(spreadsheet._sheets)
+        self._values = [list(map(str, r)) for r in (values or [])]
+        self.row_count = max(int(rows), len(self._values))
+        self.col_count = int(cols)
+
+    def _call(self, name):
+        self.spreadsheet.calls[name] += 1
+
+    def _grow(self, n_rows):
+        self.row_count = max(self.row_count, n_rows)
+
+    # Reads
+    def get_all_values(self):
+        self._call("read")
+        return [list(r) for r in self._values]
+
+    def row_values(self, row):
+        self._call("read")
+        return list(self._values[row - 1]) if row <= len(self._values) else []
+
+    def col_values(self, col):
+        self._call("read")
+        return [r[col - 1] if col <= len(r) else "" for r in self._values]
+
+    def _slice(self, rng):
+        r1, c1, r2, c2 = parse_a1(rng)
+        rows = self._values[r1 - 1:r2]
+        out = [r[c1 - 1:c2] for r in rows]
+        while out and not any(out[-1]):
+            out.pop()
+        return [list(r) for r in out]
+
+    def get(self, rng):
+        self._call("read")
+        return self._slice(rng)
+
+    def batch_get(self, ranges):
+        self._call("read")
+        return [self._slice(split_range(r)[1]) for r in ranges]
+
+    # Writes
+    def append_row(self, values, value_input_option="RAW"):
+        self.append_rows([values], value_input_option)
+
+    def append_rows(self, values, value_input_option="RAW"):
+        self._call("write")
+        self._values.extend([["" if v is None else str(v) for v in row] for row in values])
+        self._grow(len(self._values))
+
+    def insert_row(self, values, index=1, value_input_option="RAW"):
+        self._call("write")
+        self._values.insert(index - 1, [str(v) for v in values])
+        self._grow(len(self._values))
+
+    def delete_rows(self, start_index, end_index=None):
+        self._call("write")
+        del self._values[start_index - 1:(end_index or start_index)]
+
+    def add_rows(self, rows):
+        self._call("write")
+        self.row_count += int(rows)
+
+    def _write(self, rng, values):
+        r1, c1, _, _ = parse_a1(rng)
+        for i, row in enumerate(values):
+            r = r1 - 1 + i
+            while len(self._values) <= r:
+                self._values.append([])
+            target = self._values[r]
+            for j, v in enumerate(row):
+                c = c1 - 1 + j
+                if len(target) <= c:
+                    target.extend([""] * (c + 1 - len(target)))
+                target[c] = "" if v is None else str(v)
+        self._grow(len(self._values))
+
+    def update(self, rng, values=None, value_input_option="RAW"):
+        self._call("write")
+        self._write(rng, values)
+
+    def batch_update(self, data, value_input_option="RAW"):
+        self._call("write")
+        for item in data:
+            self._write(split_range(item["range"])[1], item["values"])
+
+class LocalSpreadsheet:
+    def __init__(self, title="Local RIASEC", path=None):
+        self.id = f"local-{uuid.uuid4().hex[:12]}"
+        self.title = title
+        self.path = path
+        self.calls = Counter()
+        self._sheets = {}
+
+    @classmethod
+    def load(cls, path):
+        sh = cls(path=path)
+        if os.path.exists(path):
+            with open(path) as fh:
+                data = json.load(fh)
+            sh.id, sh.title = data.get("id", sh.id), data.get("title", sh.title)
+            for tab in data.get("tabs", []):
+                sh._sheets[tab["title"]] = LocalWorksheet(
+                    sh, tab["title"], tab.get("rows", 1000), tab.get("cols", 26), tab.get("values"), tab.get("id"))
+        return sh
+
+    def save(self, path=None):
+        path = path or self.path
+        data = {"id": self.id, "title": self.title, "tabs": [
+            {"title": ws.title, "id": ws.id, "rows": ws.row_count, "cols": ws.col_count, "values": ws._values}
+            for ws in self._sheets.values()
+        ]}
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as fh:
+            json.dump(data, fh)
+        os.replace(tmp, path)
+
+    def worksheet(self, title):
+        try:
+            return self._sheets[title]
+        except KeyError:
+            raise WorksheetNotFound(title) from None
+
+    def worksheets(self):
+        return list(self._sheets.values())
+
+    def add_worksheet(self, title, rows=1000, cols=26, index=None):
+        self.calls["write"] += 1
+        ws = LocalWorksheet(self, title, rows, cols)
+        self._sheets[title] = ws
+        return ws
+
+    def values_batch_get(self, ranges, params=None):
+        self.calls["read"] += 1
+        out = []
+        for range_name in ranges:
+            title, rng = split_range(range_name)
+            out.append({"range": range_name, "values": self.worksheet(title)._slice(rng)})
+        return {"spreadsheetId": self.id, "valueRanges": out}
+
+    def values_batch_update(self, body):
+        self.calls["write"] += 1
+        for item in body.get("data", []):
+            title, rng = split_range(item["range"])
+            self.worksheet(title)._write(rng, item["values"])
+        return {"spreadsheetId": self.id, "totalUpdatedCells": sum(
+            len(r) for item in body.get("data", []) for r in item["values"])}
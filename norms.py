@@ -0,0 +1,168 @@
+# Cohort percentile norms. Each trait has 7 items, so a student's yes-count is
+# one of 8 values; per cohort we keep a (6 traits x 8 bins) histogram. Adding
+# a submission is one increment per trait and a percentile is a lookup in the
+# bin's running totals, independent of how many submissions came before.
+# The file has a single writer: each save replaces it with this process's
+# histograms, so replicas need their own RIASEC_DATA_DIR (or a periodic
+# rebuild). Pending updates are flushed at interpreter exit.
+#
+#   python norms.py rebuild --credentials sa.json --spreadsheet-id ID
+import argparse
+import atexit
+import os
+import threading
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from riasec_core import TRAITS, QUESTIONS, DATA_DIR, normalize_degree
+
+ALL_COHORT = "__all__"
+N_BINS = max(sum(1 for _, _, t in QUESTIONS if t == trait) for trait in TRAITS) + 1
+DEFAULT_NORMS_PATH = os.path.join(DATA_DIR, "norms.npz")
+MIN_COHORT_SIZE = 30
+
+def _save_at_exit(ref):
+    store = ref()
+    if store is not None:
+        store.save()
+
+class NormsStore:
+    """Per-cohort yes-count histograms, persisted as one .npz file."""
+
+    def __init__(self, path=DEFAULT_NORMS_PATH, save_interval=30.0):
+        self.path = path
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._hist = {}
+        self._below = {}
+        self._dirty = False
+        self._last_save = 0.0
+        if path:
+            atexit.register(_save_at_exit, weakref.ref(self))
+        if path and os.path.exists(path):
+            with np.load(path, allow_pickle=False) as data:
+                names = data["cohorts"].tolist()
+                hists = data["hists"]
+            for name, hist in zip(names, hists):
+                self._hist[name] = hist.astype(np.int64)
+                self._below[name] = self._cumulative(self._hist[name])
+
+    @staticmethod
+    def _cumulative(hist):
+        # below[t, k] = submissions with fewer than k yes answers on trait t
+        return np.concatenate([np.zeros((len(TRAITS), 1), dtype=np.int64), np.cumsum(hist, axis=1)[:, :-1]], axis=1)
+
+    def _bump(self, cohort, yes_counts):
+        hist = self._hist.get(cohort)
+        if hist is None:
+            hist = self._hist[cohort] = np.zeros((len(TRAITS), N_BINS), dtype=np.int64)
+            self._below[cohort] = np.zeros_like(hist)
+        below = self._below[cohort]
+        for t, k in enumerate(yes_counts):
+            hist[t, k] += 1
+            below[t, k + 1:] += 1
+
+    def record(self, degree, yes_counts):
+        """Add one submission; yes_counts are the six per-trait yes counts in TRAITS order."""
+        yes_counts = [int(k) for k in yes_counts]
+        with self._lock:
+            self._bump(ALL_COHORT, yes_counts)
+            cohort = normalize_degree(degree)
+            if cohort:
+                self._bump(cohort, yes_counts)
+            self._dirty = True
+            if time.monotonic() - self._last_save >= self.save_interval:
+                self._save_locked()
+
+    def size(self, cohort):
+        hist = self._hist.get(cohort)
+        return int(hist[0].sum()) if hist is not None else 0
+
+    def percentiles(self, cohort, yes_counts):
+        """Mid-rank percentile of each yes-count within the cohort, or None if empty."""
+        with self._lock:
+            hist = self._hist.get(cohort)
+            if hist is None:
+                return None
+            below = self._below[cohort]
+            total = hist[0].sum()
+            if total == 0:
+                return None
+            return [round(100.0 * (below[t, k] + 0.5 * hist[t, k]) / total, 1)
+                    for t, k in enumerate(int(k) for k in yes_counts)]
+
+    def profile(self, degree, yes_counts, min_size=MIN_COHORT_SIZE):
+        """DataFrame of degree-cohort and overall percentiles for one student."""
+        cohort = normalize_degree(degree)
+        overall = self.percentiles(ALL_COHORT, yes_counts)
+        in_cohort = self.percentiles(cohort, yes_counts) if self.size(cohort) >= min_size else None
+        return pd.DataFrame({
+            "trait": TRAITS,
+            "degree_percentile": in_cohort or [None] * len(TRAITS),
+            "overall_percentile": overall or [None] * len(TRAITS),
+        })
+
+    def _save_locked(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        names = sorted(self._hist)
+        tmp = f"{self.path}.tmp.npz"
+        np.savez_compressed(tmp, cohorts=np.array(names, dtype=str),
+                            hists=np.stack([self._hist[n] for n in names]) if names
+                            else np.zeros((0, len(TRAITS), N_BINS), dtype=np.int64))
+        os.replace(tmp, self.path)
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    def save(self):
+        with self._lock:
+            if self._dirty:
+                self._save_locked()
+
+def rebuild_from_sheet(sh, path=DEFAULT_NORMS_PATH):
+    """Recompute all histograms from the answers and submissions tabs."""
+    from sheets_io import read_tab
+    from answer_codec import read_answer_matrix, trait_yes_counts
+
+    ids, matrix = read_answer_matrix(sh)
+    header, rows = read_tab(sh, "submissions")
+    degree_of = {}
+    if rows:
+        sub = pd.DataFrame(rows, columns=header)
+        degree_of = dict(zip(sub["submission_id"], sub["degree"]))
+
+    complete = (matrix >= 0).all(axis=1)
+    counts = trait_yes_counts(matrix[complete])
+    store = NormsStore(path=None)
+    for sid, yes_counts in zip(ids[complete], counts):
+        store.record(degree_of.get(sid, ""), yes_counts)
+    store.path = path
+    store.save()
+    return store
+
+def main(argv=None):
+    from sheets_io import add_spreadsheet_args, spreadsheet_from_args
+
+    parser = argparse.ArgumentParser(description="Cohort percentile norms.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild = sub.add_parser("rebuild", help="Rebuild histograms from the spreadsheet")
+    add_spreadsheet_args(rebuild)
+    rebuild.add_argument("--out", default=DEFAULT_NORMS_PATH)
+    show = sub.add_parser("show", help="Print cohort sizes")
+    show.add_argument("--path", default=DEFAULT_NORMS_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        store = rebuild_from_sheet(spreadsheet_from_args(args), args.out)
+        print(f"Wrote {args.out}: {store.size(ALL_COHORT)} submissions, {len(store._hist) - 1} degree cohorts")
+    else:
+        store = NormsStore(args.path)
+        for name in sorted(store._hist, key=store.size, reverse=True):
+            print(f"{store.size(name):>8}  {name}")
+
+if __name__ == "__main__":
+    main()
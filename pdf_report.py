@@ -0,0 +1,382 @@
+# Multi-page PDF results report, written directly as PDF operators (no extra
+# dependency): vector radar, score table, top traits with descriptions,
+# course matches and an interpretation page. Fonts are the standard Helvetica
+# faces, and the font objects and the static interpretation page are
+# compiled once per process and reused by every report.
+#
+#   python pdf_report.py bulk --credentials sa.json --spreadsheet-id ID --out-dir reports/
+#   python pdf_report.py one "Student Name" YNNY...Y -o report.pdf   (42 Y/N/- answers)
+import argparse
+import math
+import os
+import re
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from riasec_core import TRAITS, TRAIT_NAMES, TRAIT_DESCRIPTIONS, compute_percent_matrix
+from tenancy import DEFAULT_INSTITUTION
+
+PAGE_W, PAGE_H = 595, 842  # A4 in points
+MARGIN = 50
+
+# Helvetica / Helvetica-Bold advance widths for ASCII 32..126 (1/1000 em)
+_HELV = [278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+         556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+         1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+         667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+         333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+         556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584]
+_HELV_BOLD = [278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+              556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+              975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+              667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+              333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+              611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584]
+FONTS = {"F1": ("Helvetica", _HELV), "F2": ("Helvetica-Bold", _HELV_BOLD)}
+
+TRAIT_COLORS = {
+    'R': (0.90, 0.49, 0.13), 'I': (0.20, 0.60, 0.86), 'A': (0.91, 0.30, 0.24),
+    'S': (0.10, 0.74, 0.61), 'E': (0.61, 0.35, 0.71), 'C': (0.20, 0.29, 0.37),
+}
+
+INTERPRETATION = [
+    ("Understanding your results", [
+        "The RIASEC model describes six broad vocational interest types. Most people are a blend of "
+        "several types; your three highest scores form your Holland code, which summarizes the kinds "
+        "of work environments and activities you are likely to find most satisfying.",
+        "Standardized percents show how your interest is spread across the six types, so they always "
+        "add up to 100%. A higher percent means a relatively stronger preference, not a higher ability.",
+    ]),
+    ("The six interest types", [
+        f"{TRAIT_NAMES[t]} ({t}): {TRAIT_DESCRIPTIONS[t].split(' - ', 1)[-1]}." for t in TRAITS
+    ]),
+    ("Using your profile", [
+        "Explore courses and careers that combine your top types, talk to people working in those "
+        "fields, and try short projects or electives to test your interests in practice.",
+        "Interests change with experience. Retaking the survey after a year or after trying new "
+        "activities can show how your profile develops.",
+    ]),
+]
+
+# -------------------------
+# Low-level PDF writing
+# -------------------------
+def _latin1(text):
+    """Drop characters the standard fonts cannot show (emoji etc.)."""
+    text = str(text).replace("—", "-").replace("–", "-").replace("’", "'")
+    return re.sub(r"[^\x20-\x7e\xa0-\xff]", "", text).strip()
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def text_width(text, size, font="F1"):
+    widths = FONTS[font][1]
+    return sum(widths[ord(c) - 32] if 32 <= ord(c) <= 126 else 500 for c in text) * size / 1000.0
+
+def wrap(text, size, width, font="F1"):
+    lines, line = [], ""
+    for word in _latin1(text).split():
+        candidate = f"{line} {word}".strip()
+        if line and text_width(candidate, size, font) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    if line:
+        lines.append(line)
+    return lines
+
+class Canvas:
+    """Accumulates content-stream operators for one page (origin top-left)."""
+
+    def __init__(self):
+        self.ops = []
+
+    def text(self, x, y, text, size=11, font="F1", color=(0, 0, 0)):
+        self.ops.append(f"{color[0]:.3f} {color[1]:.3f} {color[2]:.3f} rg BT /{font} {size} Tf "
+                        f"1 0 0 1 {x:.2f} {PAGE_H - y:.2f} Tm ({_escape(_latin1(text))}) Tj ET")
+
+    def centered(self, y, text, size=11, font="F1", color=(0, 0, 0)):
+        self.text((PAGE_W - text_width(_latin1(text), size, font)) / 2, y, text, size, font, color)
+
+    def rect(self, x, y, w, h, fill=None, stroke=None, width=1):
+        op = "B" if fill and stroke else "f" if fill else "S"
+        parts = [f"{width} w"]
+        if fill:
+            parts.append(f"{fill[0]:.3f} {fill[1]:.3f} {fill[2]:.3f} rg")
+        if stroke:
+            parts.append(f"{stroke[0]:.3f} {stroke[1]:.3f} {stroke[2]:.3f} RG")
+        parts.append(f"{x:.2f} {PAGE_H - y - h:.2f} {w:.2f} {h:.2f} re {op}")
+        self.ops.append(" ".join(parts))
+
+    def polygon(self, points, fill=None, stroke=None, width=1, closed=True):
+        path = [f"{x:.2f} {PAGE_H - y:.2f} {'m' if i == 0 else 'l'}" for i, (x, y) in enumerate(points)]
+        op = ("b" if closed else "B") if fill and stroke else "f" if fill else ("s" if closed else "S")
+        parts = [f"{width} w"]
+        if fill:
+            parts.append(f"{fill[0]:.3f} {fill[1]:.3f} {fill[2]:.3f} rg")
+        if stroke:
+            parts.append(f"{stroke[0]:.3f} {stroke[1]:.3f} {stroke[2]:.3f} RG")
+        self.ops.append(" ".join(parts + path + [op]))
+
+    def stream(self):
+        return "\n".join(self.ops).encode("latin-1")
+
+@lru_cache(maxsize=None)
+def _font_objects():
+    return [f"<< /Type /Font /Subtype /Type1 /BaseFont /{base} /Encoding /WinAnsiEncoding >>".encode()
+            for base, _ in FONTS.values()]
+
+def _compress(stream):
+    data = zlib.compress(stream, 6)
+    return b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(data) + data + b"\nendstream"
+
+def build_pdf(page_streams):
+    """Assemble compressed content streams (bytes) into a PDF document."""
+    objects = [None, None] + _font_objects()  # 1 catalog, 2 pages, 3.. fonts
+    font_refs = " ".join(f"/{name} {3 + i} 0 R" for i, name in enumerate(FONTS))
+    page_ids = []
+    for compressed in page_streams:
+        objects.append(compressed)
+        content_id = len(objects)
+        objects.append((f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_W} {PAGE_H}] "
+                        f"/Resources << /Font << {font_refs} >> >> /Contents {content_id} 0 R >>").encode())
+        page_ids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = (f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] "
+                  f"/Count {len(page_ids)} >>").encode()
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+# -------------------------
+# Report layout
+# -------------------------
+def _footer(c, page_no, institution):
+    c.text(MARGIN, PAGE_H - 30, f"RIASEC Vocational Interest Survey - {institution}", 8, color=(0.5, 0.5, 0.5))
+    c.text(PAGE_W - MARGIN - 30, PAGE_H - 30, f"Page {page_no}", 8, color=(0.5, 0.5, 0.5))
+
+def draw_radar(c, cx, cy, radius, percents):
+    max_value = max(percents) if max(percents) > 0 else 100
+    range_max = min(100, max_value * 1.2) or 100
+    angles = [math.pi / 2 - i * 2 * math.pi / len(TRAITS) for i in range(len(TRAITS))]
+
+    def point(value, angle):
+        r = radius * min(value, range_max) / range_max
+        return cx + r * math.cos(angle), cy - r * math.sin(angle)
+
+    for frac in (0.25, 0.5, 0.75, 1.0):
+        c.polygon([point(range_max * frac, a) for a in angles], stroke=(0.85, 0.85, 0.85), width=0.6)
+    for a in angles:
+        c.polygon([(cx, cy), point(range_max, a)], stroke=(0.85, 0.85, 0.85), width=0.6, closed=False)
+    c.polygon([point(v, a) for v, a in zip(percents, angles)],
+              fill=(0.68, 0.85, 0.98), stroke=(0.12, 0.23, 0.54), width=1.5)
+    for trait, v, a in zip(TRAITS, percents, angles):
+        lx, ly = point(range_max * 1.16, a)
+        label = f"{trait} {v:.1f}%"
+        c.text(lx - text_width(label, 9, "F2") / 2, ly + 3, label, 9, "F2", (0.17, 0.24, 0.31))
+
+def student_page(name, degree, yes_counts, n_items, percents, matches, institution):
+    c = Canvas()
+    c.rect(0, 0, PAGE_W, 110, fill=(0.40, 0.49, 0.92))
+    c.text(MARGIN, 50, "RIASEC PROFILE", 26, "F2", (1, 1, 1))
+    c.text(MARGIN, 85, name or "Student", 16, "F2", (1, 1, 1))
+    if degree:
+        c.text(PAGE_W - MARGIN - text_width(_latin1(degree), 10), 85, degree, 10, color=(1, 1, 1))
+
+    # score table (same columns as the on-screen table)
+    y = 140
+    c.text(MARGIN, y, "RIASEC Scores", 13, "F2", (0.17, 0.24, 0.31))
+    y += 12
+    cols = [("Trait", 0), ("Yes", 130), ("Items", 175), ("Proportion", 225), ("Percent", 295)]
+    c.rect(MARGIN, y, 300, 18, fill=(0.94, 0.94, 0.94), stroke=(0.8, 0.8, 0.8))
+    for label, dx in cols:
+        c.text(MARGIN + 6 + dx, y + 13, label, 9, "F2")
+    y += 18
+    for t, yes, n, pct in zip(TRAITS, yes_counts, n_items, percents):
+        c.rect(MARGIN, y, 300, 18, stroke=(0.8, 0.8, 0.8), width=0.5)
+        prop = yes / n if n else 0
+        for value, dx in ((f"{TRAIT_NAMES[t]} ({t})", 0), (str(int(yes)), 130), (str(int(n)), 175),
+                          (f"{prop:.3f}", 225), (f"{pct:.1f}%", 295)):
+            c.text(MARGIN + 6 + dx, y + 13, value, 9)
+        y += 18
+
+    draw_radar(c, 470, 230, 70, percents)
+
+    # top traits
+    y += 30
+    c.text(MARGIN, y, "Your Top Traits", 13, "F2", (0.17, 0.24, 0.31))
+    y += 12
+    order = sorted(range(len(TRAITS)), key=lambda i: percents[i], reverse=True)[:3]
+    for i in order:
+        t = TRAITS[i]
+        c.rect(MARGIN, y, PAGE_W - 2 * MARGIN, 48, fill=TRAIT_COLORS[t])
+        c.text(MARGIN + 14, y + 20, f"{TRAIT_NAMES[t]}: {percents[i]:.1f}%", 13, "F2", (1, 1, 1))
+        c.text(MARGIN + 14, y + 38, TRAIT_DESCRIPTIONS[t], 10, color=(1, 1, 1))
+        y += 56
+
+    if matches:
+        y += 16
+        c.text(MARGIN, y, "Suggested Matches", 13, "F2", (0.17, 0.24, 0.31))
+        y += 6
+        for title, kind, sim in matches:
+            y += 16
+            c.text(MARGIN + 10, y, f"- {str(title).title()} ({kind}), {sim * 100:.0f}% match", 10)
+
+    code = "".join(TRAITS[i] for i in order)
+    y += 30
+    for line in wrap(f"Your Holland code is {code}. The next page explains what the six types mean "
+                     "and how to use your profile.", 10, PAGE_W - 2 * MARGIN):
+        c.text(MARGIN, y, line, 10, color=(0.3, 0.3, 0.3))
+        y += 14
+    _footer(c, 1, institution)
+    return _compress(c.stream())
+
+@lru_cache(maxsize=32)
+def static_pages(institution=DEFAULT_INSTITUTION):
+    """Interpretation pages, compiled once per institution and reused for every report."""
+    pages, c, y, page_no = [], Canvas(), 60, 2
+    width = PAGE_W - 2 * MARGIN
+
+    def new_page():
+        nonlocal c, y, page_no
+        _footer(c, page_no, institution)
+        pages.append(_compress(c.stream()))
+        c, y, page_no = Canvas(), 60, page_no + 1
+
+    for heading, paragraphs in INTERPRETATION:
+        if y > PAGE_H - 140:
+            new_page()
+        c.text(MARGIN, y, heading, 14, "F2", (0.17, 0.24, 0.31))
+        y += 22
+        for paragraph in paragraphs:
+            for line in wrap(paragraph, 10.5, width):
+                if y > PAGE_H - 60:
+                    new_page()
+                c.text(MARGIN, y, line, 10.5)
+                y += 15
+            y += 8
+        y += 10
+    for line in wrap(f"This assessment was conducted by {institution}. Your scores reflect your preferences, "
+                     "not your abilities or limitations. There are no right or wrong answers.", 9, width):
+        c.text(MARGIN, y, line, 9, color=(0.4, 0.4, 0.4))
+        y += 13
+    _footer(c, page_no, institution)
+    pages.append(_compress(c.stream()))
+    return tuple(pages)
+
+def render_report(name, degree, yes_counts, n_items, percents, matches=None, institution=DEFAULT_INSTITUTION):
+    """PDF bytes for one student."""
+    first = student_page(name, degree, list(yes_counts), list(n_items), [float(p) for p in percents],
+                         matches or [], institution)
+    return build_pdf([first, *static_pages(institution)])
+
+def report_inputs(matrix):
+    """(n, 42) answer matrix -> (yes_counts, n_items, percents), each (n, 6)."""
+    from answer_codec import trait_yes_counts, TRAIT_ONEHOT
+
+    yes = trait_yes_counts(matrix)
+    n_items = (matrix >= 0).astype(np.int16) @ TRAIT_ONEHOT
+    return yes, n_items, compute_percent_matrix(yes, n_items)
+
+def render_report_from_scores_df(name, degree, scores_df, matches=None, institution=DEFAULT_INSTITUTION):
+    return render_report(name, degree, scores_df["yes_count"].tolist(), scores_df["n_items"].tolist(),
+                         scores_df["score_percent"].tolist(), matches, institution)
+
+# -------------------------
+# Bulk mode
+# -------------------------
+_worker_catalog = None
+
+def _init_worker(catalog_path):
+    global _worker_catalog
+    from recommender import CatalogIndex
+    try:
+        _worker_catalog = CatalogIndex.from_csv(catalog_path) if catalog_path else None
+    except (OSError, ValueError):
+        _worker_catalog = None
+    static_pages()  # compile the shared pages once per worker
+
+def _render_one(task):
+    path, name, degree, yes_counts, n_items, percents, institution = task
+    matches = _worker_catalog.top_k(percents, k=3, kind="course") if _worker_catalog else None
+    with open(path, "wb") as fh:
+        fh.write(render_report(name, degree, yes_counts, n_items, percents, matches, institution))
+    return path
+
+def _safe_filename(text):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", text).strip("_") or "student"
+
+def bulk_tasks_from_sheet(sh, out_dir, institution=DEFAULT_INSTITUTION):
+    import pandas as pd
+    from sheets_io import read_tab
+    from answer_codec import read_answer_matrix
+
+    ids, matrix = read_answer_matrix(sh)
+    yes, n_items, percents = report_inputs(matrix)
+    header, rows = read_tab(sh, "submissions")
+    sub = pd.DataFrame(rows, columns=header).drop_duplicates("submission_id").set_index("submission_id") \
+        if rows else pd.DataFrame(columns=["student_name", "degree"])
+    for i, sid in enumerate(ids):
+        name, degree = sub["student_name"].get(sid, ""), sub["degree"].get(sid, "")
+        path = os.path.join(out_dir, f"RIASEC_Report_{_safe_filename(name)}_{sid[:8]}.pdf")
+        yield (path, name, degree, yes[i].tolist(), n_items[i].tolist(), percents[i].tolist(), institution)
+
+def render_bulk(tasks, workers=None, catalog_path=None, chunksize=32):
+    """Render (path, name, degree, yes_counts, n_items, percents, institution) tasks in parallel."""
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(catalog_path,)) as pool:
+        for _ in pool.map(_render_one, tasks, chunksize=chunksize):
+            done += 1
+    return done
+
+def main(argv=None):
+    from sheets_io import add_spreadsheet_args, spreadsheet_from_args
+    from recommender import DEFAULT_CATALOG_PATH
+
+    parser = argparse.ArgumentParser(description="Render RIASEC PDF reports.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bulk = sub.add_parser("bulk", help="Render one report per submission in the spreadsheet")
+    add_spreadsheet_args(bulk)
+    bulk.add_argument("--out-dir", required=True)
+    bulk.add_argument("--workers", type=int, default=None)
+    bulk.add_argument("--catalog", default=DEFAULT_CATALOG_PATH)
+    bulk.add_argument("--institution", default=DEFAULT_INSTITUTION)
+    one = sub.add_parser("one", help="Render a single report from one student's answers")
+    one.add_argument("name")
+    one.add_argument("answers", help="42 characters in question order: Y, N or - for skipped")
+    one.add_argument("--degree", default="")
+    one.add_argument("--institution", default=DEFAULT_INSTITUTION)
+    one.add_argument("-o", "--output", required=True)
+    args = parser.parse_args(argv)
+
+    if args.command == "one":
+        from answer_codec import decode_matrix, N_QUESTIONS
+
+        answers = args.answers.strip().upper()
+        if len(answers) != N_QUESTIONS or set(answers) - set("YN-"):
+            parser.error(f"answers must be {N_QUESTIONS} characters of Y, N or -")
+        yes, n_items, percents = report_inputs(decode_matrix([answers]))
+        with open(args.output, "wb") as fh:
+            fh.write(render_report(args.name, args.degree, yes[0].tolist(), n_items[0].tolist(),
+                                   percents[0].tolist(), institution=args.institution))
+        print(f"Wrote {args.output}")
+        return
+    os.makedirs(args.out_dir, exist_ok=True)
+    tasks = bulk_tasks_from_sheet(spreadsheet_from_args(args), args.out_dir, args.institution)
+    n = render_bulk(tasks, args.workers, args.catalog)
+    print(f"Wrote {n} reports to {args.out_dir}")
+
+if __name__ == "__main__":
+    main()
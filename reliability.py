@@ -0,0 +1,222 @@
+# Streaming reliability statistics for the six RIASEC scales. For every
+# cohort (all students and each degree) and trait we keep the running mean
+# and co-moment matrix of the trait's 7 items, updated with Welford's
+# algorithm one submission at a time (and merged in batches on rebuild).
+# Cronbach's alpha, alpha-if-item-deleted and corrected item-total
+# correlations all follow from that 7x7 covariance, so no history is rescanned.
+# Only one process may write a given file, since a save overwrites it with
+# the in-memory state; unsaved updates are written at exit.
+#
+#   python reliability.py rebuild --credentials sa.json --spreadsheet-id ID
+#   python reliability.py show [--cohort "bsc computer science"]
+import argparse
+import atexit
+import os
+import threading
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from riasec_core import TRAITS, DATA_DIR, normalize_degree
+from answer_codec import QUESTION_IDS, QUESTION_TRAITS
+
+ALL_COHORT = "__all__"
+DEFAULT_RELIABILITY_PATH = os.path.join(DATA_DIR, "reliability.npz")
+MIN_COHORT_SIZE = 30
+# column indices of each trait's items in the 42-question answer row
+TRAIT_ITEMS = np.stack([np.flatnonzero(QUESTION_TRAITS == t) for t in TRAITS])
+N_ITEMS = TRAIT_ITEMS.shape[1]
+
+def _alpha(cov):
+    k = cov.shape[0]
+    total_var = cov.sum()
+    if k < 2 or total_var <= 0:
+        return float("nan")
+    return float(k / (k - 1) * (1 - np.trace(cov) / total_var))
+
+def _save_at_exit(ref):
+    store = ref()
+    if store is not None:
+        store.save()
+
+class ReliabilityStore:
+    """Per-cohort, per-trait item means and co-moments, persisted as one .npz file."""
+
+    def __init__(self, path=DEFAULT_RELIABILITY_PATH, save_interval=30.0):
+        self.path = path
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._n = {}     # cohort -> (6,) submissions with the whole trait answered
+        self._mean = {}  # cohort -> (6, 7)
+        self._m2 = {}    # cohort -> (6, 7, 7) sum of outer products of deviations
+        self._dirty = False
+        self._last_save = 0.0
+        if path:
+            atexit.register(_save_at_exit, weakref.ref(self))
+        if path and os.path.exists(path):
+            with np.load(path, allow_pickle=False) as data:
+                for i, name in enumerate(data["cohorts"].tolist()):
+                    self._n[name] = data["n"][i].astype(np.int64)
+                    self._mean[name] = data["mean"][i]
+                    self._m2[name] = data["m2"][i]
+
+    def _state(self, cohort):
+        if cohort not in self._n:
+            self._n[cohort] = np.zeros(len(TRAITS), dtype=np.int64)
+            self._mean[cohort] = np.zeros((len(TRAITS), N_ITEMS))
+            self._m2[cohort] = np.zeros((len(TRAITS), N_ITEMS, N_ITEMS))
+        return self._n[cohort], self._mean[cohort], self._m2[cohort]
+
+    def _update(self, cohort, items, complete):
+        n, mean, m2 = self._state(cohort)
+        for t in np.flatnonzero(complete):
+            n[t] += 1
+            delta = items[t] - mean[t]
+            mean[t] += delta / n[t]
+            m2[t] += np.outer(delta, items[t] - mean[t])
+
+    def _merge(self, cohort, items, complete):
+        """Chan et al. batch merge; items is (m, 6, 7), complete is (m, 6)."""
+        n, mean, m2 = self._state(cohort)
+        for t in range(len(TRAITS)):
+            batch = items[complete[:, t], t]
+            nb = len(batch)
+            if not nb:
+                continue
+            mean_b = batch.mean(axis=0)
+            dev = batch - mean_b
+            m2_b = dev.T @ dev
+            delta = mean_b - mean[t]
+            total = n[t] + nb
+            m2[t] += m2_b + np.outer(delta, delta) * n[t] * nb / total
+            mean[t] += delta * nb / total
+            n[t] = total
+
+    def record(self, degree, answers):
+        """Add one submission; answers is the 42-item row (1/0, -1 = not answered)."""
+        items = np.asarray(answers, dtype=np.float64)[TRAIT_ITEMS]
+        complete = (items >= 0).all(axis=1)
+        with self._lock:
+            self._update(ALL_COHORT, items, complete)
+            cohort = normalize_degree(degree)
+            if cohort:
+                self._update(cohort, items, complete)
+            self._dirty = True
+            if time.monotonic() - self._last_save >= self.save_interval:
+                self._save_locked()
+
+    def record_matrix(self, degrees, matrix):
+        """Add many submissions at once (used by rebuild)."""
+        items = np.asarray(matrix, dtype=np.float64)[:, TRAIT_ITEMS]
+        complete = (items >= 0).all(axis=2)
+        cohorts = np.array([normalize_degree(d) for d in degrees], dtype=object)
+        with self._lock:
+            self._merge(ALL_COHORT, items, complete)
+            for cohort in pd.unique(cohorts):
+                if cohort:
+                    mask = cohorts == cohort
+                    self._merge(cohort, items[mask], complete[mask])
+            self._dirty = True
+
+    def cohorts(self):
+        return sorted(self._n, key=lambda c: -int(self._n[c].min()))
+
+    def size(self, cohort):
+        n = self._n.get(cohort)
+        return int(n.min()) if n is not None else 0
+
+    def report(self, cohort=ALL_COHORT):
+        """(scales, items) DataFrames: alpha per trait, and per item the corrected
+        item-total correlation and alpha if the item were deleted."""
+        with self._lock:
+            if cohort not in self._n:
+                return None, None
+            n, mean, m2 = self._n[cohort].copy(), self._mean[cohort].copy(), self._m2[cohort].copy()
+        scales, items = [], []
+        for t, trait in enumerate(TRAITS):
+            cov = m2[t] / (n[t] - 1) if n[t] > 1 else np.full((N_ITEMS, N_ITEMS), np.nan)
+            scales.append({"trait": trait, "n": int(n[t]), "alpha": _alpha(cov),
+                           "mean_total": float(mean[t].sum())})
+            for i, col in enumerate(TRAIT_ITEMS[t]):
+                keep = np.arange(N_ITEMS) != i
+                rest_var = cov[np.ix_(keep, keep)].sum()
+                cov_rest = cov[i, keep].sum()
+                denom = np.sqrt(cov[i, i] * rest_var) if cov[i, i] > 0 and rest_var > 0 else np.nan
+                items.append({
+                    "trait": trait,
+                    "question": f"Q{QUESTION_IDS[col]}",
+                    "endorsement": float(mean[t, i]),
+                    "item_total_r": float(cov_rest / denom) if np.isfinite(denom) else float("nan"),
+                    "alpha_if_deleted": _alpha(cov[np.ix_(keep, keep)]),
+                })
+        return pd.DataFrame(scales), pd.DataFrame(items)
+
+    def _save_locked(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        names = sorted(self._n)
+        tmp = f"{self.path}.tmp.npz"
+        shape = (0, len(TRAITS))
+        np.savez_compressed(
+            tmp, cohorts=np.array(names, dtype=str),
+            n=np.stack([self._n[c] for c in names]) if names else np.zeros(shape, dtype=np.int64),
+            mean=np.stack([self._mean[c] for c in names]) if names else np.zeros(shape + (N_ITEMS,)),
+            m2=np.stack([self._m2[c] for c in names]) if names else np.zeros(shape + (N_ITEMS, N_ITEMS)),
+        )
+        os.replace(tmp, self.path)
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    def save(self):
+        with self._lock:
+            if self._dirty:
+                self._save_locked()
+
+def rebuild_from_sheet(sh, path=DEFAULT_RELIABILITY_PATH):
+    """Recompute all statistics from the answers and submissions tabs."""
+    from sheets_io import read_tab
+    from answer_codec import read_answer_matrix
+
+    ids, matrix = read_answer_matrix(sh)
+    header, rows = read_tab(sh, "submissions")
+    degree_of = {}
+    if rows:
+        sub = pd.DataFrame(rows, columns=header)
+        degree_of = dict(zip(sub["submission_id"], sub["degree"]))
+    store = ReliabilityStore(path=None)
+    store.record_matrix([degree_of.get(sid, "") for sid in ids], matrix)
+    store.path = path
+    store.save()
+    return store
+
+def main(argv=None):
+    from sheets_io import add_spreadsheet_args, spreadsheet_from_args
+
+    parser = argparse.ArgumentParser(description="Scale reliability statistics.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild = sub.add_parser("rebuild", help="Rebuild statistics from the spreadsheet")
+    add_spreadsheet_args(rebuild)
+    rebuild.add_argument("--out", default=DEFAULT_RELIABILITY_PATH)
+    show = sub.add_parser("show", help="Print alpha and item statistics")
+    show.add_argument("--path", default=DEFAULT_RELIABILITY_PATH)
+    show.add_argument("--cohort", default=ALL_COHORT)
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        store = rebuild_from_sheet(spreadsheet_from_args(args), args.out)
+        print(f"Wrote {args.out}: {store.size(ALL_COHORT)} submissions, {len(store.cohorts()) - 1} degree cohorts")
+        return
+    store = ReliabilityStore(args.path)
+    scales, items = store.report(normalize_degree(args.cohort) if args.cohort != ALL_COHORT else ALL_COHORT)
+    if scales is None:
+        raise SystemExit(f"No statistics for cohort {args.cohort!r}")
+    with pd.option_context("display.float_format", "{:.3f}".format, "display.width", 120):
+        print(scales.to_string(index=False))
+        print()
+        print(items.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# Rescore every stored submission with the current scoring rule and write
+# back only the score cells that changed.
+#
+# Answers (long and wide tabs) are read in bulk and scored in one vectorized
+# pass with score_answer_matrix, which applies the same steps as
+# compute_standardized_scores. The result is diffed numerically, cell by cell,
+# against the scores tab (Sheets returns "50.0" as "50"); changed cells are
+# grouped into row ranges and written with a few large batch_update calls,
+# spaced out to stay within the write quota. A sharded scores tab is planned
+# and written one shard at a time. Progress is checkpointed after each call so
+# an interrupted run resumes where it stopped.
+#
+#   python rescore_backfill.py --credentials sa.json --spreadsheet-id ID            # dry run
+#   python rescore_backfill.py --credentials sa.json --spreadsheet-id ID --apply
+import argparse
+import csv
+import json
+import os
+import time
+
+from gspread.utils import rowcol_to_a1
+
+from riasec_core import TRAITS, SCORES_HEADERS, DATA_DIR
+from answer_codec import read_answer_matrix, score_answer_matrix
+from sheet_shards import shard_sources, read_sources
+
+DEFAULT_CHECKPOINT_PATH = os.path.join(DATA_DIR, "rescore_checkpoint.json")
+RANGES_PER_CALL = 2000
+MIN_SECONDS_BETWEEN_CALLS = 1.1  # Sheets allows 60 write requests per minute per user
+SCORE_TOLERANCE = 0.05  # stored scores have one decimal; "50" and "50.0" are the same cell
+
+def _cell_changed(stored, expected):
+    """Blank or non-numeric cells always change; numbers only when they differ at one decimal."""
+    try:
+        return abs(float(stored) - expected) >= SCORE_TOLERANCE
+    except ValueError:
+        return True
+
+def plan_rescore(ids, matrix, score_rows):
+    """Diff recomputed scores against the scores tab.
+
+    Returns (changes, stats). changes is a list of (sheet_row, first_col,
+    values, old_values) for runs of adjacent changed cells, sorted by row.
+    """
+    answered = (matrix >= 0).any(axis=1)
+    expected = score_answer_matrix(matrix)
+    position = {sid: i for i, sid in enumerate(ids.tolist())}
+    n_cols = len(SCORES_HEADERS) - 1
+    stats = {"score_rows": len(score_rows), "unchanged_rows": 0, "changed_rows": 0, "changed_cells": 0,
+             "no_answers": 0, "max_delta": 0.0, "changed_by_trait": dict.fromkeys(TRAITS, 0)}
+    changes = []
+    for offset, row in enumerate(score_rows):
+        sheet_row = offset + 2
+        if not row or not row[0]:
+            continue
+        i = position.get(row[0])
+        if i is None or not answered[i]:
+            stats["no_answers"] += 1
+            continue
+        stored = (row[1:1 + n_cols] + [""] * n_cols)[:n_cols]
+        new = [f"{v:.1f}" for v in expected[i]]
+        diff = [_cell_changed(a, b) for a, b in zip(stored, expected[i])]
+        if not any(diff):
+            stats["unchanged_rows"] += 1
+            continue
+        stats["changed_rows"] += 1
+        col = 0
+        while col < n_cols:
+            if not diff[col]:
+                col += 1
+                continue
+            start = col
+            while col < n_cols and diff[col]:
+                stats["changed_cells"] += 1
+                stats["changed_by_trait"][TRAITS[col]] += 1
+                try:
+                    stats["max_delta"] = max(stats["max_delta"], abs(float(stored[col]) - expected[i][col]))
+                except ValueError:
+                    pass
+                col += 1
+            changes.append((sheet_row, start + 2, new[start:col], stored[start:col]))
+    return changes, stats
+
+def merge_stats(total, stats):
+    """Add one tab's plan_rescore stats into a running total."""
+    if total is None:
+        return {**stats, "changed_by_trait": dict(stats["changed_by_trait"])}
+    for key, value in stats.items():
+        if key == "max_delta":
+            total[key] = max(total[key], value)
+        elif key == "changed_by_trait":
+            for trait, n in value.items():
+                total[key][trait] += n
+        else:
+            total[key] += value
+    return total
+
+def load_checkpoint(path, spreadsheet_id, tab="scores"):
+    if path and os.path.exists(path):
+        with open(path) as fh:
+            state = json.load(fh)
+        if state.get("spreadsheet_id") == spreadsheet_id and state.get("tab", "scores") == tab:
+            return state
+    return {"spreadsheet_id": spreadsheet_id, "tab": tab, "next_row": 2, "cells_written": 0}
+
+def save_checkpoint(path, state):
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(state, fh)
+    os.replace(tmp, path)
+
+def apply_changes(ws, changes, checkpoint_path=None, ranges_per_call=RANGES_PER_CALL,
+                  min_interval=MIN_SECONDS_BETWEEN_CALLS, progress=None):
+    """Write changes in batch_update calls, resuming after the checkpointed row."""
+    state = load_checkpoint(checkpoint_path, ws.spreadsheet.id, ws.title)
+    pending = [c for c in changes if c[0] >= state["next_row"]]
+    calls, last_call = 0, 0.0
+    for start in range(0, len(pending), ranges_per_call):
+        chunk = pending[start:start + ranges_per_call]
+        wait = min_interval - (time.monotonic() - last_call)
+        if calls and wait > 0:
+            time.sleep(wait)
+        ws.batch_update(
+            [{"range": f"{rowcol_to_a1(r, c)}:{rowcol_to_a1(r, c + len(v) - 1)}", "values": [v]}
+             for r, c, v, _ in chunk],
+            value_input_option="USER_ENTERED",
+        )
+        last_call = time.monotonic()
+        calls += 1
+        # the last row may continue in the next chunk, so resume from it
+        state["next_row"] = chunk[-1][0]
+        state["cells_written"] += sum(len(v) for _, _, v, _ in chunk)
+        save_checkpoint(checkpoint_path, state)
+        if progress:
+            progress(state)
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return calls, state["cells_written"]
+
+def write_report(path, plans):
+    """plans is [(tab, changes)]."""
+    with open(path, "w", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["tab", "sheet_row", "column", "old", "new"])
+        for tab, changes in plans:
+            for row, col, values, old in changes:
+                for k, (new_value, old_value) in enumerate(zip(values, old)):
+                    writer.writerow([tab, row, SCORES_HEADERS[col - 2 + k + 1], old_value, new_value])
+
+def main(argv=None):
+    from sheets_io import add_spreadsheet_args, spreadsheet_from_args, save_if_local
+
+    parser = argparse.ArgumentParser(description="Rescore stored answers and write back changed score cells.")
+    add_spreadsheet_args(parser)
+    parser.add_argument("--apply", action="store_true", help="Write changes (default is a dry run)")
+    parser.add_argument("--report", help="Write every changed cell to this CSV")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT_PATH)
+    parser.add_argument("--ranges-per-call", type=int, default=RANGES_PER_CALL)
+    parser.add_argument("--min-interval", type=float, default=MIN_SECONDS_BETWEEN_CALLS)
+    args = parser.parse_args(argv)
+
+    sh = spreadsheet_from_args(args)
+    ids, matrix = read_answer_matrix(sh)
+    plans, stats = [], None
+    for source_sh, tab in shard_sources(sh, "scores"):
+        header, score_rows = read_sources([(source_sh, tab)])
+        if header[:len(SCORES_HEADERS)] != SCORES_HEADERS:
+            raise SystemExit(f"Unexpected {tab} header: {header}")
+        changes, tab_stats = plan_rescore(ids, matrix, score_rows)
+        plans.append((source_sh, tab, changes))
+        stats = merge_stats(stats, tab_stats)
+    if stats is None:
+        raise SystemExit("No scores tab found")
+    n_ranges = sum(len(changes) for _, _, changes in plans)
+
+    print(f"Score rows: {stats['score_rows']:,}  unchanged: {stats['unchanged_rows']:,}  "
+          f"changed: {stats['changed_rows']:,}  without answers: {stats['no_answers']:,}")
+    print(f"Changed cells: {stats['changed_cells']:,} in {n_ranges:,} ranges across {len(plans)} tab(s)  "
+          f"(max delta {stats['max_delta']:.1f} points)")
+    print("By trait: " + ", ".join(f"{t}={n}" for t, n in stats["changed_by_trait"].items()))
+    shown = [(tab, change) for _, tab, changes in plans for change in changes][:10]
+    for tab, (row, col, values, old) in shown:
+        print(f"  {tab} row {row}: {old} -> {values}")
+    if args.report:
+        write_report(args.report, [(tab, changes) for _, tab, changes in plans])
+        print(f"Wrote {args.report}")
+    if not args.apply or not n_ranges:
+        return
+
+    total_calls = total_written = 0
+    for source_sh, tab, changes in plans:
+        if not changes:
+            continue
+        calls, written = apply_changes(
+            source_sh.worksheet(tab), changes, args.checkpoint, args.ranges_per_call, args.min_interval,
+            progress=lambda s, tab=tab: print(f"  {tab}: written up to row {s['next_row']} "
+                                              f"({s['cells_written']:,} cells)"),
+        )
+        save_if_local(source_sh)
+        total_calls += calls
+        total_written += written
+    print(f"Wrote {total_written:,} cells in {total_calls} batch_update calls")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# Bulk reconciliation of the "Email Tracker" tab (see code.gs) against the
+# app's submissions tab.
+#
+# code.gs matches the tracker against a Google Form responses tab and updates
+# reminder columns with two setValue calls per recipient. This job reads the
+# tracker (plus Config) with one batch_get and the submissions tab, including
+# any shards of it, with sheets_io.read_tab; matches on normalized email
+# through a dict index, applies the same reminder gates as
+# sendRemindersInternal_, and writes every changed tracker cell back in a
+# single batch_update.
+import argparse
+from datetime import datetime, UTC
+
+import pandas as pd
+from gspread.utils import rowcol_to_a1, absolute_range_name
+
+from sheets_io import read_tab
+
+TRACKER_TAB = "Email Tracker"
+CONFIG_TAB = "Config"
+SUBMISSIONS_TAB = "submissions"
+TRACKER_HEADERS = [
+    "Name", "Email", "Responded?", "Response Timestamp",
+    "Last Reminder Sent", "Reminder Count", "Opt-out?", "Custom Message"
+]
+
+def normalize_email(value):
+    return str(value or "").strip().casefold()
+
+def _truthy(value):
+    return str(value or "").strip().upper() == "TRUE"
+
+def build_responder_index(sub_values):
+    """Map normalized email -> earliest submission timestamp."""
+    if len(sub_values) < 2:
+        return {}
+    header = sub_values[0]
+    email_col, ts_col = header.index("email"), header.index("timestamp")
+    index = {}
+    for row in sub_values[1:]:
+        if len(row) <= max(email_col, ts_col):
+            continue
+        email = normalize_email(row[email_col])
+        if not email:
+            continue
+        ts = row[ts_col]
+        if email not in index or ts < index[email]:
+            index[email] = ts
+    return index
+
+def reconcile(tracker_values, responder_index, config, now=None, force=False):
+    """Compute responder status and reminder eligibility for every tracker row.
+
+    Returns (changes, eligible): changes is a list of (row, col, value) with
+    1-based sheet coordinates for cells whose value differs; eligible is a
+    list of (row, name, email, reminder_count) that may be sent a reminder.
+    """
+    now = now or datetime.now(UTC)
+    header = tracker_values[0]
+    missing = [h for h in TRACKER_HEADERS if h not in header]
+    if missing:
+        raise ValueError(f"Email Tracker header mismatch, missing: {missing}")
+    col = {h: header.index(h) for h in TRACKER_HEADERS}
+
+    df = pd.DataFrame([r + [""] * (len(header) - len(r)) for r in tracker_values[1:]], columns=header)
+    emails = df["Email"].map(normalize_email)
+    response_ts = emails.map(responder_index)
+    responded = response_ts.notna() & (emails != "")
+    new_responded = responded.map({True: "Yes", False: "No"})
+    new_ts = response_ts.fillna("")
+
+    only_once = _truthy(config.get("ONLY_ONE_REMINDER", "FALSE"))
+    min_days = max(0, int(config.get("REMINDER_DAYS_BETWEEN", "3") or 0))
+    last_sent = pd.to_datetime(df["Last Reminder Sent"], errors="coerce", utc=True)
+    days_since = (pd.Timestamp(now) - last_sent).dt.total_seconds() / 86400
+    count = pd.to_numeric(df["Reminder Count"], errors="coerce").fillna(0).astype(int)
+
+    eligible_mask = (emails != "") & ~df["Opt-out?"].map(_truthy) & ~responded
+    if not force:
+        if only_once:
+            eligible_mask &= count < 1
+        eligible_mask &= last_sent.isna() | (days_since >= min_days)
+
+    changes = []
+    for i in range(len(df)):
+        sheet_row = i + 2
+        if emails.iat[i] == "":
+            continue
+        if df["Responded?"].iat[i] != new_responded.iat[i]:
+            changes.append((sheet_row, col["Responded?"] + 1, new_responded.iat[i]))
+        if df["Response Timestamp"].iat[i] != new_ts.iat[i]:
+            changes.append((sheet_row, col["Response Timestamp"] + 1, new_ts.iat[i]))
+
+    eligible = [(i + 2, df["Name"].iat[i], df["Email"].iat[i].strip(), int(count.iat[i]))
+                for i in eligible_mask.to_numpy().nonzero()[0]]
+    return changes, eligible
+
+def reminder_changes(tracker_values, sent, now=None):
+    """Cell updates recording reminders sent to the (row, _, _, count) entries in `sent`."""
+    now = now or datetime.now(UTC)
+    header = tracker_values[0]
+    last_col = header.index("Last Reminder Sent") + 1
+    count_col = header.index("Reminder Count") + 1
+    stamp = now.strftime("%Y-%m-%d %H:%M:%S")
+    changes = []
+    for row, _, _, count in sent:
+        changes.append((row, last_col, stamp))
+        changes.append((row, count_col, count + 1))
+    return changes
+
+def write_changes(tracker_ws, changes):
+    """Apply all cell changes with one batch_update call."""
+    if not changes:
+        return 0
+    tracker_ws.batch_update(
+        [{"range": rowcol_to_a1(r, c), "values": [[v]]} for r, c, v in changes],
+        value_input_option="USER_ENTERED",
+    )
+    return len(changes)
+
+def read_config(config_values):
+    return {str(r[0]).strip(): str(r[1]).strip() for r in config_values[1:] if len(r) >= 2 and str(r[0]).strip()}
+
+def run(tracker_sh, submissions_sh, dry_run=False, record_reminders=False, force=False, now=None):
+    tabs = {ws.title: ws for ws in tracker_sh.worksheets()}
+    if TRACKER_TAB not in tabs:
+        raise ValueError(f"Missing '{TRACKER_TAB}' tab. Run Setup in code.gs first.")
+    ranges = [absolute_range_name(TRACKER_TAB, "A:Z")]
+    if CONFIG_TAB in tabs:
+        ranges.append(absolute_range_name(CONFIG_TAB, "A:B"))
+    value_ranges = tracker_sh.values_batch_get(ranges).get("valueRanges", [])
+    tracker_values = value_ranges[0].get("values", [])
+    config_values = value_ranges[1].get("values", []) if len(value_ranges) > 1 else []
+    if len(tracker_values) < 2:
+        return [], []
+    header, rows = read_tab(submissions_sh, SUBMISSIONS_TAB)
+    sub_values = [header] + rows if header else []
+
+    index = build_responder_index(sub_values)
+    changes, eligible = reconcile(tracker_values, index, read_config(config_values), now=now, force=force)
+    if record_reminders:
+        changes += reminder_changes(tracker_values, eligible, now=now)
+    if not dry_run:
+        write_changes(tabs[TRACKER_TAB], changes)
+    return changes, eligible
+
+def main(argv=None):
+    from sheets_io import add_spreadsheet_args, spreadsheet_from_args, save_if_local
+
+    parser = argparse.ArgumentParser(description="Mark survey responders in the Email Tracker tab and list reminder candidates.")
+    add_spreadsheet_args(parser)
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing them")
+    parser.add_argument("--force", action="store_true", help="Ignore ONLY_ONE_REMINDER and REMINDER_DAYS_BETWEEN gates")
+    parser.add_argument("--record-reminders", action="store_true",
+                        help="Also stamp Last Reminder Sent / Reminder Count for eligible rows (after sending externally)")
+    args = parser.parse_args(argv)
+
+    sh = spreadsheet_from_args(args)
+    changes, eligible = run(sh, sh, args.dry_run, args.record_reminders, args.force)
+    save_if_local(sh)
+    print(f"{len(changes)} tracker cells {'to update' if args.dry_run else 'updated'}; "
+          f"{len(eligible)} recipients eligible for a reminder")
+    for _, name, email, count in eligible:
+        print(f"  {email}\t{name}\t(reminders so far: {count})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# Shared survey definitions and scoring, importable without Streamlit so that
+# offline tools (migrations, exports, backfills) score exactly like the app.
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# Local state written by the app and offline jobs (norms, indexes, checkpoints)
+DATA_DIR = os.environ.get("RIASEC_DATA_DIR", "data")
+
+# -------------------------
+# QUESTIONS (Q1..Q42) - with emojis
+# -------------------------
+QUESTIONS = [
+    (1, "Q1. I like to work on cars 🚗", 'R'),
+    (2, "Q2. I like to do puzzles 🧩", 'I'),
+    (3, "Q3. I am good at working independently 🧑‍💼", 'A'),
+    (4, "Q4. I like to work in teams 👥", 'S'),
+    (5, "Q5. I am an ambitious person, I set goals for myself 🎯", 'E'),
+    (6, "Q6. I like to organize things, (files, desks/offices) 📁", 'C'),
+    (7, "Q7. I like to build things 🔨", 'R'),
+    (8, "Q8. I like to read about art and music 📚", 'A'),
+    (9, "Q9. I like to have clear instructions to follow 📋", 'C'),
+    (10, "Q10. I like to try to influence or persuade people 💬", 'E'),
+    (11, "Q11. I like to do experiments 🧪", 'I'),
+    (12, "Q12. I like to teach or train people 👨‍🏫", 'S'),
+    (13, "Q13. I like trying to help people solve their problems 🤝", 'S'),
+    (14, "Q14. I like to take care of animals 🐕", 'R'),
+    (15, "Q15. I wouldn't mind working 8 hours per day in an office 🏢", 'C'),
+    (16, "Q16. I like selling things 🛒", 'E'),
+    (17, "Q17. I enjoy creative writing ✍️", 'A'),
+    (18, "Q18. I enjoy science 🔬", 'I'),
+    (19, "Q19. I am quick to take on new responsibilities 📈", 'E'),
+    (20, "Q20. I am interested in healing people 💊", 'S'),
+    (21, "Q21. I enjoy trying to figure out how things work ⚙️", 'I'),
+    (22, "Q22. I like putting things together or assembling things 🔧", 'R'),
+    (23, "Q23. I am a creative person 🎨", 'A'),
+    (24, "Q24. I pay attention to details 🔍", 'C'),
+    (25, "Q25. I like to do filing or typing ⌨️", 'C'),
+    (26, "Q26. I like to analyze things (problems/ situations) 📊", 'I'),
+    (27, "Q27. I like to play instruments or sing 🎵", 'A'),
+    (28, "Q28. I enjoy learning about other cultures 🌍", 'S'),
+    (29, "Q29. I would like to start my own business 💼", 'E'),
+    (30, "Q30. I like to cook 🍳", 'R'),
+    (31, "Q31. I like acting in plays 🎭", 'A'),
+    (32, "Q32. I am a practical person 🛠️", 'R'),
+    (33, "Q33. I like working with numbers or charts 📉", 'I'),
+    (34, "Q34. I like to get into discussions about issues 💭", 'S'),
+    (35, "Q35. I am good at keeping records of my work 📝", 'C'),
+    (36, "Q36. I like to lead 👑", 'E'),
+    (37, "Q37. I like working outdoors 🌳", 'R'),
+    (38, "Q38. I would like to work in an office 💻", 'C'),
+    (39, "Q39. I'm good at math ➕", 'I'),
+    (40, "Q40. I like helping people ❤️", 'S'),
+    (41, "Q41. I like to draw ✏️", 'A'),
+    (42, "Q42. I like to give speeches 🎤", 'E'),
+]
+TRAITS = ['R', 'I', 'A', 'S', 'E', 'C']
+
+TRAIT_NAMES = {
+    'R': 'Realistic',
+    'I': 'Investigative', 
+    'A': 'Artistic',
+    'S': 'Social',
+    'E': 'Enterprising',
+    'C': 'Conventional'
+}
+
+TRAIT_DESCRIPTIONS = {
+    'R': '🔧 The Doer - Hands-on, practical, and mechanical',
+    'I': '🔬 The Thinker - Analytical, intellectual, and research-oriented',
+    'A': '🎨 The Creator - Creative, expressive, and design-oriented',
+    'S': '🤝 The Helper - Helping, teaching, and service-oriented',
+    'E': '📈 The Persuader - Leadership, business-focused, and persuasive',
+    'C': '📊 The Organizer - Structured, detail-oriented, and data-driven'
+}
+
+# -------------------------
+# COURSES (12 titles - trimmed down)
+# -------------------------
+COURSES = [
+    "BIOLOGY",
+    "DATA ANALYSIS",
+    "ECONOMICS",
+    "LAW",
+    "CHEMISTRY",
+    "HOTEL MANAGEMENT",
+    "ADVERTISING",
+    "CIVIL ENGINEERING",
+    "INTERIOR DESIGN",
+    "LANGUAGE STUDIES",
+    "PSYCHOLOGY",
+    "COMPUTER PROGRAMMING"
+]
+
+# -------------------------
+# SHEET LAYOUT
+# -------------------------
+SUBMISSIONS_HEADERS = [
+    "submission_id", "student_name", "degree", "email", "timestamp",
+    "consent_purpose", "consent_confidentiality", "consent_participate",
+    "consent_timestamp"
+]
+ANSWERS_HEADERS = ["submission_id", "question_id", "trait", "answer"]
+SCORES_HEADERS = ["submission_id","R_percent","I_percent","A_percent","S_percent","E_percent","C_percent"]
+CHOICES_HEADERS = ["submission_id"] + COURSES
+
+# -------------------------
+# Scoring
+# -------------------------
+def compute_standardized_scores(answers_df):
+    df = answers_df.copy()
+    # skipped items (None / blank) count towards neither yes_count nor n_items
+    df['answer'] = pd.to_numeric(df['answer'], errors='coerce')
+    df = df.dropna(subset=['answer'])
+    df['answer'] = df['answer'].astype(int)
+    trait_yes = df.groupby('trait')['answer'].sum().reindex(TRAITS).fillna(0).astype(int)
+    trait_n = df.groupby('trait')['answer'].count().reindex(TRAITS).fillna(0).astype(int)
+    props = (trait_yes / trait_n.replace(0, 1)).round(6)
+    props = props.where(trait_n > 0, 0)
+    denom = props.sum()
+    if denom == 0:
+        scores = pd.Series([0]*len(TRAITS), index=TRAITS)
+    else:
+        scores = (props / denom).round(6)
+    return pd.DataFrame({
+        "trait": TRAITS,
+        "yes_count": trait_yes.values,
+        "n_items": trait_n.values,
+        "prop": props.values,
+        "score_frac": scores.values,
+        "score_percent": (scores.values * 100).round(1)
+    })
+
+def normalize_degree(degree):
+    """Cohort key for a free-text degree: 'B.Sc  Computer Science' -> 'bsc computer science'."""
+    text = str(degree or "").casefold().replace(".", "")
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+def compute_percent_matrix(yes_counts, n_items):
+    """Vectorized compute_standardized_scores: (n, 6) counts -> (n, 6) score percents.
+
+    Applies the same rounding steps, so results match the per-submission path.
+    """
+    yes_counts = np.asarray(yes_counts, dtype=np.float64)
+    n_items = np.asarray(n_items, dtype=np.float64)
+    props = np.where(n_items > 0, np.round(yes_counts / np.where(n_items == 0, 1, n_items), 6), 0.0)
+    denom = props.sum(axis=1, keepdims=True)
+    scores = np.where(denom == 0, 0.0, np.round(props / np.where(denom == 0, 1, denom), 6))
+    return np.round(scores * 100, 1)
@@ -0,0 +1,113 @@
+# Memory report for one submitted survey session: bytes held in
+# st.session_state before and after the compact results representation
+# (packed answer bits + score tuple + card cache key instead of a DataFrame).
+# Every key in the state is measured, so keys added later (export, admission,
+# browser paging) are counted without touching this script; key_sizes() takes
+# st.session_state itself for a live session.
+#
+#   python session_profile.py [--sessions 2000] [--top 10]
+import argparse
+import random
+import sys
+
+import pandas as pd
+
+from riasec_core import QUESTIONS, COURSES, compute_standardized_scores
+from answer_codec import pack_answers, score_tuple
+from early_stop import EarlyStopTracker
+from shared_cache import fingerprint
+
+def deep_sizeof(obj, seen=None):
+    """Approximate retained bytes of obj, following containers, DataFrames and object attributes."""
+    seen = seen if seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, pd.DataFrame):
+        return sys.getsizeof(obj) + int(obj.memory_usage(deep=True, index=True).sum())
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(v, seen) for v in obj)
+    elif not isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        if hasattr(obj, "__dict__"):
+            size += deep_sizeof(vars(obj), seen)
+        for slot in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, slot):
+                size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+def key_sizes(state):
+    """{key: retained bytes} for every key of a mapping such as st.session_state, largest first."""
+    seen = set()
+    sizes = {k: deep_sizeof(v, seen) for k, v in list(state.items())}
+    return dict(sorted(sizes.items(), key=lambda kv: -kv[1]))
+
+def sample_session(rng):
+    answers = [(qid, trait, rng.randint(0, 1)) for qid, _, trait in QUESTIONS]
+    widgets = {f"q_{qid}": "Yes" if ans else "No" for qid, _, ans in answers}
+    widgets.update({f"course_{i}": i < 3 for i in range(len(COURSES))})
+    tracker = EarlyStopTracker()
+    for qid, _, ans in answers:
+        tracker.set_answer(qid, ans)
+    common = {
+        "course_checks": [i < 3 for i in range(len(COURSES))],
+        "consent_purpose": True,
+        "consent_confidentiality": True,
+        "consent_participate": True,
+        "survey_submitted": True,
+        "final_name": "Student Name",
+        "final_degree": "B.Com",
+        "name_input": "Student Name",
+        "degree_input": "B.Com",
+        "email_input": "student@example.com",
+        "admission_owner": "00000000-0000-0000-0000-000000000000",
+        "early_stop": tracker,
+        "results_emailed": True,
+        **widgets,
+    }
+    return answers, common
+
+def build_sessions(seed=0):
+    rng = random.Random(seed)
+    answers, common = sample_session(rng)
+    scores_df = compute_standardized_scores(pd.DataFrame(answers, columns=["question_id", "trait", "answer"]))
+    before = dict(common, final_scores_df=scores_df)
+    scores = score_tuple(scores_df)
+    after = dict(common,
+                 final_answer_bits=pack_answers(answers),
+                 final_scores=scores,
+                 card_key=f"card:{fingerprint([common['final_name'], list(scores)])}")
+    return before, after
+
+def report(n_sessions, top=10):
+    before, after = build_sessions()
+    # the results representation is whatever differs between the two layouts
+    shared = {k for k in before.keys() & after.keys() if before[k] is after[k]}
+    rows = []
+    for label, state in (("before", before), ("after", after)):
+        sizes = key_sizes(state)
+        results_bytes = sum(n for k, n in sizes.items() if k not in shared)
+        total = deep_sizeof(state)
+        rows.append((label, results_bytes, total, total * n_sessions / 2**20, sizes))
+    print(f"{'layout':<8} {'results bytes':>14} {'session bytes':>14} {f'MiB @ {n_sessions} sessions':>22}")
+    for label, results_bytes, total, mib, _ in rows:
+        print(f"{label:<8} {results_bytes:>14,} {total:>14,} {mib:>22.2f}")
+    for label, _, _, _, sizes in rows:
+        print(f"\nLargest keys ({label}, {len(sizes)} keys):")
+        for key, n in list(sizes.items())[:top]:
+            print(f"  {key:<28} {n:>10,}")
+    print("\nWidget values (q_*, course_*) are owned by the form widgets and are identical in both layouts.")
+    print("Before, every rerun also rebuilt the PIL card and its PNG bytes; after, they come from st.cache_data.")
+    return [r[:4] for r in rows]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report per-session memory before/after compact results state.")
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--top", type=int, default=10, help="Largest keys to list per layout")
+    args = parser.parse_args(argv)
+    report(args.sessions, args.top)
+
+if __name__ == "__main__":
+    main()
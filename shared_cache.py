@@ -0,0 +1,188 @@
+# Optional cache shared by every app replica: verified sheet schema,
+# worksheet properties and rendered card assets. Backends:
+#   - "disk":   one pickle file per key under a directory; point it at /dev/shm
+#               or a shared volume to share between processes on a host. Each
+#               file's mtime is its expiry time, so expired entries are deleted
+#               by a stat-only sweep, which also keeps the directory under
+#               max_bytes by dropping the soonest-to-expire entries first.
+#   - "redis":  any client with Redis get/set(ex=)/delete, e.g. redis.Redis.
+#   - "memory": MemoryRedis, an in-process Redis stand-in for dev and tests.
+#   - "none":   caching disabled.
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+DEFAULT_TTL = 3600
+DEFAULT_DISK_MAX_BYTES = 256 * 1024 * 1024
+DISK_SWEEP_SECONDS = 60
+NO_EXPIRY_SECONDS = 10 * 365 * 86400
+
+def fingerprint(obj):
+    """Stable short hash of a JSON-serializable value."""
+    return hashlib.sha1(json.dumps(obj, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+class NullCache:
+    enabled = False
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=DEFAULT_TTL):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def get_or_compute(self, key, compute, ttl=DEFAULT_TTL):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.set(key, value, ttl)
+        return value
+
+class DiskCache(NullCache):
+    enabled = True
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_DISK_MAX_BYTES, sweep_interval=DISK_SWEEP_SECONDS):
+        if directory is None:
+            base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+            directory = os.path.join(base, "riasec_cache")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+        self._sweep_lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                expires_at, value = pickle.load(fh)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if expires_at and expires_at < time.time():
+            self._unlink(path)
+            return None
+        return value
+
+    def set(self, key, value, ttl=DEFAULT_TTL):
+        now = time.time()
+        expires_at = now + ttl if ttl else 0
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump((expires_at, value), fh, protocol=pickle.HIGHEST_PROTOCOL)
+        mtime = expires_at or now + NO_EXPIRY_SECONDS
+        os.utime(tmp, (now, mtime))
+        os.replace(tmp, self._path(key))
+        if now - self._last_sweep >= self.sweep_interval:
+            self.sweep(now)
+
+    def delete(self, key):
+        self._unlink(self._path(key))
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def sweep(self, now=None):
+        """Delete expired entries and abandoned temp files, then trim to max_bytes; returns files removed."""
+        now = time.time() if now is None else now
+        if not self._sweep_lock.acquire(blocking=False):
+            return 0
+        try:
+            self._last_sweep = now
+            removed, live = 0, []
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    if entry.name.startswith(".tmp"):
+                        if now - st.st_atime > self.sweep_interval * 10:
+                            self._unlink(entry.path)
+                            removed += 1
+                    elif st.st_mtime < now:
+                        self._unlink(entry.path)
+                        removed += 1
+                    else:
+                        live.append((st.st_mtime, st.st_size, entry.path))
+            total = sum(size for _, size, _ in live)
+            if self.max_bytes and total > self.max_bytes:
+                for _, size, path in sorted(live):
+                    if total <= self.max_bytes:
+                        break
+                    self._unlink(path)
+                    total -= size
+                    removed += 1
+            return removed
+        finally:
+            self._sweep_lock.release()
+
+class RedisCache(NullCache):
+    enabled = True
+
+    def __init__(self, client, prefix="riasec:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=DEFAULT_TTL):
+        self.client.set(self.prefix + key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ex=ttl or None)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+class MemoryRedis:
+    """Minimal in-process stand-in for the Redis commands RedisCache uses."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            item = self._data.get(name)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at and expires_at < time.time():
+                del self._data[name]
+                return None
+            return value
+
+    def set(self, name, value, ex=None):
+        with self._lock:
+            self._data[name] = (value, time.time() + ex if ex else 0)
+        return True
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(1 for n in names if self._data.pop(n, None) is not None)
+
+def make_cache(config):
+    """Build a cache from a config mapping such as st.secrets["cache"]."""
+    backend = (config or {}).get("backend", "none")
+    if backend == "disk":
+        return DiskCache(config.get("directory"), int(config.get("max_bytes", DEFAULT_DISK_MAX_BYTES)))
+    if backend == "redis":
+        import redis
+        return RedisCache(redis.Redis.from_url(config["url"]), config.get("prefix", "riasec:"))
+    if backend == "memory":
+        return RedisCache(MemoryRedis(), config.get("prefix", "riasec:"))
+    return NullCache()
@@ -0,0 +1,309 @@
+# Size/time bucketed tabs ("shards") for the append-only tabs.
+#
+# Writers append to the active shard of a base tab (e.g. answers_2026_10) and
+# roll over to a new tab when the month changes or the shard reaches its row
+# budget, and to a new spreadsheet when the current one nears the cell cap.
+# Every shard is listed in the shard_index tab so readers can fan out across
+# all shards, or only the ones for the periods they need; sheets_io.read_tab
+# does this for every base tab once a shard_index exists.
+import threading
+from datetime import datetime, UTC
+
+from gspread.exceptions import APIError, WorksheetNotFound
+from gspread.utils import absolute_range_name
+
+from riasec_core import SUBMISSIONS_HEADERS, ANSWERS_HEADERS, SCORES_HEADERS, CHOICES_HEADERS
+from answer_codec import WIDE_ANSWERS_TAB, WIDE_ANSWERS_HEADERS
+
+SHARD_INDEX_TAB = "shard_index"
+SHARD_INDEX_HEADERS = ["base", "shard", "spreadsheet_id", "period", "created", "rows", "status"]
+
+BASE_HEADERS = {
+    "submissions": SUBMISSIONS_HEADERS,
+    "answers": ANSWERS_HEADERS,
+    "scores": SCORES_HEADERS,
+    "choices": CHOICES_HEADERS,
+    WIDE_ANSWERS_TAB: WIDE_ANSWERS_HEADERS,
+}
+
+DEFAULT_MAX_SHARD_ROWS = 50000
+SPREADSHEET_CELL_LIMIT = 10_000_000
+CELL_HEADROOM = 0.9
+INITIAL_SHARD_ROWS = 1000
+
+def period_for(now=None):
+    now = now or datetime.now(UTC)
+    return now.strftime("%Y_%m")
+
+def parse_shard_index(values):
+    """shard_index rows -> entries in index order, one per (spreadsheet_id, shard).
+
+    Concurrent rollovers can leave the same shard listed twice; the first row
+    is kept, with the larger row count and 'closed' winning over 'active'.
+    """
+    entries, by_key = [], {}
+    for i, row in enumerate(values[1:], start=2):
+        row = row + [""] * (len(SHARD_INDEX_HEADERS) - len(row))
+        entry = dict(zip(SHARD_INDEX_HEADERS, row))
+        if not entry["base"] or not entry["shard"]:
+            continue
+        try:
+            entry["rows"] = int(entry["rows"] or 0)
+        except ValueError:
+            entry["rows"] = 0
+        entry["_row"] = i
+        key = (entry["spreadsheet_id"], entry["shard"])
+        first = by_key.get(key)
+        if first is None:
+            by_key[key] = entry
+            entries.append(entry)
+            continue
+        first["rows"] = max(first["rows"], entry["rows"])
+        if entry["status"] == "closed":
+            first["status"] = "closed"
+    return entries
+
+class ShardRouter:
+    """Routes appends to the active shard of each base tab and keeps shard_index current.
+
+    Row counts are tracked in memory and flushed to the index every
+    `flush_every` appends and on rollover, so the row budget is a soft limit
+    when several processes write to the same spreadsheet. Every index write
+    and rollover re-reads shard_index first, so a replica adopts a shard
+    another one has just created instead of adding its own.
+    """
+
+    def __init__(self, gc, sh, max_rows=DEFAULT_MAX_SHARD_ROWS, flush_every=50):
+        self.gc = gc
+        self.sh = sh
+        self.max_rows = max_rows
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._spreadsheets = {sh.id: sh}
+        self._worksheets = {}  # (spreadsheet_id, shard) -> Worksheet, so appends skip the metadata GET
+        self._index_ws = self._get_index_ws()
+        self._entries = self._load_index()
+        self._pending = {}
+
+    # -------------------------
+    # Index
+    # -------------------------
+    def _get_index_ws(self):
+        try:
+            return self.sh.worksheet(SHARD_INDEX_TAB)
+        except WorksheetNotFound:
+            ws = self.sh.add_worksheet(title=SHARD_INDEX_TAB, rows="500", cols=str(len(SHARD_INDEX_HEADERS)))
+            ws.append_row(SHARD_INDEX_HEADERS)
+            return ws
+
+    def _load_index(self):
+        return parse_shard_index(self._index_ws.get_all_values())
+
+    def _reload_index(self):
+        self._entries = self._load_index()
+
+    def _find(self, spreadsheet_id, shard):
+        for e in self._entries:
+            if e["spreadsheet_id"] == spreadsheet_id and e["shard"] == shard:
+                return e
+        return None
+
+    def shards(self, base, periods=None):
+        return [e for e in self._entries
+                if e["base"] == base and (periods is None or e["period"] in periods)]
+
+    def _active(self, base):
+        active = [e for e in self._entries if e["base"] == base and e["status"] == "active"]
+        return active[-1] if active else None
+
+    def _flush_entry(self, entry, added_rows=0, status=None):
+        """Add this process's rows (and maybe a new status) to the shard's current index row.
+
+        The row is located by shard after a fresh read, so another replica's
+        rows are never overwritten and its row count is added to, not replaced.
+        """
+        self._reload_index()
+        current = self._find(entry["spreadsheet_id"], entry["shard"])
+        if current is None:
+            return entry
+        current["rows"] += added_rows
+        if status:
+            current["status"] = status
+        row = [current[h] for h in SHARD_INDEX_HEADERS]
+        self._index_ws.update(f"A{current['_row']}:G{current['_row']}", [row])
+        return current
+
+    # -------------------------
+    # Writing
+    # -------------------------
+    def _spreadsheet(self, spreadsheet_id):
+        if spreadsheet_id not in self._spreadsheets:
+            self._spreadsheets[spreadsheet_id] = self.gc.open_by_key(spreadsheet_id)
+        return self._spreadsheets[spreadsheet_id]
+
+    def _cells_used(self, sh):
+        return sum(ws.row_count * ws.col_count for ws in sh.worksheets())
+
+    def _target_spreadsheet(self, base, previous):
+        sh = self._spreadsheet(previous["spreadsheet_id"]) if previous else self.sh
+        headers = BASE_HEADERS[base]
+        needed = INITIAL_SHARD_ROWS * max(10, len(headers))
+        if self._cells_used(sh) + needed <= SPREADSHEET_CELL_LIMIT * CELL_HEADROOM:
+            return sh
+        new_sh = self.gc.create(f"{self.sh.title} ({period_for()})")
+        self._spreadsheets[new_sh.id] = new_sh
+        return new_sh
+
+    def _needs_rollover(self, entry, period, n_rows):
+        return (entry is None or entry["period"] != period
+                or entry["rows"] + self._pending.get(entry["shard"], 0) + n_rows > self.max_rows)
+
+    def _open_shard(self, target, title, headers):
+        """The shard tab `title`, created with its header row unless it already exists."""
+        try:
+            return target.worksheet(title)
+        except WorksheetNotFound:
+            pass
+        try:
+            ws = target.add_worksheet(title=title, rows=str(INITIAL_SHARD_ROWS), cols=str(max(10, len(headers))))
+        except APIError:
+            # another replica created it between our check and the add
+            return target.worksheet(title)
+        ws.append_row(headers)
+        return ws
+
+    def _roll_over(self, base, previous, period, n_rows):
+        if previous:
+            previous = self._flush_entry(previous, self._pending.pop(previous["shard"], 0), "closed")
+        else:
+            self._reload_index()
+        # another replica may already have rolled over for this period
+        adopted = self._active(base)
+        if adopted is not None:
+            if not self._needs_rollover(adopted, period, n_rows):
+                return adopted
+            previous = self._flush_entry(adopted, self._pending.pop(adopted["shard"], 0), "closed")
+
+        target = self._target_spreadsheet(base, previous)
+        closed = {e["shard"] for e in self._entries
+                  if e["spreadsheet_id"] == target.id and e["status"] == "closed"}
+        title, n = f"{base}_{period}", 2
+        # titles are deterministic, so racing replicas land on the same tab
+        while title in closed:
+            title = f"{base}_{period}_{n}"
+            n += 1
+        self._worksheets[target.id, title] = self._open_shard(target, title, BASE_HEADERS[base])
+
+        self._reload_index()
+        entry = self._find(target.id, title)
+        if entry is not None:
+            return entry
+        entry = {
+            "base": base, "shard": title, "spreadsheet_id": target.id, "period": period,
+            "created": datetime.now(UTC).isoformat(), "rows": 0, "status": "active",
+        }
+        self._index_ws.append_row([entry[h] for h in SHARD_INDEX_HEADERS])
+        self._reload_index()
+        return self._find(target.id, title) or entry
+
+    def worksheet_for_append(self, base, n_rows, now=None):
+        """Worksheet that should receive the next `n_rows` rows of `base`."""
+        period = period_for(now)
+        with self._lock:
+            entry = self._active(base)
+            if self._needs_rollover(entry, period, n_rows):
+                if entry is not None:
+                    self._worksheets.pop((entry["spreadsheet_id"], entry["shard"]), None)
+                entry = self._roll_over(base, entry, period, n_rows)
+            key = (entry["spreadsheet_id"], entry["shard"])
+            ws = self._worksheets.get(key)
+            if ws is None:
+                ws = self._worksheets[key] = self._spreadsheet(entry["spreadsheet_id"]).worksheet(entry["shard"])
+            return ws
+
+    def record_append(self, base, n_rows):
+        with self._lock:
+            entry = self._active(base)
+            if entry is None:
+                return
+            pending = self._pending.get(entry["shard"], 0) + n_rows
+            if pending >= self.flush_every:
+                self._flush_entry(entry, pending)
+                pending = 0
+            self._pending[entry["shard"]] = pending
+
+# -------------------------
+# Reading
+# -------------------------
+def load_shard_index(sh):
+    """Entries of the shard_index tab, or [] when the spreadsheet is not sharded."""
+    try:
+        ws = sh.worksheet(SHARD_INDEX_TAB)
+    except WorksheetNotFound:
+        return []
+    return parse_shard_index(ws.get_all_values())
+
+def _sources(spreadsheet_for, home, base, entries, include_legacy):
+    targets = [(home.id, base)] if include_legacy else []
+    targets += [(e["spreadsheet_id"], e["shard"]) for e in entries]
+    existing, sources = {}, []
+    for spreadsheet_id, title in targets:
+        sh = spreadsheet_for(spreadsheet_id)
+        if spreadsheet_id not in existing:
+            existing[spreadsheet_id] = {ws.title for ws in sh.worksheets()}
+        if title in existing[spreadsheet_id]:
+            sources.append((sh, title))
+    return sources
+
+def shard_sources(sh, base, periods=None, include_legacy=True, index=None):
+    """[(spreadsheet, title)] holding rows of `base`: the legacy tab, then its shards in index order.
+
+    Tabs that don't exist are skipped, so an unsharded spreadsheet yields just
+    the base tab. Shards in other spreadsheets are opened with sh.client.
+    """
+    entries = load_shard_index(sh) if index is None else index
+    entries = [e for e in entries if e["base"] == base and (periods is None or e["period"] in periods)]
+    opened = {sh.id: sh}
+
+    def spreadsheet_for(spreadsheet_id):
+        if spreadsheet_id not in opened:
+            client = getattr(sh, "client", None)
+            if client is None:
+                raise RuntimeError(f"A {base} shard is in spreadsheet {spreadsheet_id}, which this handle cannot open")
+            opened[spreadsheet_id] = client.open_by_key(spreadsheet_id)
+        return opened[spreadsheet_id]
+
+    return _sources(spreadsheet_for, sh, base, entries, include_legacy)
+
+def read_sources(sources, base=None):
+    """(header, rows) across [(spreadsheet, title)] with one values_batch_get per spreadsheet.
+
+    The header is the first non-empty tab's, or BASE_HEADERS[base] if every
+    tab is empty; rows keep the order of `sources`.
+    """
+    grouped = {}
+    for sh, title in sources:
+        grouped.setdefault(sh.id, (sh, []))[1].append(title)
+    values_for = {}
+    for spreadsheet_id, (sh, titles) in grouped.items():
+        resp = sh.values_batch_get([absolute_range_name(t, "A:ZZ") for t in titles])
+        for title, value_range in zip(titles, resp.get("valueRanges", [])):
+            values_for[spreadsheet_id, title] = value_range.get("values", [])
+    header, rows = [], []
+    for sh, title in sources:
+        values = values_for.get((sh.id, title)) or []
+        if values:
+            header = header or values[0]
+            rows.extend(values[1:])
+    if not header and base:
+        header = list(BASE_HEADERS[base])
+    return header, rows
+
+def read_sharded_tab(sh, base, periods=None, include_legacy=True, index=None):
+    """Read `base` across the legacy tab and its shards; returns (header, rows)."""
+    return read_sources(shard_sources(sh, base, periods, include_legacy, index), base)
+
+def read_sharded(router, base, periods=None, include_legacy=True):
+    """read_sharded_tab for a live ShardRouter, using its index and open spreadsheets."""
+    sources = _sources(router._spreadsheet, router.sh, base, router.shards(base, periods), include_legacy)
+    return read_sources(sources, base)
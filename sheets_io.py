@@ -0,0 +1,66 @@
+# Spreadsheet access for offline tools (migrations, exports, backfills).
+# The Streamlit app builds its client from st.secrets; command-line jobs use a
+# service-account JSON file instead.
+import json
+
+from google.oauth2.service_account import Credentials
+import gspread
+from gspread.exceptions import WorksheetNotFound
+
+GS_SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive"
+]
+
+def open_spreadsheet(credentials_path, spreadsheet_id):
+    with open(credentials_path) as fh:
+        sa_info = json.load(fh)
+    credentials = Credentials.from_service_account_info(sa_info, scopes=GS_SCOPES)
+    gc = gspread.authorize(credentials)
+    return gc.open_by_key(spreadsheet_id)
+
+def add_spreadsheet_args(parser):
+    parser.add_argument("--credentials", help="Service account JSON file")
+    parser.add_argument("--spreadsheet-id", help="Target spreadsheet key")
+    parser.add_argument("--local", metavar="PATH",
+                        help="Use a local JSON stand-in spreadsheet instead of Google Sheets")
+
+def spreadsheet_from_args(args):
+    if args.local:
+        from local_sheets import LocalSpreadsheet
+        return LocalSpreadsheet.load(args.local)
+    if not (args.credentials and args.spreadsheet_id):
+        raise SystemExit("--credentials and --spreadsheet-id are required unless --local is given")
+    return open_spreadsheet(args.credentials, args.spreadsheet_id)
+
+def save_if_local(sh):
+    if getattr(sh, "path", None):
+        sh.save()
+
+def read_tab(sh, title):
+    """Read a whole tab in one request; returns (header, rows) or ([], []) if missing.
+
+    A base tab of a sharded spreadsheet (see sheet_shards) is read across the
+    legacy tab and every shard listed in shard_index.
+    """
+    from sheet_shards import BASE_HEADERS, load_shard_index, read_sharded_tab
+
+    if title in BASE_HEADERS:
+        index = load_shard_index(sh)
+        if any(e["base"] == title for e in index):
+            return read_sharded_tab(sh, title, index=index)
+    try:
+        values = sh.worksheet(title).get_all_values()
+    except WorksheetNotFound:
+        return [], []
+    if not values:
+        return [], []
+    return values[0], values[1:]
+
+def get_or_create_worksheet(sh, title, headers, rows=1000):
+    try:
+        return sh.worksheet(title)
+    except WorksheetNotFound:
+        ws = sh.add_worksheet(title=title, rows=str(rows), cols=str(max(10, len(headers))))
+        ws.append_row(headers)
+        return ws
@@ -0,0 +1,192 @@
+# Local index over the submissions tab for the admin browser: timestamps
+# sorted once, degree buckets and a normalized email map, so filtering and
+# paging never touch the sheet. Only the answers/scores for the students on
+# the current page are fetched, with one values_batch_get per page (per
+# spreadsheet, when tabs are sharded). The index is shared between sessions,
+# so refresh and reads hold one lock.
+import threading
+
+import numpy as np
+import pandas as pd
+from gspread.utils import absolute_range_name
+
+from riasec_core import SUBMISSIONS_HEADERS, SCORES_HEADERS, normalize_degree
+from answer_codec import WIDE_ANSWERS_TAB, decode_matrix, QUESTION_IDS
+from sheet_shards import load_shard_index, shard_sources
+
+DETAIL_TABS = ["answers", WIDE_ANSWERS_TAB, "scores"]
+
+def _normalize_text(value):
+    return " ".join(str(value or "").casefold().split())
+
+class SubmissionsIndex:
+    def __init__(self, sh):
+        self.sh = sh
+        self._lock = threading.RLock()
+        self.n_rows = 0
+        self._columns = {h: np.array([], dtype=object) for h in SUBMISSIONS_HEADERS}
+        self._sheet_rows = np.array([], dtype=np.int64)
+        self._sheet_tabs = np.array([], dtype=object)
+        self._spreadsheets = {sh.id: sh}
+        self._read_rows = {}  # (spreadsheet_id, tab) -> data rows already read
+        # title -> {submission_id: (spreadsheet_id, tab, first, last)}
+        self._row_locator = {t: {} for t in DETAIL_TABS}
+        self.refresh()
+
+    # -------------------------
+    # Building
+    # -------------------------
+    def refresh(self):
+        """Pull only rows appended since the last build, then rebuild the derived arrays."""
+        with self._lock:
+            return self._refresh_locked()
+
+    def _new_rows(self, source_sh, tab, last_col):
+        """(first sheet row, rows) appended to a tab since it was last read."""
+        self._spreadsheets.setdefault(source_sh.id, source_sh)
+        key = (source_sh.id, tab)
+        start = self._read_rows.get(key, 0) + 2
+        rows = source_sh.worksheet(tab).get(f"A{start}:{last_col}")
+        self._read_rows[key] = start - 2 + len(rows)
+        return start, rows
+
+    def _refresh_locked(self):
+        index = load_shard_index(self.sh)
+        added = 0
+        for source_sh, tab in shard_sources(self.sh, "submissions", index=index):
+            start, rows = self._new_rows(source_sh, tab, chr(ord("A") + len(SUBMISSIONS_HEADERS) - 1))
+            rows = [r + [""] * (len(SUBMISSIONS_HEADERS) - len(r)) for r in rows]
+            if not rows:
+                continue
+            new = list(zip(*rows))
+            for h, values in zip(SUBMISSIONS_HEADERS, new):
+                self._columns[h] = np.concatenate([self._columns[h], np.array(values, dtype=object)])
+            self._sheet_rows = np.concatenate([self._sheet_rows, np.arange(start, start + len(rows))])
+            self._sheet_tabs = np.concatenate([self._sheet_tabs, np.full(len(rows), tab, dtype=object)])
+            self.n_rows += len(rows)
+            added += len(rows)
+        self._build_derived()
+        self._refresh_locators(index)
+        return added
+
+    def _build_derived(self):
+        ts = pd.to_datetime(pd.Series(self._columns["timestamp"], dtype=object), utc=True, errors="coerce")
+        ts_ns = ts.astype("int64").to_numpy()
+        ts_ns[ts.isna().to_numpy()] = np.iinfo(np.int64).min
+        self.order = np.argsort(ts_ns, kind="stable")
+        self.ts_sorted = ts_ns[self.order]
+
+        normalized = [normalize_degree(d) for d in self._columns["degree"]]
+        # per degree, the ascending positions in timestamp order that hold it
+        keys, inverse, counts = np.unique(np.array(normalized, dtype=str)[self.order],
+                                          return_inverse=True, return_counts=True)
+        grouped = np.argsort(inverse, kind="stable")
+        self.degree_buckets = dict(zip(keys.tolist(), np.split(grouped, np.cumsum(counts)[:-1])))
+        self.degree_counts = dict(zip(keys.tolist(), counts.tolist()))
+        self.degree_labels = {}
+        for raw, norm in zip(self._columns["degree"], normalized):
+            self.degree_labels.setdefault(norm, raw.strip())
+
+        self.names_sorted = np.array([_normalize_text(n) for n in self._columns["student_name"]], dtype=str)[self.order]
+        self.email_map = {}
+        for pos, email in enumerate(self._columns["email"][self.order]):
+            key = _normalize_text(email)
+            if key:
+                self.email_map.setdefault(key, []).append(pos)
+
+    def _refresh_locators(self, index):
+        """Map submission_id -> (spreadsheet_id, tab, first, last) in each detail tab, reading only new column-A cells."""
+        for title in DETAIL_TABS:
+            locator = self._row_locator[title]
+            for source_sh, tab in shard_sources(self.sh, title, index=index):
+                start, ids = self._new_rows(source_sh, tab, "A")
+                for offset, cell in enumerate(ids):
+                    if cell and cell[0]:
+                        row = start + offset
+                        span = locator.get(cell[0])
+                        same_tab = span is not None and span[:2] == (source_sh.id, tab)
+                        locator[cell[0]] = (source_sh.id, tab, span[2] if same_tab else row, row)
+
+    # -------------------------
+    # Querying
+    # -------------------------
+    def degrees(self):
+        """[(normalized key, display label, count)] largest cohorts first."""
+        with self._lock:
+            out = [(k, self.degree_labels.get(k, k), n) for k, n in self.degree_counts.items() if k]
+        return sorted(out, key=lambda x: -x[2])
+
+    def query(self, text="", degree=None, start=None, end=None, page=0, page_size=25, newest_first=True):
+        """Return (total_matches, DataFrame of the requested page)."""
+        with self._lock:
+            return self._query_locked(text, degree, start, end, page, page_size, newest_first)
+
+    def _query_locked(self, text, degree, start, end, page, page_size, newest_first):
+        lo, hi = 0, len(self.ts_sorted)
+        if start is not None:
+            lo = int(np.searchsorted(self.ts_sorted, pd.Timestamp(start, tz="UTC").value, side="left"))
+        if end is not None:
+            hi = int(np.searchsorted(self.ts_sorted, pd.Timestamp(end, tz="UTC").value, side="right"))
+        if degree:
+            bucket = self.degree_buckets.get(degree, np.array([], dtype=np.int64))
+            positions = bucket[np.searchsorted(bucket, lo):np.searchsorted(bucket, hi)]
+        else:
+            positions = np.arange(lo, hi)
+        text = _normalize_text(text)
+        if text:
+            if "@" in text:
+                positions = np.intersect1d(positions, self.email_map.get(text, []), assume_unique=True)
+            else:
+                positions = positions[np.char.find(self.names_sorted[positions], text) >= 0]
+
+        if newest_first:
+            positions = positions[::-1]
+        total = len(positions)
+        page_pos = positions[page * page_size:(page + 1) * page_size]
+        rows = self.order[page_pos]
+        df = pd.DataFrame({h: self._columns[h][rows] for h in SUBMISSIONS_HEADERS})
+        df["sheet_row"] = self._sheet_rows[rows]
+        df["tab"] = self._sheet_tabs[rows]
+        return total, df
+
+    def fetch_details(self, submission_ids):
+        """Answers (Y/N/- string) and score row for each id, in one values_batch_get per spreadsheet."""
+        requests, keys = {}, []
+        with self._lock:
+            for sid in submission_ids:
+                for title in DETAIL_TABS:
+                    span = self._row_locator[title].get(sid)
+                    if not span:
+                        continue
+                    spreadsheet_id, tab, first, last = span
+                    requests.setdefault(spreadsheet_id, []).append(absolute_range_name(tab, f"A{first}:G{last}"))
+                    keys.append((sid, title, spreadsheet_id, len(requests[spreadsheet_id]) - 1))
+            spreadsheets = {k: self._spreadsheets[k] for k in requests}
+        details = {sid: {"answers": None, "scores": None} for sid in submission_ids}
+        if not keys:
+            return details
+        responses = {k: spreadsheets[k].values_batch_get(ranges).get("valueRanges", [])
+                     for k, ranges in requests.items()}
+        qpos = {str(qid): i for i, qid in enumerate(QUESTION_IDS.tolist())}
+        for sid, title, spreadsheet_id, pos in keys:
+            value_range = responses[spreadsheet_id][pos] if pos < len(responses[spreadsheet_id]) else {}
+            values = [r for r in value_range.get("values", []) if r and r[0] == sid]
+            if not values:
+                continue
+            if title == "scores":
+                details[sid]["scores"] = dict(zip(SCORES_HEADERS[1:], values[-1][1:]))
+            elif title == WIDE_ANSWERS_TAB:
+                details[sid]["answers"] = values[-1][2] if len(values[-1]) > 2 else ""
+            elif details[sid]["answers"] is None:
+                chars = ["-"] * len(qpos)
+                for r in values:
+                    if len(r) > 3 and r[1] in qpos:
+                        chars[qpos[r[1]]] = "Y" if r[3] == "1" else "N" if r[3] == "0" else "-"
+                details[sid]["answers"] = "".join(chars)
+        return details
+
+def answers_frame(encoded):
+    """Q1..Q42 Yes/No table for an encoded answer string."""
+    row = decode_matrix([encoded or ""])[0]
+    labels = np.array(["—", "No", "Yes"])[row.astype(np.int64) + 1]
+    return pd.DataFrame({"question": [f"Q{q}" for q in QUESTION_IDS.tolist()], "answer": labels})
@@ -0,0 +1,102 @@
+# Vector results card built from string templates. Same sections as the PNG
+# card in app.py (header, score table, radar, top traits, matches, footer),
+# but the radar polygon is computed directly from the six percents, so
+# nothing is rasterized and a card is a few KB of SVG.
+import math
+from html import escape
+
+from riasec_core import TRAITS, TRAIT_NAMES, TRAIT_DESCRIPTIONS
+
+WIDTH = 800
+TRAIT_COLORS = {'R': '#e67e22', 'I': '#3498db', 'A': '#e74c3c', 'S': '#1abc9c', 'E': '#9b59b6', 'C': '#34495e'}
+FONT = "Helvetica, Arial, sans-serif"
+
+_DOCUMENT = ('<svg xmlns="http://www.w3.org/2000/svg" width="{w}" height="{h}" viewBox="0 0 {w} {h}" '
+             'font-family="{font}" role="img" aria-label="RIASEC profile for {name}">'
+             '<rect width="{w}" height="{h}" fill="#fff"/>{body}</svg>')
+_HEADER = ('<rect width="{w}" height="180" fill="#667eea"/>'
+           '<text x="{cx}" y="80" text-anchor="middle" font-size="56" font-weight="bold" fill="#fff">RIASEC PROFILE</text>'
+           '<text x="60" y="150" font-size="40" font-weight="bold" fill="#fff">{name}</text>')
+_HEADING = '<text x="{x}" y="{y}" font-size="26" font-weight="bold" fill="#2c3e50"{anchor}>{text}</text>'
+_TABLE_ROW = ('<rect x="60" y="{y}" width="340" height="35" fill="{fill}" stroke="#ccc"/>'
+              '<line x1="160" y1="{y}" x2="160" y2="{y2}" stroke="#ccc"/>'
+              '<text x="80" y="{ty}" font-size="20" fill="#333">{trait}</text>'
+              '<text x="180" y="{ty}" font-size="20" fill="#333">{value}</text>')
+_TRAIT_BOX = ('<rect x="50" y="{y}" width="{bw}" height="70" rx="35" fill="{color}"/>'
+              '<text x="75" y="{y1}" font-size="26" font-weight="bold" fill="#fff">{title}</text>'
+              '<text x="75" y="{y2}" font-size="17" fill="#fff">{desc}</text>')
+_LINE = '<text x="{x}" y="{y}" font-size="{size}" fill="{color}">{text}</text>'
+
+def _radar(cx, cy, radius, percents):
+    max_value = max(percents) if max(percents) > 0 else 100
+    range_max = min(100, max_value * 1.2) or 100
+    angles = [math.pi / 2 - i * 2 * math.pi / len(TRAITS) for i in range(len(TRAITS))]
+
+    def point(value, angle):
+        r = radius * min(value, range_max) / range_max
+        return f"{cx + r * math.cos(angle):.1f},{cy - r * math.sin(angle):.1f}"
+
+    parts = []
+    for frac in (0.25, 0.5, 0.75, 1.0):
+        pts = " ".join(point(range_max * frac, a) for a in angles)
+        parts.append(f'<polygon points="{pts}" fill="none" stroke="#ddd"/>')
+    for a in angles:
+        parts.append(f'<polyline points="{cx},{cy} {point(range_max, a)}" stroke="#ddd"/>')
+    pts = " ".join(point(v, a) for v, a in zip(percents, angles))
+    parts.append(f'<polygon points="{pts}" fill="rgba(135,206,250,0.6)" stroke="#1e3a8a" stroke-width="2"/>')
+    for trait, v, a in zip(TRAITS, percents, angles):
+        x, y = point(range_max * 1.18, a).split(",")
+        parts.append(f'<text x="{x}" y="{float(y) + 6:.1f}" text-anchor="middle" font-size="16" '
+                     f'font-weight="bold" fill="#2c3e50">{TRAIT_NAMES[trait]} {v:.1f}%</text>')
+    return "".join(parts)
+
+def render_svg_card(name, percents, matches=None, institution="Jain University"):
+    """SVG card for a six-trait profile (percents in TRAITS order)."""
+    percents = [float(p) for p in percents]
+    matches = matches or []
+    body = [_HEADER.format(w=WIDTH, cx=WIDTH // 2, name=escape(name or ""))]
+
+    y = 230
+    body.append(_HEADING.format(x=50, y=y, text="RIASEC Scores", anchor=""))
+    y += 20
+    body.append(_TABLE_ROW.format(y=y, y2=y + 35, ty=y + 24, fill="#f0f0f0", trait="Trait", value="Score %"))
+    for trait, pct in zip(TRAITS, percents):
+        y += 35
+        body.append(_TABLE_ROW.format(y=y, y2=y + 35, ty=y + 24, fill="#fff", trait=trait, value=f"{pct:.1f}%"))
+    y += 55
+
+    body.append(_radar(WIDTH // 2, y + 190, 150, percents))
+    y += 420
+
+    body.append(_HEADING.format(x=WIDTH // 2, y=y, text="Your Top Traits", anchor=' text-anchor="middle"'))
+    y += 25
+    top = sorted(range(len(TRAITS)), key=lambda i: -percents[i])[:3]
+    for i in top:
+        trait = TRAITS[i]
+        full = TRAIT_NAMES[trait]
+        description = TRAIT_DESCRIPTIONS[trait].split(' - ', 1)[-1]
+        body.append(_TRAIT_BOX.format(y=y, y1=y + 33, y2=y + 57, bw=WIDTH - 100, color=TRAIT_COLORS[trait],
+                                      title=f"{full}: {percents[i]:.1f}%",
+                                      desc=escape(f"The {full.split()[0]} - {description}")))
+        y += 85
+
+    if matches:
+        y += 30
+        body.append(_HEADING.format(x=50, y=y, text="Suggested Matches", anchor=""))
+        for title, kind, _ in matches:
+            y += 32
+            body.append(_LINE.format(x=70, y=y, size=20, color="#333", text=escape(f"{str(title).title()} ({kind})")))
+        y += 10
+
+    footer = [f"This assessment was conducted by {institution} and designed to identify",
+              "your primary vocational interest types among six categories:", ""]
+    footer += [f"{TRAIT_NAMES[t]} ({t}): {TRAIT_DESCRIPTIONS[t].split(' - ', 1)[-1]}." for t in TRAITS]
+    footer += ["", "Your scores reflect your preferences, not your abilities or limitations.",
+               "There are no 'right' or 'wrong' answers in this assessment."]
+    y += 20
+    for line in footer:
+        y += 22
+        if line:
+            body.append(_LINE.format(x=30, y=y, size=15, color="#666", text=escape(line)))
+    height = y + 30
+    return _DOCUMENT.format(w=WIDTH, h=height, font=FONT, name=escape(name or "", quote=True), body="".join(body))
@@ -0,0 +1,239 @@
+# Seeded synthetic survey population for benchmarks and capacity tests (no
+# real student data). Each student gets correlated latent propensities for
+# the six traits (adjacent types on the RIASEC hexagon correlate more than
+# opposite ones), shifted by their degree. Item answers are drawn from a
+# logistic model per question, following the QUESTIONS trait mapping, and
+# 2-4 course choices follow the catalog course profiles. Everything is
+# generated a chunk at a time as numpy arrays.
+#
+#   python synth_population.py -n 1000000 --seed 7 --parquet synth/
+#   python synth_population.py -n 20000 --seed 7 --local synth_sheet.json
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from riasec_core import (
+    TRAITS, COURSES, SUBMISSIONS_HEADERS, ANSWERS_HEADERS, SCORES_HEADERS, CHOICES_HEADERS,
+)
+from answer_codec import (
+    QUESTION_IDS, QUESTION_TRAITS, N_QUESTIONS, WIDE_ANSWERS_TAB, WIDE_ANSWERS_HEADERS, INSTRUMENT_VERSION,
+    score_answer_matrix,
+)
+from recommender import DEFAULT_CATALOG_PATH
+
+DEFAULT_CHUNK_SIZE = 100_000
+EMAIL_RATE = 0.6
+COURSE_COUNT_PROBS = {2: 0.3, 3: 0.4, 4: 0.3}
+HEXAGON_CORRELATION = [1.0, 0.45, 0.2, 0.05, 0.2, 0.45]  # by distance around R-I-A-S-E-C
+
+# (degree, share of students, latent mean shift per trait in TRAITS order)
+DEGREES = [
+    ("B.Tech Computer Science", 0.22, (0.3, 0.6, -0.1, -0.3, 0.0, 0.4)),
+    ("B.Tech Civil Engineering", 0.08, (0.8, 0.4, -0.2, -0.2, 0.0, 0.2)),
+    ("B.Sc Biotechnology", 0.10, (0.3, 0.7, -0.1, 0.1, -0.3, 0.1)),
+    ("BBA", 0.18, (-0.3, -0.1, 0.0, 0.2, 0.7, 0.4)),
+    ("B.Com", 0.14, (-0.3, 0.0, -0.2, 0.0, 0.4, 0.7)),
+    ("BA Psychology", 0.09, (-0.4, 0.3, 0.3, 0.8, 0.0, -0.1)),
+    ("B.Des", 0.07, (0.2, -0.1, 0.9, 0.1, 0.1, -0.3)),
+    ("BA Journalism", 0.06, (-0.3, 0.1, 0.7, 0.4, 0.4, -0.2)),
+    ("BHM", 0.06, (0.2, -0.3, 0.1, 0.6, 0.5, 0.1)),
+]
+
+def _trait_covariance():
+    n = len(TRAITS)
+    return np.array([[HEXAGON_CORRELATION[min(abs(i - j), n - abs(i - j))] for j in range(n)] for i in range(n)])
+
+def _course_profiles(catalog_path=DEFAULT_CATALOG_PATH):
+    """(12, 6) centered course profiles in COURSES order, from the catalog."""
+    df = pd.read_csv(catalog_path)
+    df = df[df["kind"] == "course"]
+    df = df.set_index(df["title"].str.upper())
+    profiles = df.reindex(COURSES)[TRAITS].fillna(50).to_numpy(dtype=np.float64) / 100.0
+    return profiles - profiles.mean(axis=1, keepdims=True)
+
+def _uuid_strings(rng, n):
+    """Version-4 style UUID strings from the seeded generator."""
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    hexed = np.array([r.tobytes().hex() for r in raw], dtype=object)
+    return np.array([f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}" for h in hexed], dtype=object)
+
+def generate_chunks(n, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, start="2025-06-01", end="2026-06-01",
+                    catalog_path=DEFAULT_CATALOG_PATH):
+    """Yield dicts of column arrays for n synthetic submissions, chunk_size at a time.
+
+    The output depends only on (n, seed, chunk_size, start, end).
+    """
+    root = np.random.SeedSequence(seed)
+    item_rng = np.random.default_rng(root.spawn(1)[0])
+    difficulty = item_rng.normal(0.3, 0.5, size=N_QUESTIONS)
+    trait_col = np.array([TRAITS.index(t) for t in QUESTION_TRAITS])
+    cov = _trait_covariance()
+    degree_names = np.array([d for d, _, _ in DEGREES], dtype=object)
+    degree_probs = np.array([w for _, w, _ in DEGREES])
+    degree_probs /= degree_probs.sum()
+    degree_means = np.array([m for _, _, m in DEGREES])
+    courses = _course_profiles(catalog_path)
+    counts = np.array(list(COURSE_COUNT_PROBS))
+    count_probs = np.array(list(COURSE_COUNT_PROBS.values()))
+    start_us = pd.Timestamp(start, tz="UTC").value // 1000
+    span_us = pd.Timestamp(end, tz="UTC").value // 1000 - start_us
+
+    n_chunks = -(-n // chunk_size)
+    for k, child in enumerate(root.spawn(n_chunks + 1)[1:]):
+        rng = np.random.default_rng(child)
+        size = min(chunk_size, n - k * chunk_size)
+        offset = k * chunk_size
+
+        degree_idx = rng.choice(len(DEGREES), size=size, p=degree_probs)
+        latent = rng.multivariate_normal(np.zeros(len(TRAITS)), cov, size=size, method="cholesky")
+        latent += degree_means[degree_idx]
+        p_yes = 1.0 / (1.0 + np.exp(-1.7 * (latent[:, trait_col] - difficulty)))
+        answers = (rng.random((size, N_QUESTIONS)) < p_yes).astype(np.int8)
+
+        utility = latent @ courses.T * 3.0 + rng.gumbel(size=(size, len(COURSES)))
+        n_pick = rng.choice(counts, size=size, p=count_probs)
+        rank = np.argsort(np.argsort(-utility, axis=1), axis=1)
+        choices = (rank < n_pick[:, None]).astype(np.int8)
+
+        ts_us = np.sort(start_us + rng.integers(0, span_us, size=size))
+        timestamps = np.char.add(np.datetime_as_string(ts_us.astype("datetime64[us]"), unit="us"), "+00:00")
+        numbers = np.arange(offset + 1, offset + size + 1)
+        names = np.array([f"Student {i:07d}" for i in numbers], dtype=object)
+        emails = np.where(rng.random(size) < EMAIL_RATE,
+                          np.array([f"student{i:07d}@example.org" for i in numbers], dtype=object), "")
+
+        yield {
+            "submission_id": _uuid_strings(rng, size),
+            "student_name": names,
+            "degree": degree_names[degree_idx],
+            "email": emails,
+            "timestamp": timestamps.astype(object),
+            "answers": answers,
+            "percents": score_answer_matrix(answers),
+            "choices": choices,
+        }
+
+# -------------------------
+# Writers
+# -------------------------
+def _submission_rows(chunk):
+    true = np.full(len(chunk["submission_id"]), "True", dtype=object)
+    return [chunk["submission_id"], chunk["student_name"], chunk["degree"], chunk["email"],
+            chunk["timestamp"], true, true, true, chunk["timestamp"]]
+
+def write_local(sh, chunks, answers_format="long", progress=None):
+    """Append chunks to the four app tabs of a (local stand-in) spreadsheet."""
+    from sheets_io import get_or_create_worksheet
+
+    answers_tab, answers_headers = (("answers", ANSWERS_HEADERS) if answers_format == "long"
+                                    else (WIDE_ANSWERS_TAB, WIDE_ANSWERS_HEADERS))
+    tabs = {
+        "submissions": get_or_create_worksheet(sh, "submissions", SUBMISSIONS_HEADERS),
+        answers_tab: get_or_create_worksheet(sh, answers_tab, answers_headers),
+        "scores": get_or_create_worksheet(sh, "scores", SCORES_HEADERS),
+        "choices": get_or_create_worksheet(sh, "choices", CHOICES_HEADERS),
+    }
+    written = 0
+    for chunk in chunks:
+        ids = chunk["submission_id"]
+        tabs["submissions"].append_rows([list(r) for r in zip(*_submission_rows(chunk))])
+        if answers_format == "long":
+            qids, traits = QUESTION_IDS.astype(str).tolist(), QUESTION_TRAITS.tolist()
+            tabs[answers_tab].append_rows([[sid, q, t, str(a)] for sid, row in zip(ids, chunk["answers"].tolist())
+                                           for q, t, a in zip(qids, traits, row)])
+        else:
+            chars = np.array(["N", "Y"])[chunk["answers"]]
+            tabs[answers_tab].append_rows([[sid, INSTRUMENT_VERSION, "".join(row)] for sid, row in zip(ids, chars)])
+        tabs["scores"].append_rows([[sid] + [f"{v:.1f}" for v in row] for sid, row in zip(ids, chunk["percents"])])
+        tabs["choices"].append_rows([[sid] + row for sid, row in zip(ids, chunk["choices"].tolist())])
+        written += len(ids)
+        if progress:
+            progress(written)
+    return written
+
+def write_parquet(out_dir, chunks, answers_format="long", progress=None):
+    """Stream chunks into one Parquet file per tab in out_dir."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(out_dir, exist_ok=True)
+    answers_tab = "answers" if answers_format == "long" else WIDE_ANSWERS_TAB
+    writers = {}
+
+    def write(tab, table):
+        if tab not in writers:
+            writers[tab] = pq.ParquetWriter(os.path.join(out_dir, f"{tab}.parquet"), table.schema, compression="zstd")
+        writers[tab].write_table(table)
+
+    written = 0
+    try:
+        for chunk in chunks:
+            ids = chunk["submission_id"]
+            size = len(ids)
+            write("submissions", pa.table({h: pa.array(col, type=pa.string())
+                                           for h, col in zip(SUBMISSIONS_HEADERS, _submission_rows(chunk))}))
+            if answers_format == "long":
+                write(answers_tab, pa.table({
+                    "submission_id": pa.array(np.repeat(ids, N_QUESTIONS), type=pa.string()),
+                    "question_id": np.tile(QUESTION_IDS, size),
+                    "trait": pa.DictionaryArray.from_arrays(
+                        np.tile(np.array([TRAITS.index(t) for t in QUESTION_TRAITS], dtype=np.int8), size),
+                        pa.array(TRAITS)),
+                    "answer": chunk["answers"].ravel(),
+                }))
+            else:
+                chars = np.array(["N", "Y"])[chunk["answers"]]
+                write(answers_tab, pa.table({
+                    "submission_id": pa.array(ids, type=pa.string()),
+                    "instrument_version": pa.array([INSTRUMENT_VERSION] * size),
+                    "answers": pa.array(["".join(row) for row in chars]),
+                }))
+            scores = {"submission_id": pa.array(ids, type=pa.string())}
+            scores.update({h: chunk["percents"][:, i].astype(np.float32) for i, h in enumerate(SCORES_HEADERS[1:])})
+            write("scores", pa.table(scores))
+            choices = {"submission_id": pa.array(ids, type=pa.string())}
+            choices.update({c: chunk["choices"][:, i] for i, c in enumerate(COURSES)})
+            write("choices", pa.table(choices))
+            written += size
+            if progress:
+                progress(written)
+    finally:
+        for w in writers.values():
+            w.close()
+    return written
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic survey population.")
+    parser.add_argument("-n", "--count", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--start", default="2025-06-01")
+    parser.add_argument("--end", default="2026-06-01")
+    parser.add_argument("--answers-format", choices=["long", "wide"], default="long")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--local", metavar="PATH", help="Write to a local stand-in spreadsheet (JSON)")
+    target.add_argument("--parquet", metavar="DIR", help="Write one Parquet file per tab")
+    args = parser.parse_args(argv)
+
+    chunks = generate_chunks(args.count, args.seed, args.chunk_size, args.start, args.end)
+    t0 = time.perf_counter()
+
+    def progress(n):
+        print(f"  {n:,} submissions ({n / (time.perf_counter() - t0) * 60:,.0f}/min)")
+
+    if args.parquet:
+        n = write_parquet(args.parquet, chunks, args.answers_format, progress)
+    else:
+        from local_sheets import LocalSpreadsheet
+        sh = LocalSpreadsheet.load(args.local)
+        n = write_local(sh, chunks, args.answers_format, progress)
+        sh.save()
+    print(f"Wrote {n:,} submissions in {time.perf_counter() - t0:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# Multi-institution tenancy. Each tenant (college) has its own spreadsheet,
+# branding and instrument variant, configured under st.secrets["tenants"]:
+#
+#   [tenants.stxaviers]
+#   spreadsheet_id = "..."
+#   institution = "St. Xavier's College"
+#   hosts = ["stxaviers.survey.example.org"]   # optional, else the subdomain must equal the key
+#   question_order = "by_trait"                # standard | by_trait
+#
+# A request picks its tenant with ?tenant=<key> or by subdomain; the legacy
+# st.secrets["sheet"]["spreadsheet_id"] is the default tenant. Authorized
+# clients and spreadsheet handles are kept in bounded LRU caches that also
+# drop entries idle for too long, so hundreds of tenants don't pin
+# connections and memory for the life of the process.
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from riasec_core import QUESTIONS, TRAITS
+
+DEFAULT_TENANT = "default"
+DEFAULT_INSTITUTION = "Jain University"
+QUESTION_ORDERS = ("standard", "by_trait")
+_TENANT_KEY = re.compile(r"^[a-z0-9][a-z0-9_-]{0,62}$")
+
+@dataclass(frozen=True)
+class Tenant:
+    key: str
+    spreadsheet_id: str
+    institution: str = DEFAULT_INSTITUTION
+    title: str = "🎯 RIASEC Career Interest Survey"
+    credentials: str = "gcp_service_account"
+    question_order: str = "standard"
+    early_stop: bool | None = None
+    hosts: tuple = field(default_factory=tuple)
+
+def load_tenants(tenants_config, default_spreadsheet_id=None):
+    """{key: Tenant} from the tenants secrets section plus the legacy default sheet."""
+    tenants = {}
+    if default_spreadsheet_id:
+        tenants[DEFAULT_TENANT] = Tenant(DEFAULT_TENANT, default_spreadsheet_id)
+    for key, cfg in (tenants_config or {}).items():
+        key = str(key).lower()
+        if not _TENANT_KEY.match(key):
+            raise ValueError(f"Invalid tenant key: {key!r}")
+        cfg = dict(cfg)
+        order = cfg.get("question_order", "standard")
+        if order not in QUESTION_ORDERS:
+            raise ValueError(f"Tenant {key!r}: unknown question_order {order!r}")
+        tenants[key] = Tenant(
+            key=key,
+            spreadsheet_id=cfg["spreadsheet_id"],
+            institution=cfg.get("institution", DEFAULT_INSTITUTION),
+            title=cfg.get("title", Tenant.title),
+            credentials=cfg.get("credentials", "gcp_service_account"),
+            question_order=order,
+            early_stop=cfg.get("early_stop"),
+            hosts=tuple(h.lower() for h in cfg.get("hosts", ())),
+        )
+    return tenants
+
+def resolve_tenant(tenants, query_tenant=None, host=None):
+    """Tenant for a request: ?tenant= first, then the Host header, then the default."""
+    if query_tenant:
+        tenant = tenants.get(str(query_tenant).lower())
+        if tenant is None:
+            raise KeyError(f"Unknown tenant: {query_tenant}")
+        return tenant
+    if host:
+        host = host.split(":", 1)[0].lower()
+        for tenant in tenants.values():
+            if host in tenant.hosts:
+                return tenant
+        subdomain = host.split(".", 1)[0]
+        if host.count(".") >= 2 and subdomain in tenants:
+            return tenants[subdomain]
+    if DEFAULT_TENANT in tenants:
+        return tenants[DEFAULT_TENANT]
+    raise KeyError("No tenant in the request and no default tenant configured")
+
+def tenant_data_path(path, tenant_key):
+    """Per-tenant variant of a local data file; the default tenant keeps the original path."""
+    if tenant_key == DEFAULT_TENANT:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}_{tenant_key}{ext}"
+
+def question_order(tenant):
+    """QUESTIONS in the tenant's presentation order; storage order never changes."""
+    if tenant.question_order == "by_trait":
+        return sorted(QUESTIONS, key=lambda q: (TRAITS.index(q[2]), q[0]))
+    return list(QUESTIONS)
+
+class LRUResourceCache:
+    """Thread-safe LRU of live resources with idle eviction and a close hook."""
+
+    def __init__(self, max_entries=64, idle_seconds=900, on_evict=None):
+        self.max_entries = max_entries
+        self.idle_seconds = idle_seconds
+        self.on_evict = on_evict
+        self._items = OrderedDict()  # key -> [value, last_used]
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+    def get_or_create(self, key, factory):
+        now = time.monotonic()
+        with self._lock:
+            evicted = self._evict_idle(now)
+            entry = self._items.get(key)
+            if entry is not None:
+                entry[1] = now
+                self._items.move_to_end(key)
+                self.stats["hits"] += 1
+                value = entry[0]
+        self._close(evicted)
+        if entry is not None:
+            return value
+        value = factory()  # built outside the lock; a racing duplicate is closed below
+        with self._lock:
+            self.stats["misses"] += 1
+            existing = self._items.get(key)
+            if existing is not None:
+                duplicate, value = value, existing[0]
+                existing[1] = now
+                evicted = [duplicate]
+            else:
+                self._items[key] = [value, now]
+                evicted = []
+                while len(self._items) > self.max_entries:
+                    evicted.append(self._items.popitem(last=False)[1][0])
+                    self.stats["evicted"] += 1
+        self._close(evicted)
+        return value
+
+    def _evict_idle(self, now):
+        evicted = []
+        while self._items:
+            key, (value, last_used) = next(iter(self._items.items()))
+            if now - last_used <= self.idle_seconds:
+                break
+            del self._items[key]
+            evicted.append(value)
+            self.stats["evicted"] += 1
+        return evicted
+
+    def _close(self, values):
+        for value in values:
+            if self.on_evict:
+                try:
+                    self.on_evict(value)
+                except Exception as exc:
+                    print(f"Warning: error closing evicted resource: {exc}")
+
+    def discard(self, key):
+        with self._lock:
+            entry = self._items.pop(key, None)
+        if entry is not None:
+            self._close([entry[0]])
+
+    def __len__(self):
+        return len(self._items)
+
+def close_gspread_client(gc):
+    session = getattr(getattr(gc, "http_client", None), "session", None) or getattr(gc, "session", None)
+    if session is not None:
+        session.close()
@@ -0,0 +1,78 @@
+# Precompiled UI markup. The stylesheet lives in static/riasec.css and is read
+# and wrapped in a <style> block once per process. It is not served through
+# Streamlit's static file serving, which sends .css as text/plain with nosniff,
+# so browsers refuse it as a stylesheet. Badge and trait snippets are built
+# once per distinct state, and confetti comes from a pool of pre-generated
+# variants instead of being rebuilt on every call.
+import os
+import random
+from functools import lru_cache
+from html import escape
+
+from riasec_core import TRAIT_NAMES, TRAIT_DESCRIPTIONS
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STYLESHEET = "riasec.css"
+CONFETTI_COLORS = ['#ff6b6b', '#4ecdc4', '#45b7d1', '#f9ca24', '#6c5ce7', '#a29bfe', '#fd79a8', '#fdcb6e']
+CONFETTI_PIECES = 50
+CONFETTI_VARIANTS = 8
+MILESTONES = [
+    (25, "🌟 Getting Started", "badge-25"),
+    (50, "⚡ Half Way There", "badge-50"),
+    (75, "🔥 Almost Done", "badge-75"),
+    (100, "🎉 Survey Complete!", "badge-100"),
+]
+
+@lru_cache(maxsize=1)
+def stylesheet_html():
+    """The stylesheet as an inline <style> block, read from disk once."""
+    with open(os.path.join(STATIC_DIR, STYLESHEET), encoding="utf-8") as fh:
+        return f"<style>\n{fh.read()}</style>"
+
+def milestone_level(progress):
+    return sum(1 for threshold, _, _ in MILESTONES if progress >= threshold)
+
+@lru_cache(maxsize=None)
+def milestone_badges_html(level):
+    """Badges for the first `level` milestones; only len(MILESTONES) + 1 distinct snippets exist."""
+    badges = "".join(f'<span class="milestone-badge {css_class}">{label}</span>'
+                     for _, label, css_class in MILESTONES[:level])
+    return f'<div style="text-align: center; margin: 20px 0;">{badges}</div>'
+
+@lru_cache(maxsize=256)
+def trait_badges_html(top_traits):
+    """Top-trait badges for a tuple of (trait, percent) pairs."""
+    badges = "".join(
+        f'<div class="trait-badge trait-{trait}">{TRAIT_NAMES[trait]}: {percent:.1f}%<br>'
+        f'<small>{escape(TRAIT_DESCRIPTIONS[trait])}</small></div>'
+        for trait, percent in top_traits if percent > 0
+    )
+    return f'<div style="text-align: center; margin: 20px 0;"><h3>🏆 Your Top Traits</h3>{badges}</div>'
+
+@lru_cache(maxsize=128)
+def progress_bar_html(percent, answered, total):
+    return f"""
+    <div class="sticky-progress">
+        <div class="progress-container">
+            <div class="progress-bar" style="width: {percent}%;">
+                {percent:.0f}% Complete
+            </div>
+        </div>
+        <p style="text-align: center; color: #666; margin-top: 5px;">
+            Questions: {answered}/{total} answered
+        </p>
+    </div>
+    """
+
+def _confetti_variant(rng):
+    pieces = "".join(
+        f'<div class="confetti" style="left: {rng.randint(0, 100)}%; background-color: {rng.choice(CONFETTI_COLORS)}; '
+        f'animation-delay: {rng.uniform(0, 2):.2f}s; animation-duration: {rng.uniform(2, 4):.2f}s;"></div>'
+        for _ in range(CONFETTI_PIECES)
+    )
+    return f'<div class="confetti-container">{pieces}</div>'
+
+CONFETTI_POOL = tuple(_confetti_variant(random.Random(seed)) for seed in range(CONFETTI_VARIANTS))
+
+def confetti_html():
+    return random.choice(CONFETTI_POOL)